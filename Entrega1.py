@@ -15,8 +15,20 @@ Pendientes:
 # ----------------------------------------------------------------------------------------------
 # MÓDULOS
 # ----------------------------------------------------------------------------------------------
+from array import array
 from datetime import datetime
 
+try:
+    import numpy # Conteos vectorizados en los resúmenes (opcional)
+except ImportError:
+    numpy = None
+
+
+# ----------------------------------------------------------------------------------------------
+# ESTADO DEL MÓDULO
+# ----------------------------------------------------------------------------------------------
+columnasCache = None # (diccionario de préstamos, sus columnas) armado por el último resumen
+
 
 # ----------------------------------------------------------------------------------------------
 # FUNCIONES
@@ -313,6 +325,7 @@ def registrarPrestamo(_alumnos, _libros, _prestamos):
         "estadoDevolucionCorrecto": False,
     }
 
+    actualizarColumnasPrestamos(_prestamos, idPrestamo)
     print(f"Préstamo registrado con ID: {idPrestamo}")
 
     return _prestamos
@@ -389,6 +402,119 @@ def finalizarPrestamo(_alumnos, _libros, _prestamos):
     return _prestamos, _alumnos
 
 
+def cargarFilaEnColumnas(_columnas, _idPrestamo, _prestamo):
+    """
+    Agrega o actualiza la fila de un préstamo en las columnas: período de inicio
+    (año * 12 + mes - 1), código del libro y si fue devuelto correctamente.
+
+    Parámetros:
+        _columnas (dict): Columnas armadas por obtenerColumnasPrestamos.
+        _idPrestamo (str): ID del préstamo.
+        _prestamo (dict): Datos del préstamo.
+
+    Retorno:
+        None
+    """
+    idLibro = _prestamo["idLibro"]
+    if idLibro not in _columnas["codigos"]:
+        _columnas["codigos"][idLibro] = len(_columnas["idsLibro"])
+        _columnas["idsLibro"].append(idLibro)
+
+    fecha = _prestamo["fechaInicio"]
+    periodo = int(fecha[0:4]) * 12 + int(fecha[5:7]) - 1
+    codigo = _columnas["codigos"][idLibro]
+    correcto = 1 if _prestamo["estadoDevolucionCorrecto"] else 0
+
+    fila = _columnas["filas"].get(_idPrestamo)
+    if fila is None:
+        _columnas["filas"][_idPrestamo] = len(_columnas["periodo"])
+        _columnas["periodo"].append(periodo)
+        _columnas["libro"].append(codigo)
+        _columnas["correcto"].append(correcto)
+    else:
+        _columnas["periodo"][fila] = periodo
+        _columnas["libro"][fila] = codigo
+        _columnas["correcto"][fila] = correcto
+
+
+def obtenerColumnasPrestamos(_prestamos):
+    """
+    Devuelve el historial de préstamos pasado a columnas. Se arma una sola vez por diccionario y
+    registrarPrestamo lo mantiene al día (finalizarPrestamo no cambia ninguna columna), así los
+    resúmenes filtran y agrupan sobre arrays en vez de recorrer el diccionario completo.
+
+    Parámetros:
+        _prestamos (dict): Diccionario de préstamos (clave: idPrestamo, valor: datos del préstamo).
+
+    Retorno:
+        columnas (dict): "periodo", "libro" (arrays de enteros), "correcto" (array de bits),
+        "idsLibro" (ID de libro de cada código), "codigos" y "filas" (fila de cada préstamo).
+    """
+    global columnasCache
+
+    if columnasCache is not None and columnasCache[0] is _prestamos and len(columnasCache[1]["filas"]) == len(_prestamos):
+        return columnasCache[1]
+
+    columnas = {
+        "periodo": array("q"),
+        "libro": array("q"),
+        "correcto": array("B"),
+        "idsLibro": [],
+        "codigos": {},
+        "filas": {},
+    }
+    for idPrestamo, prestamo in _prestamos.items():
+        cargarFilaEnColumnas(columnas, idPrestamo, prestamo)
+
+    columnasCache = (_prestamos, columnas)
+    return columnas
+
+
+def actualizarColumnasPrestamos(_prestamos, _idPrestamo):
+    """
+    Lleva a las columnas ya armadas el alta o el cambio de un préstamo. Si todavía no se armaron
+    para este diccionario no hace nada: se arman completas en el próximo resumen.
+
+    Parámetros:
+        _prestamos (dict): Diccionario de préstamos (clave: idPrestamo, valor: datos del préstamo).
+        _idPrestamo (str): ID del préstamo agregado o modificado.
+
+    Retorno:
+        None
+    """
+    if columnasCache is not None and columnasCache[0] is _prestamos:
+        cargarFilaEnColumnas(columnasCache[1], _idPrestamo, _prestamos[_idPrestamo])
+
+
+def contarPorLibroYMes(_columnas, _anio):
+    """
+    Agrupa los préstamos iniciados en un año por libro y mes. Con numpy el filtro y el conteo se
+    hacen sobre los arrays completos (máscara + bincount), sin recorrer préstamo por préstamo.
+
+    Parámetros:
+        _columnas (dict): Columnas armadas por obtenerColumnasPrestamos.
+        _anio (int): Año de inicio de los préstamos.
+
+    Retorno:
+        cantidades (list): Cantidad de préstamos de cada grupo (código de libro * 12 + mes - 1).
+    """
+    cantidadGrupos = len(_columnas["idsLibro"]) * 12
+    desde = _anio * 12
+
+    if numpy is not None and len(_columnas["periodo"]) > 0:
+        periodos = numpy.frombuffer(_columnas["periodo"], dtype=numpy.int64)
+        libros = numpy.frombuffer(_columnas["libro"], dtype=numpy.int64)
+        enElAnio = (periodos >= desde) & (periodos < desde + 12)
+        grupos = libros[enElAnio] * 12 + (periodos[enElAnio] - desde)
+        return numpy.bincount(grupos, minlength=cantidadGrupos).tolist()
+
+    cantidades = [0] * cantidadGrupos
+    for periodo, libro in zip(_columnas["periodo"], _columnas["libro"]):
+        if desde <= periodo < desde + 12:
+            cantidades[libro * 12 + periodo - desde] += 1
+    return cantidades
+
+
 def resumenMensual(_prestamos, _anio, _mes):
     """
     Genera un resumen de los préstamos realizados en un mes específico.
@@ -403,18 +529,23 @@ def resumenMensual(_prestamos, _anio, _mes):
         devueltosCorrectos (int): Cantidad de préstamos devueltos correctamente.
         devueltosIncorrectos (int): Cantidad de préstamos con devolución incorrecta.
     """
-    cantidadTotal = 0
-    devueltosCorrectos = 0
-    devueltosIncorrectos = 0
-
-    for prestamo in _prestamos.values():
-        fecha = prestamo["fechaInicio"]
-        if fecha.startswith(f"{_anio}-{str(_mes).zfill(2)}"):
-            cantidadTotal += 1
-            if prestamo["estadoDevolucionCorrecto"]:
-                devueltosCorrectos += 1
-            else:
-                devueltosIncorrectos += 1
+    columnas = obtenerColumnasPrestamos(_prestamos)
+    periodo = _anio * 12 + _mes - 1
+
+    if numpy is not None and len(columnas["periodo"]) > 0:
+        delMes = numpy.frombuffer(columnas["periodo"], dtype=numpy.int64) == periodo
+        correctos = numpy.frombuffer(columnas["correcto"], dtype=numpy.uint8)[delMes]
+        cantidadTotal = int(delMes.sum())
+        devueltosCorrectos = int(correctos.sum())
+    else:
+        cantidadTotal = 0
+        devueltosCorrectos = 0
+        for periodoPrestamo, correcto in zip(columnas["periodo"], columnas["correcto"]):
+            if periodoPrestamo == periodo:
+                cantidadTotal += 1
+                devueltosCorrectos += correcto
+
+    devueltosIncorrectos = cantidadTotal - devueltosCorrectos
 
     return cantidadTotal, devueltosCorrectos, devueltosIncorrectos
 
@@ -432,18 +563,13 @@ def resumenAnualPorLibroCantidad(_prestamos, _anio, _libros):
         resumen (dict): Diccionario donde las claves son ID de libros y los valores son la
         cantidad de veces prestados.
     """
-    resumen = {idLibro: [0] * 12 for idLibro in _libros.keys()}
+    columnas = obtenerColumnasPrestamos(_prestamos)
+    cantidades = contarPorLibroYMes(columnas, _anio)
 
-    for prestamo in _prestamos.values():
-        fecha = prestamo["fechaInicio"]
-        if fecha.startswith(str(_anio)):
-            mes = int(fecha[5:7])
-            libro = prestamo["idLibro"]
-            if libro in resumen:
-                resumen[libro][mes - 1] += 1
-            else:
-                resumen[libro] = [0] * 12
-                resumen[libro][mes - 1] = 1
+    resumen = {idLibro: [0] * 12 for idLibro in _libros.keys()}
+    for codigo, idLibro in enumerate(columnas["idsLibro"]):
+        if idLibro in resumen or any(cantidades[codigo * 12:(codigo + 1) * 12]):
+            resumen[idLibro] = cantidades[codigo * 12:(codigo + 1) * 12]
 
     return resumen
 
@@ -461,19 +587,21 @@ def resumenAnualPorLibroPesos(_prestamos, _libros, _anio):
         resumen (dict): Diccionario donde las claves son ID de libros y los valores son el total acumulado
         en pesos por garantía.
     """
-    resumen = {}
+    columnas = obtenerColumnasPrestamos(_prestamos)
+    cantidades = contarPorLibroYMes(columnas, _anio)
 
-    for prestamo in _prestamos.values():
-        fecha = prestamo["fechaInicio"]
-        if fecha.startswith(str(_anio)):
-            mes = int(fecha[5:7]) - 1  # índice de mes (0 a 11)
-            idLibro = prestamo["idLibro"]
-            nombreLibro = _libros.get(idLibro, {}).get("titulo", f"Libro {idLibro}")
-            costo = _libros.get(idLibro, {}).get("costoGarantia", 0)
+    # Cada préstamo de un libro suma el mismo costo: el monto del mes es cantidad * costo
+    resumen = {}
+    for codigo, idLibro in enumerate(columnas["idsLibro"]):
+        if not any(cantidades[codigo * 12:(codigo + 1) * 12]):
+            continue
+        nombreLibro = _libros.get(idLibro, {}).get("titulo", f"Libro {idLibro}")
+        costo = _libros.get(idLibro, {}).get("costoGarantia", 0)
 
-            if nombreLibro not in resumen:
-                resumen[nombreLibro] = [0] * 12
-            resumen[nombreLibro][mes] += costo
+        if nombreLibro not in resumen:
+            resumen[nombreLibro] = [0] * 12
+        for mes in range(12):
+            resumen[nombreLibro][mes] += cantidades[codigo * 12 + mes] * costo
 
     return resumen
 
@@ -1127,5 +1255,6 @@ def main():
             print("\n\n")
 
 
-# Punto de entrada al programa
-main()
+# Punto de entrada al programa (al importarse como módulo no se abre el menú)
+if __name__ == "__main__":
+    main()
@@ -15,9 +15,48 @@ Pendientes:
 # ----------------------------------------------------------------------------------------------
 # MÓDULOS
 # ----------------------------------------------------------------------------------------------
-from datetime import datetime
+from array import array
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+import argparse
+import asyncio
+import bisect
+import builtins
+import contextlib
+import copy
+import cProfile
+import csv
+import gc
+import gzip
+import heapq
+import io
+import itertools
 import json
+import mmap
+import os
 import re
+import shutil
+import signal
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+import unicodedata
+
+try:
+    import fcntl # Bloqueo de archivos en Linux/macOS
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt # Bloqueo de archivos en Windows
+except ImportError:
+    msvcrt = None
+try:
+    import numpy # Agrupaciones vectorizadas sobre las columnas de préstamos (opcional)
+except ImportError:
+    numpy = None
 
 # ----------------------------------------------------------------------------------------------
 # CONSTANTES
@@ -25,6 +64,88 @@ import re
 ALUMNOS_ARCHIVO = "alumnos.json"
 LIBROS_ARCHIVO = "libros.json"
 PRESTAMOS_ARCHIVO = "prestamos.json"
+PRESTAMOS_DIARIO = "prestamos.diario.jsonl"
+PRESTAMOS_ACTIVOS_ARCHIVO = "prestamos_activos.json" # idPrestamo -> préstamo sin finalizar
+AGREGADOS_ARCHIVO = "agregados.json" # "YYYY-MM/idLibro" -> [cantidad, devoluciones incorrectas]
+PRESTAMOS_POR_ALUMNO_ARCHIVO = "prestamos_por_alumno.json" # idAlumno -> IDs de todos sus préstamos
+PRESTAMOS_POR_LIBRO_ARCHIVO = "prestamos_por_libro.json" # idLibro -> IDs de todos sus préstamos
+INDICES_DE_PRESTAMOS = { # índice persistente del historial -> campo del préstamo por el que agrupa
+    PRESTAMOS_POR_ALUMNO_ARCHIVO: "idAlumno",
+    PRESTAMOS_POR_LIBRO_ARCHIVO: "idLibro",
+}
+PARTICIONES_DIRECTORIO = "prestamos_por_mes" # Préstamos por mes de inicio, uno por archivo (ej. prestamos_por_mes/2025-05.json); se escriben con el bloqueo de prestamos.json
+PARTICION_CERRADA_EXTENSION = ".gz" # Los meses cerrados (pasados y sin préstamos activos) quedan comprimidos y ya no cambian
+DIARIOS = { # archivo base -> diario de altas/cambios (vaciar para volver a reescribir el archivo completo)
+    PRESTAMOS_ARCHIVO: PRESTAMOS_DIARIO,
+    PRESTAMOS_POR_ALUMNO_ARCHIVO: "prestamos_por_alumno.diario.jsonl",
+    PRESTAMOS_POR_LIBRO_ARCHIVO: "prestamos_por_libro.diario.jsonl",
+    PRESTAMOS_ACTIVOS_ARCHIVO: "prestamos_activos.diario.jsonl",
+    AGREGADOS_ARCHIVO: "agregados.diario.jsonl",
+}
+PARTICION_DIARIO_EXTENSION = ".diario.jsonl" # Diario de cada mes abierto (ej. prestamos_por_mes/2025-05.diario.jsonl)
+ARCHIVOS_DERIVADOS = [ # Se arman a partir del historial de préstamos (ver verificarDerivados)
+    PRESTAMOS_ACTIVOS_ARCHIVO,
+    AGREGADOS_ARCHIVO,
+    PRESTAMOS_POR_ALUMNO_ARCHIVO,
+    PRESTAMOS_POR_LIBRO_ARCHIVO,
+]
+ORIGEN_DERIVADOS_ARCHIVO = "prestamos.origen.json" # Firma del historial con la que están al día los archivos derivados y las particiones
+FORMATO_DERIVADOS = 4 # Cambia con el formato de los archivos derivados, para que se vuelvan a armar
+MAX_ENTRADAS_DIARIO = 500 # Cantidad de entradas a partir de la cual el diario se vuelca al archivo base
+TAMANIO_BLOQUE_LECTURA = 64 * 1024 # Caracteres que se leen por vez al recorrer un JSON por partes
+SNAPSHOT_EXTENSION = ".snap" # Foto binaria de cada colección, junto a su JSON (ej. prestamos.json.snap); se escribe junto con el JSON completo
+SNAPSHOT_MAGIA = b"BIBSNAP4" # Primeros bytes del archivo; si cambia el formato se cambia la versión
+SNAPSHOT_CABECERA = struct.Struct("<8sqqQQQ") # magia, mtime y tamaño del JSON, cantidad de textos, bytes de textos, cantidad de filas
+SNAPSHOT_SEPARADOR = "\x00" # Separa los textos de la tabla de textos
+SNAPSHOT_COLUMNAS = { # archivo JSON -> (campo, tipo) de cada columna de la fila, en el orden de __slots__ ("t" texto, "q" entero, "b" lógico)
+    ALUMNOS_ARCHIVO: (("activo", "b"), ("nombre", "t"), ("apellido", "t"), ("direccion", "t"), ("email", "t"),
+                      ("celular", "q"), ("fijo", "q"), ("infracciones", "q"), ("version", "q")),
+    LIBROS_ARCHIVO: (("titulo", "t"), ("autor1", "t"), ("autor2", "t"), ("autor3", "t"), ("activo", "b"),
+                     ("genero", "t"), ("editorial", "t"), ("costoGarantia", "q"), ("version", "q")),
+    PRESTAMOS_ARCHIVO: (("idPrestamo", "t"), ("idAlumno", "t"), ("idLibro", "t"), ("cantidadDias", "q"),
+                        ("fechaInicio", "t"), ("fechaFinalizacion", "t"), ("estadoDevolucionCorrecto", "b")),
+}
+SNAPSHOT_ENTERO_NULO = -2 ** 63 # Valor de una columna entera cuyo campo está en None
+MOTOR_ALMACENAMIENTO = "json" # "json" (un archivo por colección) o "sqlite" (BASE_DATOS_ARCHIVO)
+BASE_DATOS_ARCHIVO = "biblioteca.db"
+CAMPOS_DE_BUSQUEDA = { # archivo JSON -> campos (o rutas de campo) que entran en su índice de búsqueda
+    LIBROS_ARCHIVO: ("titulo", "autores.autor1", "autores.autor2", "autores.autor3", "genero", "editorial"),
+    ALUMNOS_ARCHIVO: ("nombre", "apellido", "email"),
+}
+MAX_RESULTADOS_BUSQUEDA = 50 # Coincidencias que se muestran por búsqueda (las de menor ID)
+TAMANIO_PAGINA_LISTADO = 20 # Registros por página en los listados de alumnos y libros
+ARCHIVOS_DE_PRESTAMO = [ # Archivos que modifican el alta y la finalización de un préstamo
+    ALUMNOS_ARCHIVO,
+    PRESTAMOS_ARCHIVO,
+    PRESTAMOS_ACTIVOS_ARCHIVO,
+    AGREGADOS_ARCHIVO,
+    PRESTAMOS_POR_ALUMNO_ARCHIVO,
+    PRESTAMOS_POR_LIBRO_ARCHIVO,
+]
+ARCHIVOS_DEL_SERVICIO = [ALUMNOS_ARCHIVO, LIBROS_ARCHIVO] + ARCHIVOS_DE_PRESTAMO # Bloqueados mientras corre el servicio
+HOST_SERVICIO = "127.0.0.1"
+PUERTO_SERVICIO = 8080
+INTERVALO_ESCRITURA_SERVICIO = 1.0 # Segundos entre escrituras a disco del servicio
+TRAZA_ARCHIVO = os.environ.get("BIBLIOTECA_TRAZA") # Si se define, se instrumenta cada operación (JSON Lines)
+PERFILES_DIRECTORIO = os.environ.get("BIBLIOTECA_PERFILES") # Si se define, un perfil de cProfile por operación
+OPERACIONES_INSTRUMENTADAS = [ # Acciones del menú (y la línea de comandos) que generan una línea de traza
+    "ingresarAlumno", "modificarAlumno", "inactivarAlumno", "listarAlumnos", "buscarAlumnos",
+    "ingresarLibro", "modificarLibro", "inactivarLibro", "listarLibros", "buscarLibros",
+    "registrarPrestamo", "finalizarPrestamo", "listarPrestamosActivos",
+    "imprimirHistorialAlumno", "imprimirHistorialLibro",
+    "imprimirResumenMensual", "imprimirResumenAnualPorLibroCantidad",
+    "imprimirResumenAnualPorLibroPesos", "imprimirResumenAnualDevolucionesIncorrectas",
+    "ejecutarLineaDeComandos",
+]
+FUNCIONES_INSTRUMENTADAS = [ # Funciones auxiliares cuyo tiempo se acumula dentro de cada operación
+    "cargarArchivo", "escribirArchivo", "escribirArchivos", "agregarAlDiario", "formatearInformes",
+    "agruparColumnas", "obtenerIndiceTexto",
+]
+TABLAS_SQLITE = { # archivo JSON -> tabla que lo reemplaza en el motor sqlite
+    ALUMNOS_ARCHIVO: "alumnos",
+    LIBROS_ARCHIVO: "libros",
+    PRESTAMOS_ARCHIVO: "prestamos",
+}
 ALUMNO_ESQUEMA = {
     'id': 'id',
     'campos': [ # (etiqueta de campo, campo o ruta de campo, tipo de campo)
@@ -48,6 +169,542 @@ LIBRO_ESQUEMA = {
     ]
 }
 
+# Campos que muestran los listados (los autores por separado y las infracciones de los alumnos)
+ALUMNO_ESQUEMA_LISTADO = {
+    'id': ALUMNO_ESQUEMA['id'],
+    'campos': ALUMNO_ESQUEMA['campos'] + [
+        ('infracciones', 'infracciones', 'numero')
+    ]
+}
+
+LIBRO_ESQUEMA_LISTADO = {
+    'id': LIBRO_ESQUEMA['id'],
+    'campos': [campo for campo in LIBRO_ESQUEMA['campos'] if campo[0] != 'autores'] + [
+        ('Autor 1', 'autores.autor1', 'string'),
+        ('Autor 2', 'autores.autor2', 'string'),
+        ('Autor 3', 'autores.autor3', 'string'),
+    ]
+}
+
+# Patrones de validación, compilados una sola vez al cargar el módulo
+PATRON_EMAIL = re.compile(
+    r"^[a-zA-Z0-9_.+-]+"   # Usuario: letras, números y caracteres . _ + -
+    r"@"                   # Símbolo @ obligatorio
+    r"[a-zA-Z0-9-]+\."     # Dominio: letras, números, guiones y punto
+    r"[a-zA-Z0-9-.]+$"     # Extensión: letras, números, guiones y punto
+)
+PATRON_ID = re.compile(
+    r"^[A-Za-z]"   # Una letra inicial (A-Z o a-z)
+    r"\d+$"        # Uno o más dígitos
+)
+PATRON_ID_PRESTAMO = re.compile(
+    r"^\d{4}\."                       # Año (4 números) + punto
+    r"(0[1-9]|1[0-2])\."              # Mes (01-12) + punto
+    r"(0[1-9]|[12]\d|3[01]) "         # Día (01-31) + espacio
+    r"([01]\d|2[0-3]):"               # Hora (00-23) + ':'
+    r"[0-5]\d:"                       # Minuto (00-59) + ':'
+    r"[0-5]\d"                        # Segundo (00-59)
+    r"(\.\d{6})?$"                    # Microsegundos (opcional, IDs generados desde la versión con sufijo)
+)
+PATRON_DIRECCION = re.compile(
+    r"^[A-Za-zÁÉÍÓÚáéíóúÑñ0-9\.]+"          # Primer bloque: letras, números y punto
+    r"(?: [A-Za-zÁÉÍÓÚáéíóúÑñ0-9\.]+)*$"    # Bloques opcionales: espacio + letras, números y punto
+)
+PATRON_AUTORES = re.compile(
+    r'^[A-Za-zÁÉÍÓÚáéíóúÜüÑñ]+'                 # Nombre del primer autor (obligatorio): al menos una letra
+    r'(?:\s+[A-Za-zÁÉÍÓÚáéíóúÜüÑñ]+)*'          # Posibles espacios + segundos nombres o apellidos
+    r'(?:\s*,\s*'                               # Coma y espacios opcionales
+    r'[A-Za-zÁÉÍÓÚáéíóúÜüÑñ]+'                  # Nombre del siguiente autor (opcional)
+    r'(?:\s+[A-Za-zÁÉÍÓÚáéíóúÜüÑñ]+)*)'         # Posibles espacios + segundos nombres o apellidos
+    r'{0,2}$'                                   # Bloque opcional: máximo 2 repeticiones. Total: 3 autores (1 obligatorio + 2 opcionales)
+)
+PATRON_STRING = re.compile(
+    r"^[A-Za-zÁÉÍÓÚáéíóúÑñ]+"           # Al menos una letra válida al inicio
+    r"(?:\s+[A-Za-zÁÉÍÓÚáéíóúÑñ]+)*$"   # Bloques opcionales separados por espacios
+)
+
+# ----------------------------------------------------------------------------------------------
+# ESTADO DEL MÓDULO
+# ----------------------------------------------------------------------------------------------
+conexionBaseDatos = None # Conexión sqlite, se abre en el primer acceso con MOTOR_ALMACENAMIENTO = "sqlite"
+cacheArchivos = {} # ruta -> (firma del archivo y su diario, diccionario ya parseado)
+particionesCerradas = {} # "YYYY-MM" -> préstamos de un mes cerrado; como no cambian, se leen una sola vez
+columnasPrestamos = None # (firma de prestamos.json, ColumnasPrestamos)
+indicesTexto = {} # ruta -> índice de búsqueda armado sobre el diccionario que devuelve cargarArchivo
+loteActual = None # Durante un lote: {"diccionarios": ruta -> dict, "pendientes": ruta -> {clave: registro} o None, "bloqueos": rutas, "puntos": listas para deshacer}
+SIN_VALOR = object() # En los puntos de restauración de un lote, marca que no había valor que restaurar
+vistasDerivadas = {} # ruta -> (diccionario guardado, vista armada sobre él); ver vistaDerivada
+origenVerificado = None # Versión del historial con la que este proceso ya comprobó los derivados (ver verificarDerivados)
+bloqueosTomados = {} # ruta -> archivo ".lock" abierto y bloqueado por este proceso
+ultimoInstantePrestamo = None # Instante del último ID de préstamo generado por este proceso
+instrumentacion = {"traza": None, "perfiles": None} # Destino de la traza y de los perfiles, si está activa
+operacionActual = None # Métricas de la operación instrumentada en curso
+
+# ----------------------------------------------------------------------------------------------
+# REGISTROS
+# ----------------------------------------------------------------------------------------------
+class Registro:
+    """
+    Base de los registros de alumnos, libros y préstamos. Cada clase guarda sus campos en
+    __slots__ (sin un diccionario por registro) y se lee y escribe con la misma forma JSON de
+    siempre. Los campos se usan como atributos (registro.activo); por compatibilidad también
+    admiten el acceso como diccionario (registro["activo"], registro.get("version", 0)).
+    Un campo en None se considera ausente y no se escribe.
+    """
+    __slots__ = ()
+    CAMPOS = () # Claves del JSON, en el orden en que se escriben
+    INTERNADOS = () # Campos de texto que se repiten mucho entre registros y se guardan una sola vez
+
+    def __getitem__(self, _clave):
+        try:
+            return getattr(self, _clave)
+        except AttributeError:
+            raise KeyError(_clave) from None
+
+    def __setitem__(self, _clave, _valor):
+        setattr(self, _clave, _valor)
+
+    def __contains__(self, _clave):
+        return _clave in self.CAMPOS and getattr(self, _clave) is not None
+
+    def get(self, _clave, _defecto=None):
+        valor = getattr(self, _clave, None)
+        return _defecto if valor is None else valor
+
+    def keys(self):
+        return [campo for campo in self.CAMPOS if getattr(self, campo) is not None]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.aDiccionario()!r})"
+
+    def aDiccionario(self):
+        """
+        Convierte el registro a la forma del archivo JSON.
+
+        Retorno:
+            dict: Campos del registro (sin los que están en None).
+        """
+        return {campo: getattr(self, campo) for campo in self.CAMPOS if getattr(self, campo) is not None}
+
+    @classmethod
+    def desdeDiccionario(cls, _datos, _clave=None):
+        """
+        Crea un registro a partir de su forma JSON.
+
+        Parámetros:
+            _datos (dict): Registro tal como está en el archivo.
+            _clave (str|None): Clave del registro en el archivo (se reutiliza para el ID propio).
+
+        Retorno:
+            Registro: Instancia de la clase.
+        """
+        registro = cls()
+        for campo in cls.CAMPOS:
+            if campo in _datos:
+                valor = _datos[campo]
+                if campo in cls.INTERNADOS and isinstance(valor, str):
+                    valor = sys.intern(valor)
+                setattr(registro, campo, valor)
+        return registro
+
+class Alumno(Registro):
+    """
+    Alumno. El teléfono se guarda en dos campos planos y se expone como el diccionario
+    "telefono" ({"celular", "fijo"}) del JSON.
+    """
+    __slots__ = ("activo", "nombre", "apellido", "direccion", "email", "celular", "fijo", "infracciones", "version")
+    CAMPOS = ("activo", "nombre", "apellido", "direccion", "email", "telefono", "infracciones", "version")
+    INTERNADOS = ("nombre", "apellido")
+
+    def __init__(self, activo=True, nombre="", apellido="", direccion="", email="", celular=0, fijo=0, infracciones=0, version=None):
+        self.activo = activo
+        self.nombre = nombre
+        self.apellido = apellido
+        self.direccion = direccion
+        self.email = email
+        self.celular = celular
+        self.fijo = fijo
+        self.infracciones = infracciones
+        self.version = version
+
+    @property
+    def telefono(self):
+        return {"celular": self.celular, "fijo": self.fijo}
+
+    @telefono.setter
+    def telefono(self, _telefono):
+        self.celular = _telefono.get("celular", 0)
+        self.fijo = _telefono.get("fijo", 0)
+
+class Libro(Registro):
+    """
+    Libro. Los tres autores se guardan en campos planos y se exponen como el diccionario
+    "autores" ({"autor1", "autor2", "autor3"}) del JSON.
+    """
+    __slots__ = ("titulo", "autor1", "autor2", "autor3", "activo", "genero", "editorial", "costoGarantia", "version")
+    CAMPOS = ("titulo", "autores", "activo", "genero", "editorial", "costoGarantia", "version")
+    INTERNADOS = ("genero", "editorial")
+
+    def __init__(self, titulo="", autor1="", autor2="", autor3="", activo=True, genero="", editorial="", costoGarantia=0, version=None):
+        self.titulo = titulo
+        self.autor1 = autor1
+        self.autor2 = autor2
+        self.autor3 = autor3
+        self.activo = activo
+        self.genero = genero
+        self.editorial = editorial
+        self.costoGarantia = costoGarantia
+        self.version = version
+
+    @property
+    def autores(self):
+        return {"autor1": self.autor1, "autor2": self.autor2, "autor3": self.autor3}
+
+    @autores.setter
+    def autores(self, _autores):
+        self.autor1 = sys.intern(_autores.get("autor1", ""))
+        self.autor2 = sys.intern(_autores.get("autor2", ""))
+        self.autor3 = sys.intern(_autores.get("autor3", ""))
+
+class Prestamo(Registro):
+    """
+    Préstamo. Los IDs de alumno y libro y las fechas se internan: en un historial grande cada
+    valor distinto queda una sola vez en memoria. El ID propio reutiliza la clave del archivo.
+    """
+    __slots__ = ("idPrestamo", "idAlumno", "idLibro", "cantidadDias", "fechaInicio", "fechaFinalizacion", "estadoDevolucionCorrecto")
+    CAMPOS = __slots__
+    INTERNADOS = ("idAlumno", "idLibro", "fechaInicio", "fechaFinalizacion")
+
+    def __init__(self, idPrestamo="", idAlumno="", idLibro="", cantidadDias=0, fechaInicio="", fechaFinalizacion="", estadoDevolucionCorrecto=False):
+        self.idPrestamo = idPrestamo
+        self.idAlumno = idAlumno
+        self.idLibro = idLibro
+        self.cantidadDias = cantidadDias
+        self.fechaInicio = fechaInicio
+        self.fechaFinalizacion = fechaFinalizacion
+        self.estadoDevolucionCorrecto = estadoDevolucionCorrecto
+
+    @classmethod
+    def desdeDiccionario(cls, _datos, _clave=None):
+        prestamo = super().desdeDiccionario(_datos, _clave)
+        if _clave is not None and prestamo.idPrestamo == _clave:
+            prestamo.idPrestamo = _clave
+        return prestamo
+
+CLASES_DE_REGISTRO = { # archivo JSON -> clase de sus registros
+    ALUMNOS_ARCHIVO: Alumno,
+    LIBROS_ARCHIVO: Libro,
+    PRESTAMOS_ARCHIVO: Prestamo,
+}
+
+class ColumnasPrestamos:
+    """
+    Historial de préstamos guardado por columnas para los informes. Cada columna es un array de
+    enteros contiguo, con un valor por préstamo en el mismo orden que prestamos.json: el período
+    de inicio (año * 12 + mes - 1), el ordinal de la fecha de inicio, el libro y el alumno como
+    códigos enteros, los días y el estado como bits. Las columnas numpy se leen sin copiarlas.
+    """
+    __slots__ = ("posiciones", "periodo", "dia", "libro", "alumno", "dias", "estado",
+                 "idsLibro", "codigosLibro", "idsAlumno", "codigosAlumno", "fechas")
+    FINALIZADO = 1 # Bits de la columna estado
+    CORRECTO = 2
+
+    def __init__(self):
+        self.posiciones = {} # idPrestamo -> posición en las columnas
+        self.periodo = array("q")
+        self.dia = array("q")
+        self.libro = array("q")
+        self.alumno = array("q")
+        self.dias = array("q")
+        self.estado = array("B")
+        self.idsLibro = [] # código -> idLibro
+        self.codigosLibro = {} # idLibro -> código
+        self.idsAlumno = []
+        self.codigosAlumno = {}
+        self.fechas = {} # fechaInicio -> (período, ordinal), cada fecha se interpreta una sola vez
+
+    @staticmethod
+    def codificar(_codigos, _ids, _id):
+        """
+        Devuelve el código entero de un ID, asignándole el siguiente si es la primera vez que aparece.
+        """
+        codigo = _codigos.get(_id)
+        if codigo is None:
+            codigo = len(_ids)
+            _codigos[_id] = codigo
+            _ids.append(_id)
+        return codigo
+
+    @classmethod
+    def estadoDe(cls, _prestamo):
+        """
+        Arma los bits de estado de un préstamo: finalizado y, si lo está, devuelto correctamente.
+        """
+        if _prestamo.fechaFinalizacion == "":
+            return 0
+        return cls.FINALIZADO | (cls.CORRECTO if _prestamo.get("estadoDevolucionCorrecto", True) else 0)
+
+    def agregar(self, _clave, _prestamo):
+        """
+        Agrega un préstamo al final de las columnas o, si ya estaba, actualiza sus días y su estado
+        (lo único que cambia al finalizarlo).
+        """
+        posicion = self.posiciones.get(_clave)
+        if posicion is not None:
+            self.dias[posicion] = _prestamo.cantidadDias
+            self.estado[posicion] = self.estadoDe(_prestamo)
+            return None
+
+        fecha = _prestamo.fechaInicio
+        if fecha not in self.fechas:
+            anio, mes, dia = int(fecha[0:4]), int(fecha[5:7]), int(fecha[8:10])
+            self.fechas[fecha] = (anio * 12 + mes - 1, datetime(anio, mes, dia).toordinal())
+        periodo, ordinal = self.fechas[fecha]
+        self.posiciones[_clave] = len(self.periodo)
+        self.periodo.append(periodo)
+        self.dia.append(ordinal)
+        self.libro.append(self.codificar(self.codigosLibro, self.idsLibro, _prestamo.idLibro))
+        self.alumno.append(self.codificar(self.codigosAlumno, self.idsAlumno, _prestamo.idAlumno))
+        self.dias.append(_prestamo.cantidadDias)
+        self.estado.append(self.estadoDe(_prestamo))
+        return None
+
+    @classmethod
+    def desdePrestamos(cls, _prestamos):
+        """
+        Arma las columnas de todo un historial en una única pasada.
+        """
+        columnas = cls()
+        for clave, prestamo in _prestamos.items():
+            columnas.agregar(clave, prestamo)
+        return columnas
+
+class IndiceTexto:
+    """
+    Índice invertido de palabras sobre campos de texto de una colección (ver CAMPOS_DE_BUSQUEDA).
+    Las palabras se guardan sin tildes ni mayúsculas ("García" y "garcia" son la misma) y cada una
+    apunta al conjunto de claves de los registros que la contienen: una búsqueda es la intersección
+    de esos conjuntos, sin recorrer la colección. Está al día mientras cargarArchivo siga
+    devolviendo el mismo diccionario sobre el que se armó; guardarRegistro le aplica cada cambio.
+    """
+    __slots__ = ("campos", "diccionario", "claves", "palabras")
+    PATRON_PALABRA = re.compile(r"\w+")
+    SIN_TILDES = {} # palabra con tildes -> sin tildes; cada una se descompone una sola vez
+
+    def __init__(self, _campos, _diccionario):
+        self.campos = [atributoDeCampo(campo) for campo in _campos]
+        self.diccionario = _diccionario
+        self.claves = {} # palabra -> set de claves de los registros que la contienen
+        self.palabras = {} # clave -> palabras indexadas del registro, para quitarlas al modificarlo
+
+    @classmethod
+    def normalizar(cls, _texto):
+        """
+        Separa un texto en palabras en minúsculas y sin tildes ni diéresis (la ñ queda como n).
+        """
+        texto = _texto.casefold()
+        palabras = cls.PATRON_PALABRA.findall(texto)
+        if texto.isascii():
+            return palabras
+        for posicion, palabra in enumerate(palabras):
+            if not palabra.isascii():
+                sinTildes = cls.SIN_TILDES.get(palabra)
+                if sinTildes is None:
+                    sinTildes = "".join(
+                        letra for letra in unicodedata.normalize("NFD", palabra) if not unicodedata.combining(letra)
+                    )
+                    cls.SIN_TILDES[palabra] = sinTildes
+                palabras[posicion] = sinTildes
+        return palabras
+
+    def palabrasDe(self, _registro):
+        """
+        Obtiene las palabras normalizadas, sin repetir, de los campos indexados de un registro.
+        """
+        texto = " ".join(valor for valor in (getattr(_registro, campo, None) for campo in self.campos) if isinstance(valor, str))
+        return frozenset(self.normalizar(texto))
+
+    def actualizar(self, _clave, _registro):
+        """
+        Indexa un registro nuevo o reemplaza las palabras de uno modificado.
+        """
+        nuevas = self.palabrasDe(_registro)
+        anteriores = self.palabras.get(_clave, frozenset())
+        for palabra in anteriores - nuevas:
+            claves = self.claves[palabra]
+            claves.discard(_clave)
+            if not claves:
+                del self.claves[palabra]
+        for palabra in nuevas - anteriores:
+            self.claves.setdefault(palabra, set()).add(_clave)
+        self.palabras[_clave] = nuevas
+        return None
+
+    def buscar(self, _texto):
+        """
+        Busca los registros que contienen todas las palabras de un texto, en cualquiera de los
+        campos indexados. Se intersecta empezando por la palabra menos frecuente.
+
+        Retorno:
+            set: Claves de los registros que coinciden (vacío si el texto no tiene palabras).
+        """
+        palabras = self.normalizar(_texto)
+        if not palabras:
+            return set()
+        conjuntos = sorted((self.claves.get(palabra, set()) for palabra in set(palabras)), key=len)
+        return conjuntos[0].intersection(*conjuntos[1:])
+
+    @classmethod
+    def desdeRegistros(cls, _campos, _diccionario):
+        """
+        Arma el índice de toda una colección en una única pasada. Los conjuntos no forman ciclos:
+        se pausa el recolector mientras se crean.
+        """
+        indice = cls(_campos, _diccionario)
+        claves, palabras = indice.claves, indice.palabras
+        gcActivo = gc.isenabled()
+        gc.disable()
+        try:
+            for clave, registro in _diccionario.items():
+                nuevas = indice.palabrasDe(registro)
+                palabras[clave] = nuevas
+                for palabra in nuevas:
+                    conjunto = claves.get(palabra)
+                    if conjunto is None:
+                        claves[palabra] = {clave}
+                    else:
+                        conjunto.add(clave)
+        finally:
+            if gcActivo:
+                gc.enable()
+        return indice
+
+class IndiceTolerante(IndiceTexto):
+    """
+    Índice de búsqueda que además encuentra palabras por su comienzo ("mart" -> "martinez") y,
+    si así no hay resultados, tolera un error de tipeo por palabra: una letra de más, de menos,
+    cambiada o dos letras invertidas ("fernandes" -> "fernandez"). El vocabulario se guarda
+    ordenado para los prefijos, y cada palabra con una letra borrada apunta a las palabras de las
+    que sale, para encontrar las parecidas sin compararlas con todo el vocabulario.
+    """
+    __slots__ = ("vocabulario", "variantes")
+    MIN_LARGO_TOLERANTE = 4 # Las palabras más cortas, o con números (ej. "ana145" de un email), solo se buscan por prefijo
+
+    def __init__(self, _campos, _diccionario):
+        super().__init__(_campos, _diccionario)
+        self.vocabulario = [] # palabras indexadas, ordenadas
+        self.variantes = {} # palabra o palabra con una letra borrada -> palabras del vocabulario
+
+    @classmethod
+    def variantesDe(cls, _palabra):
+        """
+        Arma la palabra y cada versión suya con una letra borrada (vacío si es muy corta o no es
+        solo letras).
+        """
+        if len(_palabra) < cls.MIN_LARGO_TOLERANTE or not _palabra.isalpha():
+            return set()
+        return {_palabra} | {_palabra[:posicion] + _palabra[posicion + 1:] for posicion in range(len(_palabra))}
+
+    def agregarPalabra(self, _palabra):
+        """
+        Suma al vocabulario una palabra que acaba de aparecer en el índice.
+        """
+        bisect.insort(self.vocabulario, _palabra)
+        for variante in self.variantesDe(_palabra):
+            self.variantes.setdefault(variante, set()).add(_palabra)
+        return None
+
+    def quitarPalabra(self, _palabra):
+        """
+        Quita del vocabulario una palabra que ya no tiene ningún registro.
+        """
+        posicion = bisect.bisect_left(self.vocabulario, _palabra)
+        if posicion < len(self.vocabulario) and self.vocabulario[posicion] == _palabra:
+            del self.vocabulario[posicion]
+        for variante in self.variantesDe(_palabra):
+            palabras = self.variantes.get(variante)
+            if palabras is not None:
+                palabras.discard(_palabra)
+                if not palabras:
+                    del self.variantes[variante]
+        return None
+
+    def actualizar(self, _clave, _registro):
+        """
+        Indexa un registro nuevo o modificado y mantiene el vocabulario con las palabras que
+        aparecen o dejan de aparecer.
+        """
+        anteriores = self.palabras.get(_clave, frozenset())
+        super().actualizar(_clave, _registro)
+        nuevas = self.palabras[_clave]
+        for palabra in nuevas - anteriores:
+            if len(self.claves[palabra]) == 1: # Recién apareció
+                self.agregarPalabra(palabra)
+        for palabra in anteriores - nuevas:
+            if palabra not in self.claves:
+                self.quitarPalabra(palabra)
+        return None
+
+    def coincidencias(self, _palabra, _tolerante):
+        """
+        Junta las claves de los registros con alguna palabra que empieza con _palabra o, si
+        _tolerante, que está a un error de tipeo de ella.
+        """
+        # Las palabras que empiezan con _palabra son un tramo contiguo del vocabulario ordenado
+        desde = bisect.bisect_left(self.vocabulario, _palabra)
+        hasta = bisect.bisect_left(self.vocabulario, _palabra[:-1] + chr(ord(_palabra[-1]) + 1))
+        palabras = set(self.vocabulario[desde:hasta])
+        if _tolerante:
+            for variante in self.variantesDe(_palabra):
+                palabras |= self.variantes.get(variante, set())
+
+        # Con una sola palabra se devuelve su conjunto sin copiarlo: quien lo recibe no lo modifica
+        if len(palabras) == 1:
+            return self.claves[palabras.pop()]
+        return set(itertools.chain.from_iterable(map(self.claves.__getitem__, palabras)))
+
+    def buscar(self, _texto):
+        """
+        Busca los registros que tienen, para cada palabra del texto, alguna palabra que empieza
+        con ella. Si no hay ninguno, repite la búsqueda tolerando un error de tipeo por palabra.
+
+        Retorno:
+            set: Claves de los registros que coinciden (vacío si el texto no tiene palabras).
+        """
+        palabras = set(self.normalizar(_texto))
+        if not palabras:
+            return set()
+        for tolerante in (False, True):
+            conjuntos = []
+            for palabra in palabras:
+                claves = self.coincidencias(palabra, tolerante)
+                if not claves: # Sin esta palabra no hay coincidencias: no hace falta buscar las demás
+                    break
+                conjuntos.append(claves)
+            else:
+                conjuntos.sort(key=len)
+                resultado = conjuntos[0].intersection(*conjuntos[1:])
+                if resultado:
+                    return resultado
+        return set()
+
+    @classmethod
+    def desdeRegistros(cls, _campos, _diccionario):
+        """
+        Arma el índice de toda una colección y su vocabulario en una única pasada.
+        """
+        indice = super().desdeRegistros(_campos, _diccionario)
+        indice.vocabulario = sorted(indice.claves)
+        for palabra in indice.vocabulario:
+            for variante in indice.variantesDe(palabra):
+                indice.variantes.setdefault(variante, set()).add(palabra)
+        return indice
+
+CLASES_DE_BUSQUEDA = { # archivo JSON -> clase de su índice de búsqueda (ver CAMPOS_DE_BUSQUEDA)
+    LIBROS_ARCHIVO: IndiceTexto,
+    ALUMNOS_ARCHIVO: IndiceTolerante,
+}
+
 # ----------------------------------------------------------------------------------------------
 # FUNCIONES
 # ----------------------------------------------------------------------------------------------
@@ -64,13 +721,7 @@ def esEmailValido(_dato):
     try:
         if _dato is None or _dato.strip() == "":
             return False
-        pat = (
-            r"^[a-zA-Z0-9_.+-]+"   # Usuario: letras, números y caracteres . _ + -
-            r"@"                   # Símbolo @ obligatorio
-            r"[a-zA-Z0-9-]+\."     # Dominio: letras, números, guiones y punto
-            r"[a-zA-Z0-9-.]+$"       # Extensión: letras, números, guiones y punto
-        )
-        return re.match(pat, _dato) is not None
+        return PATRON_EMAIL.match(_dato) is not None
     except Exception as e:
         print(f"Error inesperado en la validación de email: {e}")
         return False
@@ -109,18 +760,14 @@ def esIdValido(_dato):
     try:
         if _dato is None or _dato.strip() == "":
             return False
-        patron = (
-            r"^[A-Za-z]"   # Una letra inicial (A-Z o a-z)
-            r"\d+$"        # Uno o más dígitos          
-        )
-        return re.match(patron, _dato) is not None
+        return PATRON_ID.match(_dato) is not None
     except Exception as e:
         print(f"Error inesperado en la validación de ID: {e}")
         return False
 
 def esIdPrestamoValido(_dato):
     """
-    Valida que una cadena tenga formato 'YYYY.MM.DD HH:MM:SS'.
+    Valida que una cadena tenga formato 'YYYY.MM.DD HH:MM:SS' o 'YYYY.MM.DD HH:MM:SS.ffffff'.
 
     Parámetros:
         _dato (str): Cadena a validar como ID de préstamo.
@@ -131,16 +778,7 @@ def esIdPrestamoValido(_dato):
     try:
         if _dato is None or _dato.strip() == "":
             return False
-
-        patron = (
-            r"^\d{4}\."                       # Año (4 números) + punto
-            r"(0[1-9]|1[0-2])\."              # Mes (01-12) + punto
-            r"(0[1-9]|[12]\d|3[01]) "         # Día (01-31) + espacio
-            r"([01]\d|2[0-3]):"               # Hora (00-23) + ':'
-            r"[0-5]\d:"                       # Minuto (00-59) + ':'
-            r"[0-5]\d$"                       # Segundo (00-59)
-        )
-        return re.match(patron, _dato) is not None
+        return PATRON_ID_PRESTAMO.match(_dato) is not None
     except Exception as e:
         print(f"Error inesperado en la validación de ID de préstamo: {e}")
         return False
@@ -158,11 +796,7 @@ def esDireccionValida(_dato):
     try:
         if _dato is None or _dato.strip() == "":
             return False
-        patron = (
-            r"^[A-Za-zÁÉÍÓÚáéíóúÑñ0-9\.]+"          # Primer bloque: letras, números y punto
-            r"(?: [A-Za-zÁÉÍÓÚáéíóúÑñ0-9\.]+)*$"    # Bloques opcionales: espacio + letras, números y punto
-        )
-        return re.match(patron, _dato) is not None
+        return PATRON_DIRECCION.match(_dato) is not None
     except Exception as e:
         print(f"Error inesperado en la validación de dirección: {e}")
         return False
@@ -181,15 +815,7 @@ def sonAutoresValidos(_dato):
     try:
         if _dato is None or _dato.strip() == "":
             return False
-        patrón = (
-            r'^[A-Za-zÁÉÍÓÚáéíóúÜüÑñ]+'                 # Nombre del primer autor (obligatorio): al menos una letra
-            r'(?:\s+[A-Za-zÁÉÍÓÚáéíóúÜüÑñ]+)*'          # Posibles espacios + segundos nombres o apellidos
-            r'(?:\s*,\s*'                               # Coma y espacios opcionales
-            r'[A-Za-zÁÉÍÓÚáéíóúÜüÑñ]+'                  # Nombre del siguiente autor (opcional)
-            r'(?:\s+[A-Za-zÁÉÍÓÚáéíóúÜüÑñ]+)*)'         # Posibles espacios + segundos nombres o apellidos
-            r'{0,2}$'                                   # Bloque opcional: máximo 2 repeticiones. Total: 3 autores (1 obligatorio + 2 opcionales)
-    )
-        return re.match(patrón, _dato) is not None
+        return PATRON_AUTORES.match(_dato) is not None
     except Exception as e:
         print(f"Error inesperado en la validación de autores: {e}")
         return False
@@ -207,17 +833,51 @@ def esStringValido(_dato):
     try:
         if _dato is None or _dato.strip() == "":
             return False
-        
-        patron = (
-            r"^[A-Za-zÁÉÍÓÚáéíóúÑñ]+"           # Al menos una letra válida al inicio
-            r"(?:\s+[A-Za-zÁÉÍÓÚáéíóúÑñ]+)*$"     # Bloques opcionales separados por espacios
-        )
-        
-        return re.match(patron, _dato) is not None
+
+        return PATRON_STRING.match(_dato) is not None
     except Exception as e:
         print(f"Error inesperado en la validación de string: {e}")
         return False
 
+# Registro de validadores por tipo de dato, con los nombres de tipo usados en los esquemas
+VALIDADORES = {
+    "email": esEmailValido,
+    "numero": esNumeroValido,
+    "id": esIdValido,
+    "idPrestamo": esIdPrestamoValido,
+    "direccion": esDireccionValida,
+    "autores": sonAutoresValidos,
+    "string": esStringValido,
+}
+
+def obtenerValidador(_validacion):
+    """
+    Selecciona la función de validación que corresponde a un tipo de dato.
+
+    Parámetros:
+        _validacion (str): Tipo de validación ("email", "numero", "id", "idPrestamo", "direccion",
+        "autores" o por defecto "string").
+
+    Retorno:
+        function: Validador que recibe una cadena y devuelve bool.
+    """
+    return VALIDADORES.get(_validacion, esStringValido)
+
+def validarDatos(_validacion, _datos):
+    """
+    Valida muchos valores de un mismo tipo en una sola llamada (ej. una columna de un archivo a
+    importar), resolviendo el validador una única vez.
+
+    Parámetros:
+        _validacion (str): Tipo de validación (clave de VALIDADORES; por defecto "string").
+        _datos (iterable): Cadenas a validar.
+
+    Retorno:
+        list: Un bool por cada valor, en el mismo orden.
+    """
+    validador = obtenerValidador(_validacion)
+    return [validador("" if dato is None else str(dato)) for dato in _datos]
+
 def validarDato(_dato, _etiqueta, _validacion):
     """
     Pide al usuario un dato hasta que pase la validación indicada.
@@ -234,20 +894,7 @@ def validarDato(_dato, _etiqueta, _validacion):
     """
     try:
         # Selección del validador en base al tipo solicitado
-        if _validacion == "email":
-            validador = esEmailValido
-        elif _validacion == "numero":
-            validador = esNumeroValido
-        elif _validacion == "id":
-            validador = esIdValido
-        elif _validacion == "idPrestamo":
-            validador = esIdPrestamoValido
-        elif _validacion == "direccion":
-            validador = esDireccionValida
-        elif _validacion == "autores":
-            validador = sonAutoresValidos
-        else:
-            validador = esStringValido
+        validador = obtenerValidador(_validacion)
 
         dato = _dato.strip()
 
@@ -259,940 +906,5038 @@ def validarDato(_dato, _etiqueta, _validacion):
         print(f"Error inesperado en la validación del dato: {e}")
         return ""
 
-def cargarArchivo(_direccion):
+def firmaArchivo(_direccion):
     """
-    Carga un archivo JSON y devuelve su contenido como diccionario.
+    Calcula la firma (fecha de modificación y tamaño) de un archivo y de su diario, si lo tiene.
+    Si la firma no cambió, el contenido tampoco.
 
     Parámetros:
         _direccion (str): Ruta del archivo JSON.
 
     Retorno:
-        dict: Contenido del JSON.
-        None: Si hay un error al abrir o parsear el archivo.
+        tuple: (mtime, tamaño) del archivo seguido de (mtime, tamaño) del diario o None si no existe.
     """
-    try:
-        archivo = open(_direccion, mode="r", encoding="utf-8")
-        diccionario = json.load(archivo)
-        archivo.close()
-        return diccionario
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
-        return None
-
-def escribirArchivo(_direccion, _diccionario):
+    estado = os.stat(_direccion)
+    firma = (estado.st_mtime_ns, estado.st_size)
+    diario = diarioDe(_direccion)
+    if diario is not None:
+        try:
+            estadoDiario = os.stat(diario)
+            firma += ((estadoDiario.st_mtime_ns, estadoDiario.st_size),)
+        except FileNotFoundError:
+            firma += (None,)
+    return firma
+
+def diarioDe(_direccion):
     """
-    Escribe un diccionario en un archivo JSON.
+    Obtiene la ruta del diario de un archivo, si lo lleva: los de DIARIOS y la partición abierta
+    de cada mes (ej. prestamos_por_mes/2025-05.json -> prestamos_por_mes/2025-05.diario.jsonl).
 
     Parámetros:
         _direccion (str): Ruta del archivo JSON.
-        _diccionario (dict): Diccionario a escribir.
-    
+
     Retorno:
-        None: Se escribe el archivo JSON y devuelve None. En caso de error al abrir o parsear 
-        el archivo, lo informa y devuelve None.
+        str|None: Ruta del diario, o None si el archivo se reescribe siempre completo.
     """
-    try:
-        archivo = open(_direccion, mode="w", encoding="utf-8")
-        json.dump(_diccionario, archivo, ensure_ascii=False, indent=4)
-        archivo.close()
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
+    if _direccion in DIARIOS:
+        return DIARIOS[_direccion]
+    if esParticion(_direccion):
+        return _direccion[:-len(".json")] + PARTICION_DIARIO_EXTENSION
+    return None
 
-def pedirYValidarId(_diccionario, _etiqueta, _validarExistente, _validacion):
+def esParticion(_direccion):
     """
-    Solicita un ID y valida su existencia o inexistencia según lo que se ingrese como parámetro.
+    Indica si una ruta es la partición abierta de un mes (ver rutaParticion).
 
     Parámetros:
-        _diccionario (dict): Diccionario donde buscar la existencia o inexistencia de un valor.
-        _etiqueta (str): Nombre para el mensaje de error (ej. "alumno", "libro").
-        _validarExistente (bool): True si el ID debe existir y estar activo, False si debe ser nuevo.
-        _validacion (str): Tipo de validación para el ID ("id" o "idPrestamo").
+        _direccion (str): Ruta del archivo.
 
     Retorno:
-        str|None: ID validado (en mayúsculas) o None si el usuario ingresa '0' para volver o se captura 
-        una excepción.
+        bool: True si es un archivo .json de PARTICIONES_DIRECTORIO.
     """
-    try:
-        entrada = validarDato(input(f"Ingrese el ID del {_etiqueta}: "), "id", _validacion).strip().upper()
+    return os.path.dirname(_direccion) == PARTICIONES_DIRECTORIO and _direccion.endswith(".json")
 
-        # Caso id préstamo: chequeo de 'fechaFinalizacion' para saber si sigue activo
-        if _validacion == "idPrestamo" and _validarExistente:
-            valido = False
-            while not valido:
-                if entrada == "0": # Opción de volver
-                    return None
-                
-                if entrada not in _diccionario: # Chequeo existencia del id
-                    print("Error: el ID de préstamo no existe.")
-                else:
-                    prestamo = _diccionario[entrada]
-                    if prestamo["fechaFinalizacion"] != "":  # Chequeo si está activo
-                        print("Error: el préstamo ya fue finalizado.")
-                    else:
-                        valido = True # fechaFinalizacion == "" (todavía activo)
+def esArchivoDelHistorial(_direccion):
+    """
+    Indica si un archivo es el historial de préstamos o uno de los que se arman a partir de él.
 
-                if not valido:
-                    entrada = validarDato(
-                        input("Por favor ingrese un ID de préstamo válido (0 para volver): "),
-                        "préstamo",
-                        "idPrestamo"
-                    ).strip().upper()
-            return entrada
-        
-        # Caso id alumno/libro: chequeo de campo 'activo'
-        if _validarExistente and _validacion != "idPrestamo":
-            while entrada not in _diccionario or not _diccionario[entrada]["activo"]:
-                print(f"Error: el ID del {_etiqueta} no existe o está inactivo.")
-                entrada = input(f"Por favor, ingrese el ID del {_etiqueta} (0 para volver): ").strip().upper()
-                if entrada == "0": # Opción de volver
-                    return None
-                else:
-                    entrada = validarDato(entrada, "id", _validacion).upper()
+    Parámetros:
+        _direccion (str): Ruta del archivo.
 
-            return entrada
-        else:
-            # Caso creación de nuevo id: chequeo de no existencia previa
-            while entrada in _diccionario:
-                print(f"Error: el ID del {_etiqueta} que ingresó ya existe.")
-                entrada = input(f"Por favor ingrese un nuevo ID del {_etiqueta} (0 para volver): ").strip().upper()
-                if entrada == "0": # Opción de volver
-                    return None
-                else:
-                    entrada = validarDato(entrada, "id", _validacion).upper()
+    Retorno:
+        bool: True para prestamos.json, ARCHIVOS_DERIVADOS y las particiones.
+    """
+    return _direccion == PRESTAMOS_ARCHIVO or _direccion in ARCHIVOS_DERIVADOS or esParticion(_direccion)
 
-            return entrada
-    except Exception as e:
-        print(f"Error inesperado en el pedido y validación de ID: {e}")
-        return None
-    
-def obtenerValor(_etiqueta, _tipoDato):
+def aplicarEntradas(_diccionario, _entradas):
     """
-    Pide al usuario el valor correspondiente a un campo y lo valida según su tipo de dato.
+    Aplica sobre un diccionario entradas de diario o de un lote. Una entrada con registro None
+    borra la clave.
 
     Parámetros:
-        _etiqueta (str): Nombre del campo a solicitar (ej. "autores", "costo", etc.).
-        _tipoDato (str): Tipo de validación a aplicar ("autores", "numero", "string", "email", "direccion", etc.).
+        _diccionario (dict): Contenido del archivo.
+        _entradas (iterable): Tuplas (clave, registro).
 
     Retorno:
-        dict|int|str|None: 
-            - Si el campo es "autores", devuelve un diccionario con las claves "autor1", "autor2" y "autor3".  
-            - Si el tipo de dato es "numero", devuelve un entero.  
-            - Para otros tipos, devuelve la cadena validada.
-            - Si se captura una excepción lo informa y devuelve None.
+        None: Se modifica el diccionario y devuelve None.
     """
-    try:
-        if _etiqueta == "autores":
-            autores = validarDato(input("\nIngresar autores (separados por coma, máx 3): ").strip(), "autores", "autores")
-            autoresCortados = [
-                parte.strip() for parte in autores.split(",") if parte.strip() # Separa la cadena de autores por coma y elimina los espacios en blanco al ppio y al final
-            ]
-            autoresRellenados = (autoresCortados + ["", "", ""])[:3] # Rellena con 3 cadenas vacías y aplica un slice para solo obtener 3 elementos
-            return {
-                "autor1": autoresRellenados[0], # Completa el diccionario con cada uno de los elementos
-                "autor2": autoresRellenados[1],
-                "autor3": autoresRellenados[2],
-            }
-
-        if _tipoDato == "numero":
-            mensaje = "Ingresar costo de garantía ($): " if _etiqueta == "costo" else f"Ingresar {_etiqueta}: "
-            entrada = validarDato(input(mensaje), _etiqueta, "numero")
-            return int(entrada)
-
-        # Valida el resto de los tipos de datos (string, email, dirección, etc.)
-        mensaje = f"Ingresar {_etiqueta}: "
-        entrada = validarDato(input(mensaje), _etiqueta, _tipoDato)
-        return entrada
-    except Exception as e:
-        print(f"Error inesperado al obtener valor: {e}")
-        return None
+    for clave, registro in _entradas:
+        if registro is None:
+            _diccionario.pop(clave, None)
+        else:
+            _diccionario[clave] = registro
+    return None
 
-def asignarValorEnRegistro(_registro, _campo, _valor):
+def serializarRegistro(_objeto):
     """
-    Asigna un valor a un registro, creando diccionarios anidados si el campo incluye puntos.
+    Convierte un registro a su forma JSON; se pasa como default= a json.dump/json.dumps.
 
     Parámetros:
-        _registro (dict): Diccionario donde se guardará el valor.
-        _campo (str): Ruta del campo, que puede incluir niveles separados por ".".
-        _valor: Valor a asignar en el registro.
+        _objeto: Objeto que json no sabe serializar.
 
     Retorno:
-        None: Se modifica el diccionario y devuelve None. Si se captura una excepción lo informa 
-        y devuelve None.
+        dict: Forma JSON del registro.
     """
-    try:
-        if "." in _campo: # Caso de ruta anidada
-            partes = _campo.split(".") # Separa la ruta por punto
-            nodo = _registro
-            for parte in partes[:-1]: # Itera los valores de la ruta sin incluir el último para garantizar que existan
-                try:
-                    nodo = nodo[parte] # Intenta apuntar al valor de ruta de esa iteración
-                except KeyError: # Si el valor no existe lanzará KeyError
-                    nodo[parte] = {} # Crea el diccionario anidado para ese valor
-                    nodo = nodo[parte] # Apunta a ese valor
-            nodo[partes[-1]] = _valor # Asigna el valor a la última clave de la ruta
-        else:
-            _registro[_campo] = _valor
-        return None
-    except Exception as e:
-        print(f"Error inesperado al asignar valor al registro: {e}")
-        return None
+    if isinstance(_objeto, Registro):
+        return _objeto.aDiccionario()
+    raise TypeError(f"{type(_objeto).__name__} no se puede serializar a JSON")
 
-def crearRegistro(_ruta, _etiqueta, _esquema):
+def comoRegistro(_direccion, _clave, _registro):
     """
-    Pide datos al usuario según un esquema y crea un nueva registro en el archivo JSON.
+    Convierte un registro en forma de diccionario a la clase de su colección (ver
+    CLASES_DE_REGISTRO). Los que ya son registros y los de otros archivos se devuelven tal cual.
 
     Parámetros:
-        _ruta (str): Ruta del archivo JSON donde se guardaran los registros.
-        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
-        _esquema (dict): Estructura que define el campo ID y la lista de campos que se pediran.
-    
+        _direccion (str): Ruta del archivo JSON de la colección.
+        _clave (str): Clave del registro.
+        _registro (dict|Registro): Registro.
+
     Retorno:
-        None: Se crea el registro, se guarda sobre el archivo JSON y devuelve None. Si el usuario 
-        ingresa '0' para volver o se captura una excepción se informa y devuelve None.
+        Registro|dict: Registro convertido.
     """
-    try:
-        diccionario = cargarArchivo(_ruta)
-
-        # Pide y valida el id
-        idValidador = _esquema['id']
-        id = pedirYValidarId(diccionario, _etiqueta, False, idValidador)
-        if id is None:
-            return None
+    if isinstance(_registro, dict) and _direccion in CLASES_DE_REGISTRO:
+        return CLASES_DE_REGISTRO[_direccion].desdeDiccionario(_registro, _clave)
+    return _registro
 
-        # Crea el registro con el flag activo True
-        registro = {'activo': True}
+def convertirRegistros(_direccion, _diccionario):
+    """
+    Convierte todos los registros de una colección recién leída a su clase, internando las claves.
 
-        # Construye el mapa donde vuelca el esquema con el formato: etiqueta -> (campoReal, tipoDato)
-        opciones = {
-            etiqueta: (campoReal, tipoDato)
-            for etiqueta, campoReal, tipoDato in _esquema['campos']
-        }
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON de la colección.
+        _diccionario (dict): Contenido leído (clave -> diccionario).
 
-        # Para cada campo del esquema pide el valor y lo asigna
-        for etiqueta, (campoReal, tipoDato) in opciones.items():
-            valor = obtenerValor(etiqueta, tipoDato)
-            asignarValorEnRegistro(registro, campoReal, valor)
+    Retorno:
+        dict: Clave -> registro. Los archivos que no son colecciones se devuelven tal cual.
+    """
+    if _direccion not in CLASES_DE_REGISTRO:
+        return _diccionario
+    clase = CLASES_DE_REGISTRO[_direccion]
+    registros = {}
+    for clave, datos in _diccionario.items():
+        clave = sys.intern(clave)
+        registros[clave] = clase.desdeDiccionario(datos, clave)
+    return registros
 
-        # En el caso de alumno inicializa las infracciones en 0
-        if _etiqueta == "alumno":
-            registro["infracciones"] = 0
+def cargarArchivo(_direccion):
+    """
+    Carga un archivo JSON y devuelve su contenido como diccionario. Mientras el archivo no cambie
+    (misma firma) devuelve el diccionario ya parseado en vez de volver a leerlo, por lo que quien
+    modifique el diccionario devuelto debe guardarlo con escribirArchivo o guardarRegistro. Con el
+    motor sqlite la tabla se lee completa solo cuando otra conexión confirmó cambios desde la
+    última lectura (ver versionDeLaBase); los de este proceso se aplican sobre la caché al guardarlos.
 
-        # Asigna el registro correspondiente al id en el diccionario
-        diccionario[id] = registro
-        
-        escribirArchivo(_ruta, diccionario)
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON.
 
-        print(f"{_etiqueta.capitalize()} {id} registrado correctamente.")
-        return None
-    except (FileNotFoundError, OSError) as detalle:
+    Retorno:
+        dict: Contenido del JSON.
+        None: Si hay un error al abrir o parsear el archivo.
+    """
+    try:
+        # Dentro de un lote cada archivo se lee una sola vez y se trabaja sobre esa copia en memoria
+        if loteActual is not None and _direccion in loteActual["diccionarios"]:
+            return loteActual["diccionarios"][_direccion]
+
+        if usaBaseDatos(_direccion):
+            firma = versionDeLaBase()
+            if _direccion in cacheArchivos and cacheArchivos[_direccion][0] == firma:
+                diccionario = cacheArchivos[_direccion][1]
+            else:
+                diccionario = cargarTabla(TABLAS_SQLITE[_direccion])
+                sumarMetrica("registrosLeidos", len(diccionario))
+                cacheArchivos[_direccion] = (firma, diccionario)
+            if loteActual is not None:
+                sumarAlLote(_direccion, diccionario)
+            return diccionario
+
+        firma = firmaArchivo(_direccion)
+        if _direccion in cacheArchivos and cacheArchivos[_direccion][0] == firma:
+            diccionario = cacheArchivos[_direccion][1]
+            if loteActual is not None:
+                sumarAlLote(_direccion, diccionario)
+            return diccionario
+
+        # Si la foto binaria está al día con el JSON se usa en su lugar (los lectores no la escriben)
+        diccionario = leerSnapshot(_direccion, firma)
+        if diccionario is None:
+            archivo = open(_direccion, mode="r", encoding="utf-8")
+            diccionario = json.load(archivo)
+            archivo.close()
+
+            # Si el archivo lleva diario, aplica sobre la última foto los cambios posteriores
+            diario = diarioDe(_direccion)
+            if diario is not None:
+                aplicarEntradas(diccionario, leerDiario(diario))
+
+            sumarMetrica("bytesLeidos", firma[1] + (firma[2][1] if len(firma) > 2 and firma[2] else 0))
+            sumarMetrica("registrosLeidos", len(diccionario))
+            diccionario = convertirRegistros(_direccion, diccionario)
+
+        cacheArchivos[_direccion] = (firma, diccionario)
+        if loteActual is not None:
+            sumarAlLote(_direccion, diccionario)
+        return diccionario
+    except (FileNotFoundError, OSError, sqlite3.Error) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
         return None
-    except Exception as e:
-        print(f"Error inesperado al crear registro: {e}")
-        return None
 
-def modificarRegistro(_ruta, _etiqueta, _esquema):
+def escribirArchivo(_direccion, _diccionario):
     """
-    Pide un campo y un nuevo valor para modificar un registro existente en el archivo JSON.
+    Escribe un diccionario en un archivo JSON de forma atómica (ver escribirArchivos). Dentro de
+    un lote la escritura se posterga hasta confirmarLote.
 
     Parámetros:
-        _ruta (str): Ruta del archivo JSON donde se guardaran los registros.
-        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
-        _esquema (dict): Estructura que define el campo ID y la lista de campos disponibles para modificar.
-    
+        _direccion (str): Ruta del archivo JSON.
+        _diccionario (dict): Diccionario a escribir.
+
     Retorno:
-        None: Se modifica el registro, se guarda sobre el archivo JSON y devuelve None. Si el usuario 
-        ingresa '0' para volver o se captura una excepción se informa y devuelve None.
+        None: Se escribe el archivo JSON y devuelve None. En caso de error al abrir o parsear
+        el archivo, lo informa y devuelve None.
     """
     try:
-        diccionario = cargarArchivo(_ruta)
+        if loteActual is not None:
+            marcarPendiente(_direccion, _diccionario, None, None)
+            return None
 
-        # Pide y valida el id
+        if usaBaseDatos(_direccion):
+            escribirTabla(TABLAS_SQLITE[_direccion], _diccionario)
+            cacheArchivos[_direccion] = (versionDeLaBase(), _diccionario)
+            return None
+
+        escribirArchivos({_direccion: _diccionario})
+    except (FileNotFoundError, OSError, sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+def igualarPermisos(_temporal, _direccion):
+    """
+    Le da a un temporal de tempfile.mkstemp, que se crea solo para su dueño, los permisos del
+    archivo al que va a reemplazar o, si todavía no existe, los de un archivo nuevo cualquiera.
+
+    Parámetros:
+        _temporal (str): Ruta del temporal.
+        _direccion (str): Ruta del archivo de destino.
+
+    Retorno:
+        None
+    """
+    try:
+        shutil.copymode(_direccion, _temporal)
+    except FileNotFoundError:
+        mascara = os.umask(0)
+        os.umask(mascara)
+        try:
+            os.chmod(_temporal, 0o666 & ~mascara)
+        except OSError:
+            pass
+    except OSError:
+        pass
+    return None
+
+def escribirTemporal(_direccion, _diccionario):
+    """
+    Escribe un diccionario en un archivo temporal junto al destino y lo fuerza a disco (fsync).
+    Cada escritura usa un temporal con nombre propio (tempfile.mkstemp en el mismo directorio),
+    así dos terminales no escriben nunca sobre el mismo temporal.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON de destino.
+        _diccionario (dict): Diccionario a escribir.
+
+    Retorno:
+        str: Ruta del archivo temporal, listo para reemplazar al destino. Si la escritura falla,
+        el temporal se borra y el error se propaga.
+    """
+    descriptor, temporal = tempfile.mkstemp(
+        prefix=os.path.basename(_direccion) + ".", suffix=".tmp", dir=os.path.dirname(os.path.abspath(_direccion))
+    )
+    try:
+        archivo = open(descriptor, mode="w", encoding="utf-8")
+        try:
+            json.dump(_diccionario, archivo, ensure_ascii=False, indent=4, default=serializarRegistro)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+            sumarMetrica("bytesEscritos", archivo.tell())
+            sumarMetrica("registrosEscritos", len(_diccionario))
+        finally:
+            archivo.close()
+        igualarPermisos(temporal, _direccion)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+    return temporal
+
+def sincronizarDirectorio(_direccion):
+    """
+    Fuerza a disco la entrada de directorio de un archivo recién renombrado. En sistemas que no
+    permiten abrir directorios (Windows) no hace nada.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo.
+
+    Retorno:
+        None
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return None
+    descriptor = os.open(os.path.dirname(os.path.abspath(_direccion)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    except OSError: # Algunos sistemas de archivos no lo soportan
+        pass
+    finally:
+        os.close(descriptor)
+    return None
+
+def escribirArchivos(_cambios):
+    """
+    Escribe varios archivos JSON a prueba de cortes, de forma atómica por archivo: primero escribe
+    y fuerza a disco un temporal por archivo y recién después los renombra uno por uno sobre los
+    originales, así cada archivo queda con su versión anterior o la nueva completa, nunca a medio
+    escribir. Entre archivos no hay atomicidad: un corte durante los renombres deja unos con la
+    versión nueva y otros con la anterior. Los diarios de los archivos escritos se vacían porque la
+    foto ya contiene todos sus cambios.
+
+    Parámetros:
+        _cambios (dict): Ruta del archivo JSON -> diccionario a escribir.
+
+    Retorno:
+        None. Los errores de escritura se propagan; si fallan antes de los renombres, los
+        temporales se borran.
+    """
+    reemplazarArchivos(prepararArchivos(_cambios), _cambios)
+    return None
+
+def prepararArchivos(_cambios):
+    """
+    Escribe y fuerza a disco el temporal de cada archivo a reescribir, sin tocar los originales.
+    Si alguno falla, borra los temporales ya escritos y propaga el error.
+
+    Parámetros:
+        _cambios (dict): Ruta del archivo JSON -> diccionario a escribir.
+
+    Retorno:
+        list: Tuplas (ruta del temporal, ruta del archivo), para pasarlas a reemplazarArchivos.
+    """
+    temporales = []
+    try:
+        for direccion, diccionario in _cambios.items():
+            temporales.append((escribirTemporal(direccion, diccionario), direccion))
+    except BaseException:
+        descartarTemporales(temporales)
+        raise
+    return temporales
+
+def descartarTemporales(_temporales):
+    """
+    Borra los temporales de una escritura que no se va a completar.
+
+    Parámetros:
+        _temporales (list): Tuplas (ruta del temporal, ruta del archivo).
+
+    Retorno:
+        None
+    """
+    for temporal, direccion in _temporales:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+    return None
+
+def reemplazarArchivos(_temporales, _cambios):
+    """
+    Renombra los temporales ya escritos sobre sus archivos, vacía los diarios de esos archivos
+    (la foto ya contiene todos sus cambios) y deja lo escrito como versión vigente en la caché. Al
+    final escribe la foto binaria de las colecciones reescritas (ver escribirSnapshot).
+
+    Parámetros:
+        _temporales (list): Tuplas (ruta del temporal, ruta del archivo) de prepararArchivos.
+        _cambios (dict): Ruta del archivo JSON -> diccionario escrito.
+
+    Retorno:
+        None
+    """
+    # El renombre conserva la fecha y el tamaño del temporal: la foto se firma con los del temporal
+    # y no con los del destino, que otra terminal podría reemplazar mientras tanto
+    firmas = {}
+    for temporal, direccion in _temporales:
+        estado = os.stat(temporal)
+        firmas[direccion] = (estado.st_mtime_ns, estado.st_size)
+        os.replace(temporal, direccion)
+    if _temporales:
+        sincronizarDirectorio(_temporales[0][1])
+
+    for direccion, diccionario in _cambios.items():
+        # Si se corta antes de vaciar el diario, al releerlo solo se repiten cambios ya incluidos
+        if diarioDe(direccion) is not None:
+            diario = open(diarioDe(direccion), mode="w", encoding="utf-8")
+            diario.close()
+
+        # Lo escrito pasa a ser la versión vigente en la caché
+        cacheArchivos[direccion] = (firmaArchivo(direccion), diccionario)
+
+    for direccion, diccionario in _cambios.items():
+        escribirSnapshot(direccion, firmas[direccion], diccionario)
+    return None
+
+def leerObjetoJsonPorPartes(_direccion):
+    """
+    Recorre un archivo JSON cuyo contenido es un único objeto ({clave: valor, ...}) y devuelve sus
+    pares de a uno, leyendo el archivo por bloques. En memoria solo quedan el bloque leído y el
+    valor en curso, sin importar el tamaño del archivo.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON.
+
+    Retorno:
+        generator: Tuplas (clave, valor) en el orden del archivo. Si el contenido no es un objeto
+        JSON válido lanza ValueError.
+    """
+    decodificador = json.JSONDecoder()
+    espacios = re.compile(r"[ \t\n\r]*")
+    archivo = open(_direccion, mode="r", encoding="utf-8")
+    try:
+        texto = ""
+        posicion = 0
+        terminado = False
+
+        def leerMas():
+            nonlocal texto, posicion, terminado
+            bloque = archivo.read(TAMANIO_BLOQUE_LECTURA)
+            if bloque == "":
+                terminado = True
+            texto = texto[posicion:] + bloque
+            posicion = 0
+
+        def siguienteCaracter():
+            nonlocal posicion
+            while True:
+                posicion = espacios.match(texto, posicion).end()
+                if posicion < len(texto) or terminado:
+                    return texto[posicion:posicion + 1]
+                leerMas()
+
+        def siguienteValor():
+            # Un valor que llega justo al final del bloque puede estar cortado (ej. un número)
+            nonlocal posicion
+            while True:
+                try:
+                    valor, fin = decodificador.raw_decode(texto, posicion)
+                    if fin < len(texto) or terminado:
+                        posicion = fin
+                        return valor
+                except json.JSONDecodeError:
+                    if terminado:
+                        raise
+                leerMas()
+
+        if siguienteCaracter() != "{":
+            raise ValueError(f"{_direccion} no contiene un objeto JSON")
+        posicion += 1
+        if siguienteCaracter() == "}":
+            return
+        while True:
+            clave = siguienteValor()
+            if siguienteCaracter() != ":":
+                raise ValueError(f"Falta ':' después de la clave {clave!r} en {_direccion}")
+            posicion += 1
+            siguienteCaracter()
+            yield clave, siguienteValor()
+
+            separador = siguienteCaracter()
+            posicion += 1
+            if separador == "}":
+                return
+            if separador != ",":
+                raise ValueError(f"Se esperaba ',' o '}}' después de la clave {clave!r} en {_direccion}")
+            siguienteCaracter()
+    finally:
+        archivo.close()
+
+def leerDiario(_diario):
+    """
+    Lee un diario de cambios (una entrada JSON por línea) en el orden en que fue escrito.
+
+    Parámetros:
+        _diario (str): Ruta del archivo de diario.
+
+    Retorno:
+        list: Lista de tuplas (clave, registro). Si el diario no existe devuelve una lista vacía.
+        Una última línea incompleta (corte durante la escritura) se descarta.
+    """
+    entradas = []
+    try:
+        archivo = open(_diario, mode="rb")
+        for linea in archivo:
+            linea = linea.decode("utf-8", errors="replace").strip()
+            if linea == "":
+                continue
+            try:
+                entrada = json.loads(linea)
+            except ValueError: # Línea cortada por una escritura interrumpida
+                print(f"Aviso: se descartó una entrada incompleta del diario {_diario}.")
+                continue
+            entradas.append((entrada["clave"], entrada["registro"]))
+        archivo.close()
+    except FileNotFoundError:
+        pass
+    return entradas
+
+def formatoFilaSnapshot(_direccion):
+    """
+    Arma el formato binario de ancho fijo de una fila de la foto: la clave y cada columna de
+    SNAPSHOT_COLUMNAS. Los textos se guardan como índice en la tabla de textos de la foto.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON de la colección.
+
+    Retorno:
+        struct.Struct: Formato de la fila.
+    """
+    codigos = {"t": "I", "q": "q", "b": "b"}
+    return struct.Struct("<I" + "".join(codigos[tipo] for campo, tipo in SNAPSHOT_COLUMNAS[_direccion]))
+
+def escribirSnapshot(_direccion, _firma, _diccionario):
+    """
+    Escribe la foto binaria de una colección cuyo JSON completo se acaba de escribir (ver
+    reemplazarArchivos): una cabecera con la fecha y el tamaño del JSON, una tabla con cada texto
+    distinto una sola vez (títulos, nombres, IDs, fechas) y una fila de ancho fijo por registro.
+    La foto corresponde solo al archivo base: el diario se aplica encima al leerla, así que las
+    altas que se agregan al diario no la invalidan. Es una caché: si falla, o si algún valor no
+    entra en su columna (ej. un texto en un campo numérico o con el separador de textos), no se
+    escribe y se sigue leyendo el JSON.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON de la colección.
+        _firma (tuple): (mtime, tamaño) del JSON escrito.
+        _diccionario (dict): Registros de la colección, tal como se escribieron en el JSON.
+
+    Retorno:
+        bool: True si se escribió la foto, False si no.
+    """
+    if _direccion not in SNAPSHOT_COLUMNAS:
+        return False
+    columnas = SNAPSHOT_COLUMNAS[_direccion]
+    fila = formatoFilaSnapshot(_direccion)
+    clase = CLASES_DE_REGISTRO[_direccion]
+
+    indices = {} # texto -> índice en la tabla (el 0 se reserva para None)
+    textos = []
+    def indiceDeTexto(_texto):
+        if _texto is None:
+            return 0
+        indice = indices.get(_texto)
+        if indice is None:
+            if SNAPSHOT_SEPARADOR in _texto:
+                raise ValueError(_texto)
+            textos.append(_texto)
+            indice = indices[_texto] = len(textos)
+        return indice
+
+    filas = bytearray()
+    try:
+        for clave, registro in _diccionario.items():
+            if not isinstance(registro, clase):
+                return False
+            valores = [indiceDeTexto(clave)]
+            for campo, tipo in columnas:
+                valor = getattr(registro, campo)
+                if tipo == "t" and (valor is None or type(valor) is str):
+                    valores.append(indiceDeTexto(valor))
+                elif tipo == "q" and (valor is None or type(valor) is int):
+                    valores.append(SNAPSHOT_ENTERO_NULO if valor is None else valor)
+                elif tipo == "b" and (valor is None or type(valor) is bool):
+                    valores.append(0 if valor is None else 1 + valor)
+                else:
+                    return False
+            filas += fila.pack(*valores)
+    except (struct.error, OverflowError, ValueError):
+        return False
+
+    bloqueTextos = SNAPSHOT_SEPARADOR.join(textos).encode("utf-8")
+    cabecera = SNAPSHOT_CABECERA.pack(SNAPSHOT_MAGIA, _firma[0], _firma[1], len(textos), len(bloqueTextos), len(_diccionario))
+
+    # Cada proceso usa su propio temporal y el último renombre gana
+    destino = _direccion + SNAPSHOT_EXTENSION
+    temporal = None
+    try:
+        descriptor, temporal = tempfile.mkstemp(
+            prefix=os.path.basename(destino) + ".", suffix=".tmp", dir=os.path.dirname(os.path.abspath(destino))
+        )
+        archivo = open(descriptor, mode="wb")
+        try:
+            archivo.write(cabecera)
+            archivo.write(bloqueTextos)
+            archivo.write(filas)
+        finally:
+            archivo.close()
+        igualarPermisos(temporal, destino)
+        os.replace(temporal, destino)
+    except OSError:
+        if temporal is not None and os.path.exists(temporal):
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+        return False
+    sumarMetrica("bytesEscritos", len(cabecera) + len(bloqueTextos) + len(filas))
+    return True
+
+def leerSnapshot(_direccion, _firma):
+    """
+    Carga una colección desde su foto binaria, si la foto corresponde a la fecha y el tamaño
+    actuales del JSON. El archivo se mapea en memoria y las filas se decodifican directamente desde
+    el mapa; cada texto se decodifica una sola vez y lo comparten todos los registros que lo usan.
+    Encima se aplica el diario, que nunca supera MAX_ENTRADAS_DIARIO entradas.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON de la colección.
+        _firma (tuple): Firma actual del JSON (ver firmaArchivo); solo se comparan sus dos primeros valores.
+
+    Retorno:
+        dict: Clave -> registro, igual que al leer el JSON.
+        None: Si no hay foto, está desactualizada o no se puede leer.
+    """
+    if _direccion not in SNAPSHOT_COLUMNAS:
+        return None
+    try:
+        archivo = open(_direccion + SNAPSHOT_EXTENSION, mode="rb")
+    except OSError:
+        return None
+
+    clase = CLASES_DE_REGISTRO[_direccion]
+    fila = formatoFilaSnapshot(_direccion)
+    try:
+        if os.fstat(archivo.fileno()).st_size < SNAPSHOT_CABECERA.size:
+            return None
+        mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magia, mtime, tamanio, cantidadTextos, bytesTextos, cantidadFilas = SNAPSHOT_CABECERA.unpack_from(mapa)
+            if magia != SNAPSHOT_MAGIA or (mtime, tamanio) != _firma[:2]:
+                return None
+            inicioFilas = SNAPSHOT_CABECERA.size + bytesTextos
+            if len(mapa) != inicioFilas + cantidadFilas * fila.size:
+                return None
+
+            # La tabla se decodifica de una vez; el índice 0 es None
+            textos = [None]
+            if cantidadTextos > 0:
+                textos += mapa[SNAPSHOT_CABECERA.size:inicioFilas].decode("utf-8").split(SNAPSHOT_SEPARADOR)
+            if len(textos) != cantidadTextos + 1:
+                return None
+
+            # Decodifica las filas desde el mapa y convierte cada columna de una sola vez. Los
+            # registros no forman ciclos: se pausa el recolector mientras se crean
+            gcActivo = gc.isenabled()
+            gc.disable()
+            try:
+                with memoryview(mapa) as vista:
+                    with vista[inicioFilas:] as bloqueFilas:
+                        filas = list(fila.iter_unpack(bloqueFilas))
+                columnas = list(zip(*filas)) if filas else [()] * (len(SNAPSHOT_COLUMNAS[_direccion]) + 1)
+                del filas
+                logicos = (None, False, True)
+                valores = []
+                for (campo, tipo), columna in zip(SNAPSHOT_COLUMNAS[_direccion], columnas[1:]):
+                    if tipo == "t":
+                        valores.append(map(textos.__getitem__, columna))
+                    elif tipo == "b":
+                        valores.append(map(logicos.__getitem__, columna))
+                    elif SNAPSHOT_ENTERO_NULO in columna:
+                        valores.append([None if valor == SNAPSHOT_ENTERO_NULO else valor for valor in columna])
+                    else:
+                        valores.append(columna)
+                diccionario = dict(zip(map(textos.__getitem__, columnas[0]), itertools.starmap(clase, zip(*valores))))
+            finally:
+                if gcActivo:
+                    gc.enable()
+        finally:
+            mapa.close()
+    except (OSError, ValueError, IndexError, struct.error, BufferError):
+        return None
+    finally:
+        archivo.close()
+
+    # Cambios posteriores a la última escritura del JSON completo
+    diario = diarioDe(_direccion)
+    if diario is not None:
+        for clave, registro in leerDiario(diario):
+            clave = sys.intern(clave)
+            if registro is None:
+                diccionario.pop(clave, None)
+            else:
+                diccionario[clave] = clase.desdeDiccionario(registro, clave)
+
+    sumarMetrica("bytesLeidos", bytesTextos + cantidadFilas * fila.size)
+    sumarMetrica("registrosLeidos", len(diccionario))
+    return diccionario
+
+def contarEntradasDiario(_diario):
+    """
+    Cuenta las entradas de un diario. El diario nunca supera MAX_ENTRADAS_DIARIO, por lo que el
+    costo no depende del tamaño del historial.
+
+    Parámetros:
+        _diario (str): Ruta del archivo de diario.
+
+    Retorno:
+        int: Cantidad de líneas del diario (0 si no existe).
+    """
+    try:
+        archivo = open(_diario, mode="r", encoding="utf-8")
+        cantidad = sum(1 for linea in archivo if linea.strip())
+        archivo.close()
+        return cantidad
+    except FileNotFoundError:
+        return 0
+
+def lineasDeDiario(_entradas):
+    """
+    Arma las líneas de diario (una entrada JSON por línea) de un grupo de registros.
+
+    Parámetros:
+        _entradas (list): Tuplas (clave, registro).
+
+    Retorno:
+        str: Líneas listas para agregar al diario.
+    """
+    return "".join(
+        json.dumps({"clave": clave, "registro": registro}, ensure_ascii=False, default=serializarRegistro) + "\n"
+        for clave, registro in _entradas
+    )
+
+def agregarAlDiario(_direccion, _entradas, _contenido=None):
+    """
+    Agrega registros al final del diario de un archivo con una única escritura y mantiene la caché
+    al día. No compacta: ver compactarDiarioSiEstaLleno.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON base.
+        _entradas (list): Tuplas (clave, registro) a agregar; registro None borra la clave.
+        _contenido (str|None): Las mismas entradas ya armadas con lineasDeDiario, si se tienen.
+
+    Retorno:
+        None
+    """
+    diario = diarioDe(_direccion)
+    firmaPrevia = firmaArchivo(_direccion)
+    contenido = (_contenido if _contenido is not None else lineasDeDiario(_entradas)).encode("utf-8")
+    sumarMetrica("bytesEscritos", len(contenido))
+    sumarMetrica("registrosEscritos", len(_entradas))
+    archivo = open(diario, mode="a+b")
+    try:
+        # Si un corte dejó la última línea a medias, las entradas nuevas empiezan en una línea propia
+        largo = archivo.seek(0, os.SEEK_END)
+        if largo > 0:
+            archivo.seek(largo - 1)
+            if archivo.read(1) != b"\n":
+                contenido = b"\n" + contenido
+        archivo.write(contenido)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    finally:
+        archivo.close()
+
+    # Si la caché estaba al día, le aplica los mismos cambios; si no, la descarta
+    if _direccion in cacheArchivos and cacheArchivos[_direccion][0] == firmaPrevia:
+        diccionario = cacheArchivos[_direccion][1]
+        aplicarEntradas(diccionario, _entradas)
+        firmaNueva = firmaArchivo(_direccion)
+        cacheArchivos[_direccion] = (firmaNueva, diccionario)
+        if _direccion == PRESTAMOS_ARCHIVO:
+            actualizarColumnas(firmaPrevia, firmaNueva, _entradas)
+    else:
+        cacheArchivos.pop(_direccion, None)
+    return None
+
+def compactarDiarioSiEstaLleno(_direccion):
+    """
+    Compacta el diario de un archivo si llegó a MAX_ENTRADAS_DIARIO entradas (ver compactarDiario).
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON base.
+
+    Retorno:
+        None
+    """
+    if contarEntradasDiario(diarioDe(_direccion)) >= MAX_ENTRADAS_DIARIO:
+        compactarDiario(_direccion)
+    return None
+
+def compactarDiario(_direccion):
+    """
+    Vuelca el diario de un archivo sobre su foto completa y lo deja vacío.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON base.
+
+    Retorno:
+        None: Se reescribe el archivo base y devuelve None.
+    """
+    diccionario = cargarArchivo(_direccion)
+    if diccionario is not None:
+        escribirArchivo(_direccion, diccionario)
+    return None
+
+def escribirFotosColecciones():
+    """
+    Reescribe completas las colecciones que se guardan en archivos JSON, vaciando sus diarios, para
+    que quede escrita también su foto binaria (ver reemplazarArchivos). Los lectores no escriben
+    fotos: se usa desde el comando reconstruir, dentro de un lote con las colecciones bloqueadas.
+
+    Retorno:
+        None
+    """
+    for direccion in SNAPSHOT_COLUMNAS:
+        if not usaBaseDatos(direccion) and existeArchivo(direccion):
+            diccionario = cargarArchivo(direccion)
+            if diccionario is not None:
+                escribirArchivo(direccion, diccionario)
+    return None
+
+def guardarRegistro(_direccion, _clave, _registro, _diccionario=None):
+    """
+    Guarda un único registro. Con el motor sqlite actualiza solo su fila; en los archivos con diario
+    agrega una línea al final (costo constante sin importar el tamaño del historial) y compacta cada
+    MAX_ENTRADAS_DIARIO entradas; en el resto reescribe el archivo completo. Dentro de un lote solo
+    lo anota como pendiente (ver marcarPendiente): en los archivos con diario y en sqlite no hace
+    falta tener el archivo cargado.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON.
+        _clave (str): Clave del registro.
+        _registro (dict|None): Registro a guardar, o None para borrar la clave.
+        _diccionario (dict|None): Contenido ya cargado del archivo, para no volver a leerlo cuando
+        hay que reescribirlo completo.
+
+    Retorno:
+        None: Se guarda el registro y devuelve None. En caso de error lo informa y devuelve None.
+    """
+    try:
+        _registro = comoRegistro(_direccion, _clave, _registro)
+        if loteActual is not None:
+            marcarPendiente(_direccion, _diccionario, _clave, _registro)
+        elif usaBaseDatos(_direccion):
+            guardarFila(TABLAS_SQLITE[_direccion], _clave, _registro)
+            actualizarCacheTabla(_direccion, [(_clave, _registro)])
+        elif diarioDe(_direccion) is not None and existeArchivo(_direccion):
+            agregarAlDiario(_direccion, [(_clave, _registro)])
+            compactarDiarioSiEstaLleno(_direccion)
+        else:
+            diccionario = _diccionario if _diccionario is not None else cargarArchivo(_direccion)
+            aplicarEntradas(diccionario, [(_clave, _registro)])
+            escribirArchivo(_direccion, diccionario)
+
+        # Si el índice de búsqueda está armado sobre el diccionario que recibió el registro, lo actualiza
+        indice = indicesTexto.get(_direccion)
+        if indice is not None and _registro is not None and indice.diccionario.get(_clave) is _registro:
+            indice.actualizar(_clave, _registro)
+        return None
+    except (FileNotFoundError, OSError, sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+
+def bloquearArchivos(_direcciones):
+    """
+    Toma el bloqueo exclusivo (advisory) de escritura de uno o más archivos, esperando si otra
+    terminal lo tiene. Cada archivo se bloquea por separado a través de "<archivo>.lock" y siempre
+    en orden alfabético, para que dos terminales no se esperen mutuamente. Las lecturas no toman
+    bloqueo: los archivos se reemplazan de forma atómica, así que un lector ve la versión anterior
+    o la nueva.
+
+    Parámetros:
+        _direcciones (iterable): Rutas de los archivos a bloquear.
+
+    Retorno:
+        list: Rutas bloqueadas en esta llamada (las que este proceso ya tenía no se repiten), para
+        pasarlas luego a liberarArchivos.
+    """
+    nuevos = []
+    for direccion in sorted(set(_direcciones)):
+        if direccion in bloqueosTomados:
+            continue
+        archivo = open(direccion + ".lock", mode="a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                archivo.seek(0)
+                bloqueado = False
+                while not bloqueado:
+                    try:
+                        msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+                        bloqueado = True
+                    except OSError: # LK_LOCK se rinde a los 10 segundos: se sigue esperando
+                        pass
+        except BaseException:
+            archivo.close()
+            liberarArchivos(nuevos)
+            raise
+        bloqueosTomados[direccion] = archivo
+        nuevos.append(direccion)
+    return nuevos
+
+def liberarArchivos(_direcciones):
+    """
+    Libera los bloqueos de escritura tomados con bloquearArchivos.
+
+    Parámetros:
+        _direcciones (iterable): Rutas de los archivos a liberar.
+
+    Retorno:
+        None
+    """
+    for direccion in _direcciones:
+        archivo = bloqueosTomados.pop(direccion, None)
+        if archivo is None:
+            continue
+        try:
+            if fcntl is not None:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                archivo.seek(0)
+                msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            archivo.close()
+    return None
+
+def iniciarLote(_archivos=()):
+    """
+    Inicia un lote: a partir de aquí cada archivo se lee una sola vez y todas las escrituras quedan
+    pendientes en memoria hasta confirmarLote. Si ya hay un lote en curso, se sigue usando ese.
+    Los archivos indicados quedan bloqueados para otras terminales hasta que el lote termine.
+
+    Parámetros:
+        _archivos (iterable): Rutas de los archivos que el lote va a modificar.
+
+    Retorno:
+        bool: True si se inició un lote nuevo (y quien lo inició debe confirmarlo o descartarlo),
+        False si ya había uno en curso.
+    """
+    global loteActual
+    if loteActual is not None:
+        # Se suma al lote en curso: bloquea lo que falte hasta que ese lote termine
+        loteActual["bloqueos"].extend(bloquearArchivos(_archivos))
+        return False
+    bloqueos = bloquearArchivos(_archivos)
+    loteActual = {"diccionarios": {}, "pendientes": {}, "bloqueos": bloqueos, "puntos": []}
+    return True
+
+def descartarLote():
+    """
+    Termina el lote en curso sin escribir nada. Como los cambios se aplicaron sobre los
+    diccionarios en memoria, se descarta la caché de todos los archivos leídos en el lote.
+
+    Retorno:
+        None
+    """
+    global loteActual, columnasPrestamos, origenVerificado
+    lote = loteActual
+    loteActual = None
+    if lote is None:
+        return None
+    for direccion in lote["diccionarios"]:
+        cacheArchivos.pop(direccion, None)
+    columnasPrestamos = None
+    origenVerificado = None # Si el lote reconstruía los derivados, no llegaron a escribirse
+    liberarArchivos(lote["bloqueos"])
+    return None
+
+def ejecutarEnLote(_archivos, _operacion, *_argumentos):
+    """
+    Ejecuta una operación que modifica varios archivos: bloquea los archivos que va a modificar, y
+    todos sus cambios se escriben juntos al final (una vez por archivo) o, si la operación falla,
+    no se escribe ninguno. La escritura final es atómica por archivo, no entre archivos (ver
+    escribirPendientes). Si ya hay un lote en curso (línea de comandos,
+    servicio), la operación se suma a él con un punto de restauración propio: si falla, se deshacen
+    solo sus cambios y los de las operaciones anteriores del lote quedan como estaban.
+
+    Parámetros:
+        _archivos (iterable): Rutas de los archivos que la operación modifica.
+        _operacion (function): Función a ejecutar.
+        _argumentos: Argumentos de la función.
+
+    Retorno:
+        Lo que devuelva la operación.
+    """
+    propio = iniciarLote(_archivos)
+    if not propio:
+        loteActual["puntos"].append([])
+    try:
+        resultado = _operacion(*_argumentos)
+    except BaseException:
+        if propio:
+            descartarLote()
+        else:
+            restaurarPunto()
+        raise
+    if propio:
+        confirmarLote()
+    else:
+        cerrarPunto()
+    return resultado
+
+def cerrarPunto():
+    """
+    Cierra el último punto de restauración del lote en curso porque su operación terminó bien. Lo
+    necesario para deshacerla pasa al punto anterior, si lo hay.
+
+    Retorno:
+        None
+    """
+    deshacer = loteActual["puntos"].pop()
+    if loteActual["puntos"]:
+        loteActual["puntos"][-1].extend(deshacer)
+    return None
+
+def restaurarPunto():
+    """
+    Deshace, en orden inverso, los cambios anotados en el lote en curso desde su último punto de
+    restauración: los registros vuelven a su valor anterior en memoria y salen de los pendientes.
+    Los archivos que se leyeron después de un cambio (y por eso ya lo tienen aplicado) se quitan
+    del lote y de la caché para que se vuelvan a leer.
+
+    Retorno:
+        None
+    """
+    global origenVerificado
+    diccionarios = loteActual["diccionarios"]
+    pendientes = loteActual["pendientes"]
+    for direccion, clave, diccionario, previo, pendientePrevio in reversed(loteActual["puntos"].pop()):
+        vistasDerivadas.pop(direccion, None)
+        if clave is None:
+            # Archivo marcado para reescribirse completo (ej. un derivado reconstruido): vuelve la
+            # copia y los pendientes de antes, y los derivados se vuelven a comprobar
+            origenVerificado = None
+            if diccionario is SIN_VALOR:
+                diccionarios.pop(direccion, None)
+                cacheArchivos.pop(direccion, None)
+            else:
+                diccionarios[direccion] = diccionario
+            if pendientePrevio is SIN_VALOR:
+                pendientes.pop(direccion, None)
+            else:
+                pendientes[direccion] = pendientePrevio
+            indicesTexto.pop(direccion, None)
+            continue
+
+        if diccionario is None:
+            if direccion in diccionarios:
+                del diccionarios[direccion]
+                cacheArchivos.pop(direccion, None)
+        elif previo is SIN_VALOR:
+            diccionario.pop(clave, None)
+        else:
+            diccionario[clave] = previo
+
+        # pendientePrevio: SIN_VALOR si el archivo no tenía pendientes, None si iba a reescribirse
+        # completo (no hay nada que restaurar) o (valor anterior de la clave,)
+        if pendientePrevio is SIN_VALOR:
+            pendientes.pop(direccion, None)
+        elif pendientePrevio is not None and pendientes.get(direccion) is not None:
+            if pendientePrevio[0] is SIN_VALOR:
+                pendientes[direccion].pop(clave, None)
+            else:
+                pendientes[direccion][clave] = pendientePrevio[0]
+
+        indice = indicesTexto.get(direccion)
+        if indice is not None:
+            if indice.diccionario is diccionario and previo is not SIN_VALOR:
+                indice.actualizar(clave, previo)
+            else:
+                indicesTexto.pop(direccion, None)
+    return None
+
+def sumarAlLote(_direccion, _diccionario):
+    """
+    Deja un archivo recién leído como la copia en memoria del lote en curso, aplicándole los
+    registros que el lote ya tenía anotados para él sin haberlo leído.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON.
+        _diccionario (dict): Contenido leído.
+
+    Retorno:
+        None
+    """
+    entradas = loteActual["pendientes"].get(_direccion)
+    if entradas:
+        aplicarEntradas(_diccionario, entradas.items())
+    loteActual["diccionarios"][_direccion] = _diccionario
+    return None
+
+def marcarPendiente(_direccion, _diccionario, _clave, _registro):
+    """
+    Anota un cambio pendiente del lote en curso. El registro se aplica sobre la copia en memoria
+    del archivo si el lote ya la tiene; en los archivos con diario y en sqlite, si no la tiene,
+    alcanza con anotarlo (no se lee el archivo). Si hay un punto de restauración abierto (ver
+    ejecutarEnLote) se anota también cómo deshacer el cambio.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON.
+        _diccionario (dict|None): Contenido completo del archivo en memoria, si se tiene.
+        _clave (str|None): Clave del registro cambiado, o None si hay que reescribir el archivo
+        completo con _diccionario.
+        _registro: Nuevo valor del registro, o None para borrarlo (sin uso si _clave es None).
+
+    Retorno:
+        None
+    """
+    diccionarios = loteActual["diccionarios"]
+    pendientes = loteActual["pendientes"]
+    deshacer = loteActual["puntos"][-1] if loteActual["puntos"] else None
+
+    if _clave is None:
+        if deshacer is not None:
+            deshacer.append((_direccion, None, diccionarios.get(_direccion, SIN_VALOR), None, pendientes.get(_direccion, SIN_VALOR)))
+        diccionarios[_direccion] = _diccionario
+        pendientes[_direccion] = None
+        return None
+
+    diccionario = _diccionario if _diccionario is not None else diccionarios.get(_direccion)
+    if diccionario is None and diarioDe(_direccion) is None and not usaBaseDatos(_direccion):
+        diccionario = cargarArchivo(_direccion)
+    entradas = pendientes.get(_direccion, SIN_VALOR)
+
+    if deshacer is not None:
+        previo = diccionario.get(_clave, SIN_VALOR) if diccionario is not None else SIN_VALOR
+        if entradas is SIN_VALOR or entradas is None:
+            pendientePrevio = entradas
+        else:
+            pendientePrevio = (entradas.get(_clave, SIN_VALOR),)
+        deshacer.append((_direccion, _clave, diccionario, previo, pendientePrevio))
+
+    if diccionario is not None:
+        diccionarios[_direccion] = diccionario
+        aplicarEntradas(diccionario, [(_clave, _registro)])
+    if entradas is SIN_VALOR:
+        pendientes[_direccion] = {_clave: _registro}
+    elif entradas is not None:
+        entradas[_clave] = _registro
+    return None
+
+def confirmarLote():
+    """
+    Termina el lote en curso y escribe una sola vez cada archivo con cambios: en sqlite solo las
+    filas tocadas, en archivos con diario solo los registros tocados y el resto se reescribe
+    completo. Cada archivo se escribe de forma atómica, pero no el conjunto (ver
+    escribirPendientes).
+
+    Retorno:
+        None. Si la escritura falla, el error se propaga (los bloqueos se liberan igual) para que
+        quien confirmó el lote informe que sus cambios no se guardaron.
+    """
+    global loteActual
+    lote = loteActual
+    loteActual = None
+    if lote is None:
+        return None
+
+    try:
+        escribirPendientes(lote)
+    finally:
+        liberarArchivos(lote["bloqueos"])
+    return None
+
+def escribirPendientes(_lote):
+    """
+    Escribe los cambios pendientes de un lote ya terminado (ver confirmarLote) en dos pasos. Primero
+    prepara todo lo que puede fallar sin tocar los archivos: los temporales de los archivos que se
+    reescriben completos, las líneas de los diarios y las filas de sqlite. Después lo aplica: las
+    filas dentro de una transacción que se confirma al final, las líneas al final de cada diario
+    (si algo falla, cada diario se recorta a su largo anterior) y por último los temporales
+    renombrados sobre los originales. Un error se deshace así, pero no un corte del proceso: cada
+    archivo queda entero, aunque unos pueden quedar con los cambios del lote y otros sin ellos. Los
+    derivados del historial se rearman solos en ese caso (ver verificarDerivados). Los diarios que se llenaron se compactan y las particiones
+    que quedaron cerradas se comprimen recién cuando todo quedó escrito y, si el lote tocó el
+    historial de préstamos, al final se anota con qué firma quedaron al día los derivados (ver
+    verificarDerivados).
+
+    Parámetros:
+        _lote (dict): Lote con sus diccionarios y cambios pendientes.
+
+    Retorno:
+        None. Si algo falla se descarta la caché de todos los archivos del lote, para que se
+        vuelvan a leer de disco, y el error se propaga.
+    """
+    global columnasPrestamos, origenVerificado
+    completos = {}
+    diarios = []
+    tablas = []
+    temporales = []
+    largosPrevios = {}
+    tocaHistorial = any(esArchivoDelHistorial(direccion) for direccion in _lote["pendientes"])
+    versionPrevia = versionDelHistorial() if tocaHistorial else None
+    try:
+        for direccion, entradas in _lote["pendientes"].items():
+            if usaBaseDatos(direccion):
+                tabla = TABLAS_SQLITE[direccion]
+                registros = _lote["diccionarios"][direccion] if entradas is None else entradas
+                tablas.append((direccion, tabla, entradas is None, [filaDeRegistro(tabla, c, r) for c, r in registros.items()]))
+            elif entradas is not None and diarioDe(direccion) is not None and os.path.exists(direccion):
+                entradas = list(entradas.items())
+                diarios.append((direccion, entradas, lineasDeDiario(entradas)))
+            else:
+                diccionario = _lote["diccionarios"].get(direccion)
+                completos[direccion] = diccionario if diccionario is not None else cargarArchivo(direccion)
+        temporales = prepararArchivos(completos)
+
+        conexion = conectarBaseDatos() if tablas else None
+        with conexion if conexion is not None else contextlib.nullcontext():
+            for direccion, tabla, completa, filas in tablas:
+                if completa:
+                    conexion.execute(f"DELETE FROM {tabla}")
+                insertarFilas(conexion, tabla, filas)
+            for direccion, entradas, contenido in diarios:
+                diario = diarioDe(direccion)
+                largosPrevios[diario] = os.path.getsize(diario) if os.path.exists(diario) else 0
+                agregarAlDiario(direccion, entradas, contenido)
+            reemplazarArchivos(temporales, completos)
+    except BaseException:
+        descartarTemporales(temporales)
+        for diario, largo in largosPrevios.items():
+            try:
+                os.truncate(diario, largo)
+            except OSError:
+                pass
+        for direccion in set(_lote["diccionarios"]) | set(_lote["pendientes"]):
+            cacheArchivos.pop(direccion, None)
+        columnasPrestamos = None
+        origenVerificado = None
+        raise
+
+    # Las filas confirmadas pasan a la caché de su tabla
+    for direccion, tabla, completa, filas in tablas:
+        if completa:
+            cacheArchivos[direccion] = (versionDeLaBase(), _lote["diccionarios"][direccion])
+        else:
+            actualizarCacheTabla(direccion, _lote["pendientes"][direccion].items())
+
+    # Los cambios ya están escritos: si la compactación falla, se reintenta en la próxima escritura
+    for direccion, entradas, contenido in diarios:
+        try:
+            compactarDiarioSiEstaLleno(direccion)
+        except OSError as detalle:
+            print(f"Aviso: no se pudo compactar el diario de {direccion}:", detalle)
+    cerrarParticionesTerminadas(_lote)
+
+    # Si los derivados estaban al día antes del lote, lo siguen estando con el historial nuevo
+    if tocaHistorial and origenVerificado is not None and origenVerificado == versionPrevia:
+        try:
+            escribirOrigen(firmaDelHistorial())
+            origenVerificado = versionDelHistorial()
+        except (OSError, sqlite3.Error) as detalle:
+            print("Aviso: no se pudo anotar la firma del historial; los derivados se reconstruirán:", detalle)
+            origenVerificado = None
+    return None
+
+def existeArchivo(_direccion):
+    """
+    Indica si un archivo existe, considerando también los creados en el lote en curso que todavía
+    no se escribieron.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo.
+
+    Retorno:
+        bool: True si el archivo existe o está pendiente en el lote, False en caso contrario.
+    """
+    if loteActual is not None and (_direccion in loteActual["diccionarios"] or _direccion in loteActual["pendientes"]):
+        return True
+    return os.path.exists(_direccion)
+
+def usaBaseDatos(_direccion):
+    """
+    Indica si una colección se guarda en la base sqlite en lugar de su archivo JSON.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON de la colección.
+
+    Retorno:
+        bool: True si el motor es sqlite y la colección tiene tabla propia, False en caso contrario.
+    """
+    return MOTOR_ALMACENAMIENTO == "sqlite" and _direccion in TABLAS_SQLITE
+
+def conectarBaseDatos():
+    """
+    Devuelve la conexión a la base sqlite. En el primer acceso crea las tablas e índices y, si la
+    base todavía no tiene la marca de migrada, migra el contenido de los archivos JSON (ver
+    migrarJsonASqlite).
+
+    Retorno:
+        sqlite3.Connection: Conexión abierta (se reutiliza en las siguientes llamadas).
+    """
+    global conexionBaseDatos, origenVerificado
+    if conexionBaseDatos is not None:
+        return conexionBaseDatos
+
+    conexion = sqlite3.connect(BASE_DATOS_ARCHIVO)
+    conexion.executescript("""
+        CREATE TABLE IF NOT EXISTS alumnos (id TEXT PRIMARY KEY, datos TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS libros (id TEXT PRIMARY KEY, datos TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS prestamos (
+            id TEXT PRIMARY KEY,
+            idAlumno TEXT NOT NULL,
+            idLibro TEXT NOT NULL,
+            fechaInicio TEXT NOT NULL,
+            fechaFinalizacion TEXT NOT NULL,
+            datos TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS prestamos_idAlumno ON prestamos (idAlumno);
+        CREATE INDEX IF NOT EXISTS prestamos_idLibro ON prestamos (idLibro);
+        CREATE INDEX IF NOT EXISTS prestamos_fechaInicio ON prestamos (fechaInicio);
+        CREATE TABLE IF NOT EXISTS metadatos (clave TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+        INSERT OR IGNORE INTO metadatos VALUES ('versionPrestamos', 0);
+        CREATE TRIGGER IF NOT EXISTS prestamos_alta AFTER INSERT ON prestamos
+            BEGIN UPDATE metadatos SET valor = valor + 1 WHERE clave = 'versionPrestamos'; END;
+        CREATE TRIGGER IF NOT EXISTS prestamos_cambio AFTER UPDATE ON prestamos
+            BEGIN UPDATE metadatos SET valor = valor + 1 WHERE clave = 'versionPrestamos'; END;
+        CREATE TRIGGER IF NOT EXISTS prestamos_baja AFTER DELETE ON prestamos
+            BEGIN UPDATE metadatos SET valor = valor + 1 WHERE clave = 'versionPrestamos'; END;
+    """)
+    if conexion.execute("SELECT 1 FROM metadatos WHERE clave = 'migrado'").fetchone() is None:
+        try:
+            migrarJsonASqlite(conexion)
+        except BaseException:
+            conexion.close() # Sin la marca: el próximo acceso vuelve a intentar la migración
+            raise
+    conexionBaseDatos = conexion
+
+    # La versión de datos es propia de cada conexión: lo leído con otra conexión ya no se puede comparar
+    for direccion in TABLAS_SQLITE:
+        cacheArchivos.pop(direccion, None)
+    origenVerificado = None
+    return conexionBaseDatos
+
+def versionDeLaBase():
+    """
+    Obtiene la versión de datos de la base sqlite (PRAGMA data_version). Cambia cada vez que otra
+    conexión confirma cambios, pero no con los que confirma esta misma conexión: por eso quien
+    guarda filas aplica el cambio sobre la caché (ver actualizarCacheTabla).
+
+    Retorno:
+        tuple: ("sqlite", versión), para comparar con la firma guardada en cacheArchivos.
+    """
+    return ("sqlite", conectarBaseDatos().execute("PRAGMA data_version").fetchone()[0])
+
+def actualizarCacheTabla(_direccion, _entradas):
+    """
+    Aplica a la caché de una tabla los registros que este proceso acaba de confirmar. Si otra
+    conexión confirmó cambios desde la última lectura, la caché ya no está al día y se descarta.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON de la colección.
+        _entradas (iterable): Tuplas (clave, registro) confirmadas.
+
+    Retorno:
+        None
+    """
+    if _direccion in cacheArchivos and cacheArchivos[_direccion][0] == versionDeLaBase():
+        aplicarEntradas(cacheArchivos[_direccion][1], _entradas)
+    else:
+        cacheArchivos.pop(_direccion, None)
+    return None
+
+def filaDeRegistro(_tabla, _clave, _registro):
+    """
+    Arma la tupla de columnas con la que se guarda un registro en su tabla.
+
+    Parámetros:
+        _tabla (str): Nombre de la tabla ("alumnos", "libros" o "prestamos").
+        _clave (str): Clave del registro.
+        _registro (dict): Registro a guardar.
+
+    Retorno:
+        tuple: Valores en el orden de las columnas de la tabla.
+    """
+    datos = json.dumps(_registro, ensure_ascii=False, default=serializarRegistro)
+    if _tabla == "prestamos":
+        return (
+            _clave,
+            _registro["idAlumno"],
+            _registro["idLibro"],
+            _registro["fechaInicio"],
+            _registro["fechaFinalizacion"],
+            datos,
+        )
+    return (_clave, datos)
+
+def insertarFilas(_conexion, _tabla, _filas):
+    """
+    Inserta o reemplaza filas en una tabla, dentro de la transacción abierta en la conexión.
+
+    Parámetros:
+        _conexion (sqlite3.Connection): Conexión a la base.
+        _tabla (str): Nombre de la tabla.
+        _filas (iterable): Tuplas generadas con filaDeRegistro.
+
+    Retorno:
+        None
+    """
+    if _tabla == "prestamos":
+        sentencia = "INSERT OR REPLACE INTO prestamos VALUES (?, ?, ?, ?, ?, ?)"
+    else:
+        sentencia = f"INSERT OR REPLACE INTO {_tabla} VALUES (?, ?)"
+    _conexion.executemany(sentencia, _filas)
+    return None
+
+def cargarTabla(_tabla, _condicion="", _parametros=()):
+    """
+    Carga las filas de una tabla como diccionario con la misma forma que su archivo JSON.
+
+    Parámetros:
+        _tabla (str): Nombre de la tabla.
+        _condicion (str): Cláusula WHERE opcional (sin la palabra WHERE).
+        _parametros (tuple): Valores para los '?' de la condición.
+
+    Retorno:
+        dict: Registros de la tabla por clave, convertidos a su clase (ver CLASES_DE_REGISTRO).
+    """
+    consulta = f"SELECT id, datos FROM {_tabla}"
+    if _condicion:
+        consulta += f" WHERE {_condicion}"
+    filas = conectarBaseDatos().execute(consulta, _parametros)
+    direccion = next((direccion for direccion, tabla in TABLAS_SQLITE.items() if tabla == _tabla), None)
+    return convertirRegistros(direccion, {clave: json.loads(datos) for clave, datos in filas})
+
+def escribirTabla(_tabla, _diccionario):
+    """
+    Reemplaza todo el contenido de una tabla por el del diccionario, en una sola transacción.
+
+    Parámetros:
+        _tabla (str): Nombre de la tabla.
+        _diccionario (dict): Registros por clave.
+
+    Retorno:
+        None
+    """
+    conexion = conectarBaseDatos()
+    with conexion:
+        conexion.execute(f"DELETE FROM {_tabla}")
+        insertarFilas(conexion, _tabla, (filaDeRegistro(_tabla, k, v) for k, v in _diccionario.items()))
+    return None
+
+def guardarFila(_tabla, _clave, _registro):
+    """
+    Inserta o actualiza un único registro de una tabla.
+
+    Parámetros:
+        _tabla (str): Nombre de la tabla.
+        _clave (str): Clave del registro.
+        _registro (dict): Registro a guardar.
+
+    Retorno:
+        None
+    """
+    conexion = conectarBaseDatos()
+    with conexion:
+        insertarFilas(conexion, _tabla, [filaDeRegistro(_tabla, _clave, _registro)])
+    return None
+
+def migrarJsonASqlite(_conexion):
+    """
+    Copia el contenido de los archivos JSON (incluido el diario de préstamos) a sus tablas sqlite,
+    en una sola transacción que al final anota la marca 'migrado' en la tabla metadatos: si se
+    corta en el medio no queda nada copiado ni marcado y se vuelve a intentar en el próximo
+    acceso. Toma el bloqueo de escritura de la base antes de mirar la marca, así que si dos
+    terminales abren la base a la vez solo una migra. Las tablas que ya tienen filas no se tocan
+    (bases creadas antes de la marca, en las que cada tabla se migraba por separado).
+
+    Parámetros:
+        _conexion (sqlite3.Connection): Conexión a la base, sin transacción abierta.
+
+    Retorno:
+        None: Se cargan las tablas y devuelve None. Si un archivo no puede leerse lo informa y
+        continúa con el resto.
+    """
+    global MOTOR_ALMACENAMIENTO
+    motor = MOTOR_ALMACENAMIENTO
+    MOTOR_ALMACENAMIENTO = "json" # Lee los archivos aunque el motor configurado sea sqlite
+    try:
+        with _conexion:
+            _conexion.execute("BEGIN IMMEDIATE")
+            if _conexion.execute("SELECT 1 FROM metadatos WHERE clave = 'migrado'").fetchone() is not None:
+                return None # Otra terminal migró mientras se esperaba el bloqueo
+            for direccion, tabla in TABLAS_SQLITE.items():
+                if _conexion.execute(f"SELECT 1 FROM {tabla} LIMIT 1").fetchone() is not None:
+                    continue
+                diccionario = cargarArchivo(direccion)
+                if diccionario is None:
+                    continue
+                insertarFilas(_conexion, tabla, (filaDeRegistro(tabla, k, v) for k, v in diccionario.items()))
+                print(f"Migrados {len(diccionario)} registros de {direccion} a la tabla {tabla}.")
+            _conexion.execute("INSERT INTO metadatos VALUES ('migrado', 1)")
+    finally:
+        MOTOR_ALMACENAMIENTO = motor
+    return None
+
+def consultarPrestamosPorPeriodo(_anio, _mes=None):
+    """
+    Obtiene los préstamos iniciados en un año o en un mes puntual. Con el motor sqlite usa el
+    índice de fechaInicio y solo lee las filas del período; con archivos, las particiones del
+    período (ver cargarParticion).
+
+    Parámetros:
+        _anio (int): Año de inicio de los préstamos.
+        _mes (int|None): Mes (1-12). Si es None se devuelve el año completo.
+
+    Retorno:
+        dict: Préstamos del período por idPrestamo.
+    """
+    if usaBaseDatos(PRESTAMOS_ARCHIVO):
+        # Rango [prefijo, prefijo + "~") para que la comparación use el índice
+        prefijo = f"{_anio}-{_mes:02d}" if _mes is not None else f"{_anio}"
+        return cargarTabla("prestamos", "fechaInicio >= ? AND fechaInicio < ?", (prefijo, prefijo + "~"))
+
+    # Con archivos, lee solo las particiones de los meses pedidos
+    if _mes is not None:
+        return cargarParticion(_anio, _mes)
+
+    prestamosDelAnio = {}
+    for mes in range(1, 13):
+        prestamosDelAnio.update(cargarParticion(_anio, mes))
+    return prestamosDelAnio
+
+def recorrerPrestamosDelPeriodo(_anio, _mes=None):
+    """
+    Recorre los préstamos iniciados en un año o en un mes puntual: con archivos lee una partición
+    por mes (doce para un año); con el motor sqlite, el rango del índice de fechaInicio. Sirve para
+    recalcular informes sin leer el resto del historial.
+
+    Parámetros:
+        _anio (int): Año de inicio de los préstamos.
+        _mes (int|None): Mes (1-12). Si es None se recorre el año completo.
+
+    Retorno:
+        generator: Tuplas (idPrestamo, préstamo), mes por mes.
+    """
+    if usaBaseDatos(PRESTAMOS_ARCHIVO):
+        yield from consultarPrestamosPorPeriodo(_anio, _mes).items()
+        return
+
+    for mes in ([_mes] if _mes is not None else range(1, 13)):
+        yield from cargarParticion(_anio, mes).items()
+
+def recorrerPrestamos():
+    """
+    Recorre el historial de préstamos de a uno sin armar el diccionario completo: si ya está en
+    memoria usa esa copia; si no, lee prestamos.json por partes (con los cambios del diario, que
+    es chico) o recorre la tabla con un cursor. Sirve para informes sobre historiales que no
+    conviene cargar enteros.
+
+    Retorno:
+        generator: Tuplas (idPrestamo, préstamo), en el mismo orden que cargarArchivo.
+    """
+    if loteActual is not None and PRESTAMOS_ARCHIVO in loteActual["diccionarios"]:
+        yield from loteActual["diccionarios"][PRESTAMOS_ARCHIVO].items()
+        return
+
+    if usaBaseDatos(PRESTAMOS_ARCHIVO):
+        for clave, datos in conectarBaseDatos().execute("SELECT id, datos FROM prestamos"):
+            yield clave, Prestamo.desdeDiccionario(json.loads(datos), clave)
+        return
+
+    if PRESTAMOS_ARCHIVO in cacheArchivos and cacheArchivos[PRESTAMOS_ARCHIVO][0] == firmaArchivo(PRESTAMOS_ARCHIVO):
+        yield from cacheArchivos[PRESTAMOS_ARCHIVO][1].items()
+        return
+
+    # Los cambios del diario reemplazan a su préstamo en el lugar; las altas van al final
+    cambios = dict(leerDiario(DIARIOS[PRESTAMOS_ARCHIVO])) if PRESTAMOS_ARCHIVO in DIARIOS else {}
+    for clave, datos in leerObjetoJsonPorPartes(PRESTAMOS_ARCHIVO):
+        if clave in cambios:
+            datos = cambios.pop(clave)
+        yield clave, Prestamo.desdeDiccionario(datos, clave)
+    for clave, datos in cambios.items():
+        yield clave, Prestamo.desdeDiccionario(datos, clave)
+
+def periodoDeFecha(_fecha):
+    """
+    Obtiene el período (año, mes) de una fecha.
+
+    Parámetros:
+        _fecha (str): Fecha en formato "YYYY-MM-DD".
+
+    Retorno:
+        tuple: (año, mes) como enteros.
+    """
+    return (int(_fecha[0:4]), int(_fecha[5:7]))
+
+def periodoDePrestamo(_prestamo):
+    """
+    Obtiene el período (año, mes) de inicio de un préstamo.
+
+    Parámetros:
+        _prestamo (dict): Préstamo con fechaInicio en formato "YYYY-MM-DD".
+
+    Retorno:
+        tuple: (año, mes) como enteros.
+    """
+    return periodoDeFecha(_prestamo["fechaInicio"])
+
+def ultimoPeriodoDePrestamos(_prestamos, _periodo=None):
+    """
+    Obtiene el período más reciente entre las fechas de inicio y de finalización de unos
+    préstamos. Como las altas y las finalizaciones se fechan al momento de hacerse, ningún mes
+    anterior a ese puede recibir préstamos nuevos.
+
+    Parámetros:
+        _prestamos (iterable): Préstamos.
+        _periodo (tuple|None): Período desde el que se compara (None si no hay ninguno).
+
+    Retorno:
+        tuple|None: (año, mes) más reciente, o _periodo si no hay uno posterior.
+    """
+    for prestamo in _prestamos:
+        for fecha in (prestamo["fechaInicio"], prestamo["fechaFinalizacion"]):
+            if fecha != "" and (_periodo is None or periodoDeFecha(fecha) > _periodo):
+                _periodo = periodoDeFecha(fecha)
+    return _periodo
+
+def periodoDeIdPrestamo(_idPrestamo):
+    """
+    Obtiene el período (año, mes) de un préstamo a partir de su ID, que empieza con la fecha de
+    inicio ('YYYY.MM.DD ...'), sin leer el préstamo.
+
+    Parámetros:
+        _idPrestamo (str): ID del préstamo.
+
+    Retorno:
+        tuple|None: (año, mes) como enteros, o None si el ID no empieza con una fecha.
+    """
+    try:
+        fecha = datetime.strptime(_idPrestamo[:10], "%Y.%m.%d")
+    except ValueError:
+        return None
+    return (fecha.year, fecha.month)
+
+def rutaParticion(_anio, _mes, _cerrada=False):
+    """
+    Arma la ruta del archivo de préstamos de un mes.
+
+    Parámetros:
+        _anio (int): Año.
+        _mes (int): Mes (1-12).
+        _cerrada (bool): Si es True, la ruta de la versión comprimida del mes cerrado.
+
+    Retorno:
+        str: Ruta de la partición dentro de PARTICIONES_DIRECTORIO.
+    """
+    ruta = os.path.join(PARTICIONES_DIRECTORIO, claveDePeriodo(_anio, _mes) + ".json")
+    return ruta + PARTICION_CERRADA_EXTENSION if _cerrada else ruta
+
+def esMesCerrado(_anio, _mes, _particion, _periodoActual):
+    """
+    Indica si un mes ya no puede cambiar: es anterior al período indicado y todos sus préstamos
+    están finalizados. Las altas van siempre al mes en curso y solo se finalizan préstamos activos,
+    así que a partir de ahí ninguna operación vuelve a tocar su partición. El período lo da quien
+    escribe, a partir de las fechas de los préstamos (ver ultimoPeriodoDePrestamos), y no el reloj.
+
+    Parámetros:
+        _anio (int): Año.
+        _mes (int): Mes (1-12).
+        _particion (dict): Préstamos del mes.
+        _periodoActual (tuple|None): (año, mes) ya alcanzado por el historial.
+
+    Retorno:
+        bool: True si el mes está cerrado.
+    """
+    if _periodoActual is None or (_anio, _mes) >= _periodoActual:
+        return False
+    return all(prestamo["fechaFinalizacion"] != "" for prestamo in _particion.values())
+
+def escribirParticionCerrada(_ruta, _particion):
+    """
+    Escribe comprimida la partición de un mes cerrado, de forma atómica (temporal, fsync y
+    renombre).
+
+    Parámetros:
+        _ruta (str): Ruta de destino (terminada en PARTICION_CERRADA_EXTENSION).
+        _particion (dict): Préstamos del mes.
+
+    Retorno:
+        None
+    """
+    descriptor, temporal = tempfile.mkstemp(prefix=os.path.basename(_ruta) + ".", suffix=".tmp", dir=os.path.dirname(os.path.abspath(_ruta)))
+    archivo = open(descriptor, mode="wb")
+    try:
+        comprimido = gzip.GzipFile(fileobj=archivo, mode="wb")
+        contenido = json.dumps(_particion, ensure_ascii=False, default=serializarRegistro).encode("utf-8")
+        comprimido.write(contenido)
+        comprimido.close()
+        archivo.flush()
+        os.fsync(archivo.fileno())
+        sumarMetrica("bytesEscritos", archivo.tell())
+        sumarMetrica("registrosEscritos", len(_particion))
+    finally:
+        archivo.close()
+    igualarPermisos(temporal, _ruta)
+    os.replace(temporal, _ruta)
+    return None
+
+def reconstruirParticiones():
+    """
+    Reparte todo el historial en una partición por mes de inicio. Los meses cerrados se guardan ya
+    comprimidos. Todo se escribe en un directorio temporal que recién al final toma el nombre
+    definitivo, para que un corte no deje particiones a medias. Solo se usa cuando las particiones
+    todavía no existen o no están al día con el historial (ver verificarDerivados); después se
+    mantienen con cada alta y finalización, y se cierran al confirmar el lote que las termina (ver
+    cerrarParticionesTerminadas).
+
+    Retorno:
+        None
+    """
+    periodos = {}
+    periodoActual = None
+    for clave, prestamo in recorrerPrestamos():
+        periodo = periodoDePrestamo(prestamo)
+        if periodo not in periodos:
+            periodos[periodo] = {}
+        periodos[periodo][clave] = prestamo
+        periodoActual = ultimoPeriodoDePrestamos([prestamo], periodoActual)
+
+    temporal = PARTICIONES_DIRECTORIO + ".tmp"
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+    for (anio, mes), particion in periodos.items():
+        ruta = os.path.join(temporal, os.path.basename(rutaParticion(anio, mes)))
+        if esMesCerrado(anio, mes, particion, periodoActual):
+            escribirParticionCerrada(ruta + PARTICION_CERRADA_EXTENSION, particion)
+        else:
+            os.replace(escribirTemporal(ruta, particion), ruta)
+    # Las particiones anteriores se reemplazan completas y se olvidan sus copias en memoria
+    anterior = PARTICIONES_DIRECTORIO + ".anterior"
+    if os.path.isdir(PARTICIONES_DIRECTORIO):
+        shutil.rmtree(anterior, ignore_errors=True)
+        os.rename(PARTICIONES_DIRECTORIO, anterior)
+    os.rename(temporal, PARTICIONES_DIRECTORIO)
+    sincronizarDirectorio(PARTICIONES_DIRECTORIO)
+    shutil.rmtree(anterior, ignore_errors=True)
+    particionesCerradas.clear()
+    for direccion in [direccion for direccion in cacheArchivos if esParticion(direccion)]:
+        del cacheArchivos[direccion]
+    if loteActual is not None:
+        for coleccion in (loteActual["diccionarios"], loteActual["pendientes"]):
+            for direccion in [direccion for direccion in coleccion if esParticion(direccion)]:
+                del coleccion[direccion]
+    return None
+
+def cerrarParticionesTerminadas(_lote):
+    """
+    Comprime las particiones que un lote recién confirmado dejó cerradas (ver esMesCerrado) y borra
+    su versión abierta. Se llama desde escribirPendientes, todavía con el bloqueo de prestamos.json,
+    así que nadie más puede estar escribiendo esas particiones. Si algo falla solo se avisa: la
+    versión abierta sigue siendo válida y el mes se comprime en la próxima reconstrucción.
+
+    Parámetros:
+        _lote (dict): Lote ya confirmado.
+
+    Retorno:
+        None
+    """
+    particiones = {}
+    for direccion, entradas in _lote["pendientes"].items():
+        if esParticion(direccion) and _lote["diccionarios"].get(direccion) is not None:
+            particiones[direccion] = _lote["diccionarios"][direccion]
+    if not particiones:
+        return None
+
+    # El mes en curso sale de las fechas que el lote acaba de escribir
+    periodoActual = None
+    for direccion, particion in particiones.items():
+        entradas = _lote["pendientes"][direccion]
+        escritos = particion.values() if entradas is None else [prestamo for prestamo in entradas.values() if prestamo is not None]
+        periodoActual = ultimoPeriodoDePrestamos(escritos, periodoActual)
+
+    for direccion, particion in particiones.items():
+        anio, mes = periodoDeFecha(os.path.basename(direccion))
+        if not esMesCerrado(anio, mes, particion, periodoActual):
+            continue
+        try:
+            escribirParticionCerrada(rutaParticion(anio, mes, True), particion)
+            os.remove(direccion)
+            if os.path.exists(diarioDe(direccion)):
+                os.remove(diarioDe(direccion))
+        except OSError as detalle:
+            print(f"Aviso: no se pudo comprimir la partición {direccion}:", detalle)
+        cacheArchivos.pop(direccion, None)
+    return None
+
+def cargarParticion(_anio, _mes):
+    """
+    Carga los préstamos iniciados en un mes leyendo solo su partición. Los meses cerrados se leen
+    una sola vez y quedan en memoria. Fuera de un lote solo lee: si las particiones todavía no
+    existen o no están al día con el historial, el mes se toma de prestamos.json sin escribir nada.
+    Dentro de un lote, con los archivos de préstamo ya bloqueados, las arma o las reconstruye (ver
+    verificarDerivados).
+
+    Parámetros:
+        _anio (int): Año.
+        _mes (int): Mes (1-12).
+
+    Retorno:
+        dict: Préstamos del mes por idPrestamo (vacío si el mes no tiene préstamos). Quien lo
+        modifique debe guardarlo con guardarRegistro.
+    """
+    clave = claveDePeriodo(_anio, _mes)
+    if clave in particionesCerradas:
+        return particionesCerradas[clave]
+    if loteActual is None:
+        if not os.path.isdir(PARTICIONES_DIRECTORIO) or not derivadosAlDia():
+            prestamos = cargarArchivo(PRESTAMOS_ARCHIVO) or {}
+            return {idPrestamo: prestamo for idPrestamo, prestamo in prestamos.items() if periodoDePrestamo(prestamo) == (_anio, _mes)}
+    else:
+        verificarDerivados()
+        if not os.path.isdir(PARTICIONES_DIRECTORIO):
+            reconstruirParticiones()
+
+    ruta = rutaParticion(_anio, _mes)
+    if existeArchivo(ruta):
+        return cargarArchivo(ruta)
+
+    try:
+        archivo = gzip.open(rutaParticion(_anio, _mes, True), mode="rt", encoding="utf-8")
+    except FileNotFoundError:
+        return {}
+    try:
+        particion = convertirRegistros(PRESTAMOS_ARCHIVO, json.load(archivo))
+    finally:
+        archivo.close()
+    sumarMetrica("registrosLeidos", len(particion))
+    particionesCerradas[clave] = particion
+    return particion
+
+def obtenerColumnasPrestamos():
+    """
+    Devuelve el historial de préstamos por columnas. Las columnas se arman una sola vez y se
+    reutilizan mientras prestamos.json y su diario no cambien; con el motor sqlite o dentro de un
+    lote se arman en el momento a partir de los préstamos cargados.
+
+    Retorno:
+        ColumnasPrestamos: Columnas de todos los préstamos.
+    """
+    global columnasPrestamos
+    prestamos = cargarArchivo(PRESTAMOS_ARCHIVO) or {}
+    if usaBaseDatos(PRESTAMOS_ARCHIVO) or loteActual is not None or PRESTAMOS_ARCHIVO not in cacheArchivos:
+        return ColumnasPrestamos.desdePrestamos(prestamos)
+
+    firma = cacheArchivos[PRESTAMOS_ARCHIVO][0]
+    if columnasPrestamos is None or columnasPrestamos[0] != firma:
+        columnasPrestamos = (firma, ColumnasPrestamos.desdePrestamos(prestamos))
+    return columnasPrestamos[1]
+
+def actualizarColumnas(_firmaPrevia, _firmaNueva, _entradas):
+    """
+    Aplica a las columnas los préstamos recién guardados, si las columnas estaban al día. Si no lo
+    estaban, no hace nada y se rearmarán en la próxima consulta.
+
+    Parámetros:
+        _firmaPrevia (tuple): Firma de prestamos.json antes de guardar.
+        _firmaNueva (tuple): Firma después de guardar.
+        _entradas (list): Tuplas (idPrestamo, préstamo) guardadas.
+
+    Retorno:
+        None
+    """
+    global columnasPrestamos
+    if columnasPrestamos is None or columnasPrestamos[0] != _firmaPrevia:
+        return None
+
+    columnas = columnasPrestamos[1]
+    for clave, prestamo in _entradas:
+        columnas.agregar(clave, prestamo)
+    columnasPrestamos = (_firmaNueva, columnas)
+    return None
+
+def agruparColumnas(_columnas, _periodoDesde, _periodoHasta, _porLibro=False, _conOrden=False):
+    """
+    Cuenta los préstamos iniciados entre dos períodos agrupados por mes (y por libro), en una
+    pasada sobre las columnas. Con numpy instalado cada cuenta es un bincount vectorizado; si no,
+    se recorren los arrays.
+
+    Parámetros:
+        _columnas (ColumnasPrestamos): Historial por columnas.
+        _periodoDesde (int): Primer período incluido (año * 12 + mes - 1).
+        _periodoHasta (int): Último período incluido.
+        _porLibro (bool): Si es True, agrupa por (libro, mes); si no, solo por mes.
+        _conOrden (bool): Si es True, agrega los grupos con préstamos en el orden de su primer préstamo.
+
+    Retorno:
+        dict: Listas "cantidad" e "incorrectas" (devoluciones incorrectas) con un valor por grupo.
+        El grupo es período - _periodoDesde, más código de libro * cantidad de meses si _porLibro.
+        Con _conOrden incluye además la lista "orden" de grupos.
+    """
+    meses = _periodoHasta - _periodoDesde + 1
+    cantidadGrupos = meses * (len(_columnas.idsLibro) if _porLibro else 1)
+    finalizado, correcto = ColumnasPrestamos.FINALIZADO, ColumnasPrestamos.CORRECTO
+
+    if numpy is not None and len(_columnas.periodo) > 0:
+        periodo = numpy.frombuffer(_columnas.periodo, dtype=numpy.int64)
+        mascara = (periodo >= _periodoDesde) & (periodo <= _periodoHasta)
+        grupo = periodo[mascara] - _periodoDesde
+        if _porLibro:
+            grupo += numpy.frombuffer(_columnas.libro, dtype=numpy.int64)[mascara] * meses
+        estado = numpy.frombuffer(_columnas.estado, dtype=numpy.uint8)[mascara]
+        esIncorrecto = (estado & (finalizado | correcto)) == finalizado
+        resultado = {
+            "cantidad": numpy.bincount(grupo, minlength=cantidadGrupos).tolist(),
+            "incorrectas": numpy.bincount(grupo[esIncorrecto], minlength=cantidadGrupos).tolist(),
+        }
+        if _conOrden:
+            grupos, primeros = numpy.unique(grupo, return_index=True)
+            resultado["orden"] = grupos[numpy.argsort(primeros)].tolist()
+        return resultado
+
+    resultado = {clave: [0] * cantidadGrupos for clave in ("cantidad", "incorrectas")}
+    cantidad, incorrectas = resultado["cantidad"], resultado["incorrectas"]
+    orden = []
+    for periodo, libro, estado in zip(_columnas.periodo, _columnas.libro, _columnas.estado):
+        if periodo < _periodoDesde or periodo > _periodoHasta:
+            continue
+        grupo = periodo - _periodoDesde + (libro * meses if _porLibro else 0)
+        if cantidad[grupo] == 0:
+            orden.append(grupo)
+        cantidad[grupo] += 1
+        if estado & (finalizado | correcto) == finalizado:
+            incorrectas[grupo] += 1
+    if _conOrden:
+        resultado["orden"] = orden
+    return resultado
+
+def claveDePeriodo(_anio, _mes):
+    """
+    Arma la clave "YYYY-MM" con la que se guardan los agregados de un mes.
+
+    Parámetros:
+        _anio (int): Año.
+        _mes (int): Mes (1-12).
+
+    Retorno:
+        str: Clave del período.
+    """
+    return f"{_anio}-{_mes:02d}"
+
+def vistaDerivada(_direccion, _diccionario, _armar):
+    """
+    Devuelve una vista armada sobre el contenido de un archivo derivado (ej. los préstamos activos
+    agrupados por alumno y por libro). La vista se arma una sola vez y se reutiliza mientras
+    cargarArchivo devuelva el mismo diccionario; quien guarde un registro del archivo debe
+    actualizar también la vista. Si un punto de restauración deshace cambios del archivo, la vista
+    se descarta y se vuelve a armar.
+
+    Parámetros:
+        _direccion (str): Ruta del archivo JSON.
+        _diccionario (dict): Contenido del archivo.
+        _armar (function): Función que arma la vista a partir del contenido.
+
+    Retorno:
+        Vista armada por _armar.
+    """
+    vista = vistasDerivadas.get(_direccion)
+    if vista is None or vista[0] is not _diccionario:
+        vista = (_diccionario, _armar(_diccionario))
+        vistasDerivadas[_direccion] = vista
+    return vista[1]
+
+def agruparAgregados(_celdas):
+    """
+    Agrupa por mes las celdas de agregados.json, que se guardan una por (mes, libro) para escribir
+    solo la celda que cambia.
+
+    Parámetros:
+        _celdas (dict): {"YYYY-MM/idLibro": [cantidad, devoluciones incorrectas]}.
+
+    Retorno:
+        dict: {"YYYY-MM": {idLibro: [cantidad, devoluciones incorrectas]}}, con las mismas listas.
+    """
+    agregados = {}
+    for clave, celda in _celdas.items():
+        periodo, separador, idLibro = clave.partition("/")
+        agregados.setdefault(periodo, {})[idLibro] = celda
+    return agregados
+
+def reconstruirAgregados():
+    """
+    Calcula los agregados mensuales por libro agrupando todo el historial por columnas y los
+    guarda. Solo se usa cuando el archivo todavía no existe o no está al día con el historial (ver
+    verificarDerivados); después se mantienen con cada alta y finalización.
+
+    Retorno:
+        dict: {"YYYY-MM": {idLibro: [cantidad, devoluciones incorrectas]}}.
+    """
+    columnas = obtenerColumnasPrestamos()
+    celdas = {}
+    if len(columnas.periodo) > 0:
+        desde, hasta = min(columnas.periodo), max(columnas.periodo)
+        meses = hasta - desde + 1
+        grupos = agruparColumnas(columnas, desde, hasta, _porLibro=True, _conOrden=True)
+
+        # Recorre las celdas en el orden de su primer préstamo, como si se sumara uno por uno
+        for grupo in grupos["orden"]:
+            codigo, desplazamiento = divmod(grupo, meses)
+            anio, mes = divmod(desde + desplazamiento, 12)
+            idLibro = columnas.idsLibro[codigo]
+            celdas[f"{claveDePeriodo(anio, mes + 1)}/{idLibro}"] = [grupos["cantidad"][grupo], grupos["incorrectas"][grupo]]
+    escribirArchivo(AGREGADOS_ARCHIVO, celdas)
+    return vistaDerivada(AGREGADOS_ARCHIVO, celdas, agruparAgregados)
+
+def cargarAgregados():
+    """
+    Carga los agregados mensuales por libro, calculándolos la primera vez si no existen o si no
+    están al día con el historial (ver verificarDerivados).
+
+    Retorno:
+        dict: {"YYYY-MM": {idLibro: [cantidad, devoluciones incorrectas]}}. Para modificarlos
+        se usa guardarAgregado.
+    """
+    verificarDerivados()
+    celdas = cargarArchivo(AGREGADOS_ARCHIVO) if existeArchivo(AGREGADOS_ARCHIVO) else None
+    # Formato anterior: un registro por mes con todos sus libros
+    if celdas is None or isinstance(next(iter(celdas.values()), None), dict):
+        return reconstruirAgregados()
+    return vistaDerivada(AGREGADOS_ARCHIVO, celdas, agruparAgregados)
+
+def sumarAgregado(_agregados, _prestamo, _cantidad=0, _incorrectas=0):
+    """
+    Suma valores a la celda (mes de inicio, libro) de un préstamo en los agregados. La celda se
+    reemplaza por una nueva en lugar de modificarse, para que un punto de restauración pueda volver
+    a la anterior.
+
+    Parámetros:
+        _agregados (dict): Agregados mensuales por libro.
+        _prestamo (dict): Préstamo que origina el cambio.
+        _cantidad (int): Préstamos a sumar.
+        _incorrectas (int): Devoluciones incorrectas a sumar.
+
+    Retorno:
+        list: La celda nueva [cantidad, devoluciones incorrectas].
+    """
+    anio, mes = periodoDePrestamo(_prestamo)
+    celdas = _agregados.setdefault(claveDePeriodo(anio, mes), {})
+    cantidad, incorrectas = celdas.get(_prestamo["idLibro"], [0, 0])
+    celda = [cantidad + _cantidad, incorrectas + _incorrectas]
+    celdas[_prestamo["idLibro"]] = celda
+    return celda
+
+def guardarAgregado(_agregados, _prestamo, _cantidad=0, _incorrectas=0):
+    """
+    Suma valores a la celda de un préstamo en los agregados guardados (ver sumarAgregado) y
+    escribe solo esa celda en el diario de agregados.json.
+
+    Parámetros:
+        _agregados (dict): Agregados devueltos por cargarAgregados.
+        _prestamo (dict): Préstamo que origina el cambio.
+        _cantidad (int): Préstamos a sumar.
+        _incorrectas (int): Devoluciones incorrectas a sumar.
+
+    Retorno:
+        None
+    """
+    celda = sumarAgregado(_agregados, _prestamo, _cantidad, _incorrectas)
+    anio, mes = periodoDePrestamo(_prestamo)
+    guardarRegistro(AGREGADOS_ARCHIVO, f"{claveDePeriodo(anio, mes)}/{_prestamo['idLibro']}", celda)
+    return None
+
+def agregadosDelAnio(_anio, _prestamos):
+    """
+    Calcula los agregados de un año en una pasada sobre un recorrido de préstamos, sin cargar el
+    historial completo: en memoria quedan solo las celdas del año.
+
+    Parámetros:
+        _anio (int): Año.
+        _prestamos (iterable): Pares (idPrestamo, préstamo), ej. recorrerPrestamosDelPeriodo(_anio).
+
+    Retorno:
+        dict: {"YYYY-MM": {idLibro: [cantidad, devoluciones incorrectas]}} con los meses del año.
+    """
+    prefijo = f"{_anio}-"
+    agregados = {}
+    for clave, prestamo in _prestamos:
+        if not prestamo["fechaInicio"].startswith(prefijo):
+            continue
+        incorrecta = prestamo["fechaFinalizacion"] != "" and not prestamo.get("estadoDevolucionCorrecto", True)
+        sumarAgregado(agregados, prestamo, 1, 1 if incorrecta else 0)
+    return agregados
+
+def celdasDelAnio(_agregados, _anio, _idLibro):
+    """
+    Obtiene las 12 celdas mensuales de un libro en un año.
+
+    Parámetros:
+        _agregados (dict): Agregados mensuales por libro.
+        _anio (int): Año.
+        _idLibro (str): ID del libro.
+
+    Retorno:
+        list: 12 listas [cantidad, devoluciones incorrectas], una por mes.
+    """
+    return [
+        _agregados.get(claveDePeriodo(_anio, mes), {}).get(_idLibro, [0, 0])
+        for mes in range(1, 13)
+    ]
+
+def agruparPrestamosActivos(_activos):
+    """
+    Arma el índice de préstamos activos sobre el contenido de prestamos_activos.json, que guarda un
+    registro por préstamo para escribir solo el que cambia.
+
+    Parámetros:
+        _activos (dict): idPrestamo -> préstamo sin finalizar.
+
+    Retorno:
+        dict: Índice con las claves "prestamos" (el mismo _activos), "porAlumno" y "porLibro"
+        (id -> lista de idPrestamo).
+    """
+    indice = {"prestamos": _activos, "porAlumno": {}, "porLibro": {}}
+    for idPrestamo, prestamo in _activos.items():
+        indice["porAlumno"].setdefault(prestamo["idAlumno"], []).append(idPrestamo)
+        indice["porLibro"].setdefault(prestamo["idLibro"], []).append(idPrestamo)
+    return indice
+
+def reconstruirPrestamosActivos():
+    """
+    Arma el índice de préstamos activos recorriendo todo el historial y lo guarda. Solo se usa
+    cuando el índice todavía no existe o no está al día con el historial (ver verificarDerivados);
+    después se mantiene con cada alta y finalización.
+
+    Retorno:
+        dict: Índice con las claves "prestamos" (idPrestamo -> préstamo), "porAlumno" y "porLibro"
+        (id -> lista de idPrestamo).
+    """
+    prestamos = cargarArchivo(PRESTAMOS_ARCHIVO) or {}
+    activos = {clave: prestamo for clave, prestamo in prestamos.items() if prestamo["fechaFinalizacion"] == ""}
+    escribirArchivo(PRESTAMOS_ACTIVOS_ARCHIVO, activos)
+    return vistaDerivada(PRESTAMOS_ACTIVOS_ARCHIVO, activos, agruparPrestamosActivos)
+
+def cargarPrestamosActivos():
+    """
+    Carga el índice de préstamos activos, construyéndolo la primera vez si no existe o si no está
+    al día con el historial (ver verificarDerivados).
+
+    Retorno:
+        dict: Índice con las claves "prestamos", "porAlumno" y "porLibro". Para modificarlo se usan
+        agregarPrestamoActivo y quitarPrestamoActivo.
+    """
+    verificarDerivados()
+    activos = cargarArchivo(PRESTAMOS_ACTIVOS_ARCHIVO) if existeArchivo(PRESTAMOS_ACTIVOS_ARCHIVO) else None
+    if activos is None or "porAlumno" in activos: # Formato anterior: todo el índice en un solo objeto
+        return reconstruirPrestamosActivos()
+    return vistaDerivada(PRESTAMOS_ACTIVOS_ARCHIVO, activos, agruparPrestamosActivos)
+
+def agregarPrestamoActivo(_indice, _prestamo):
+    """
+    Agrega un préstamo al índice de activos, por ID y en los grupos de su alumno y su libro, y
+    escribe solo ese préstamo en el diario de prestamos_activos.json.
+
+    Parámetros:
+        _indice (dict): Índice de préstamos activos.
+        _prestamo (dict): Préstamo sin finalizar.
+
+    Retorno:
+        None: Se modifica el índice y devuelve None.
+    """
+    idPrestamo = _prestamo["idPrestamo"]
+    yaIndexado = idPrestamo in _indice["prestamos"]
+    guardarRegistro(PRESTAMOS_ACTIVOS_ARCHIVO, idPrestamo, _prestamo, _indice["prestamos"])
+    if not yaIndexado:
+        _indice["porAlumno"].setdefault(_prestamo["idAlumno"], []).append(idPrestamo)
+        _indice["porLibro"].setdefault(_prestamo["idLibro"], []).append(idPrestamo)
+    return None
+
+def quitarPrestamoActivo(_indice, _idPrestamo):
+    """
+    Quita un préstamo del índice de activos y de los grupos de su alumno y su libro, y anota el
+    borrado en el diario de prestamos_activos.json.
+
+    Parámetros:
+        _indice (dict): Índice de préstamos activos.
+        _idPrestamo (str): ID del préstamo finalizado.
+
+    Retorno:
+        None: Se modifica el índice y devuelve None.
+    """
+    prestamo = _indice["prestamos"].get(_idPrestamo)
+    if prestamo is None:
+        return None
+
+    guardarRegistro(PRESTAMOS_ACTIVOS_ARCHIVO, _idPrestamo, None, _indice["prestamos"])
+    for grupo, id in (("porAlumno", prestamo["idAlumno"]), ("porLibro", prestamo["idLibro"])):
+        ids = _indice[grupo].get(id, [])
+        if _idPrestamo in ids:
+            ids.remove(_idPrestamo)
+        if not ids:
+            _indice[grupo].pop(id, None)
+    return None
+
+def reconstruirIndicePrestamos(_direccion):
+    """
+    Arma un índice del historial (ver INDICES_DE_PRESTAMOS) recorriendo todos los préstamos y lo
+    guarda. Solo se usa cuando el índice todavía no existe o no está al día con el historial (ver
+    verificarDerivados); después se mantiene con cada alta.
+
+    Parámetros:
+        _direccion (str): Ruta del índice.
+
+    Retorno:
+        dict: {id de alumno o libro: [idPrestamo, ...]} en el orden del historial.
+    """
+    campo = INDICES_DE_PRESTAMOS[_direccion]
+    indice = {}
+    for clave, prestamo in recorrerPrestamos():
+        indice.setdefault(prestamo[campo], []).append(clave)
+    escribirArchivo(_direccion, indice)
+    return indice
+
+def cargarIndicePrestamos(_direccion):
+    """
+    Carga un índice del historial, construyéndolo la primera vez si no existe o si no está al día
+    con el historial (ver verificarDerivados).
+
+    Parámetros:
+        _direccion (str): Ruta del índice.
+
+    Retorno:
+        dict: {id de alumno o libro: [idPrestamo, ...]}.
+    """
+    verificarDerivados()
+    if not existeArchivo(_direccion):
+        return reconstruirIndicePrestamos(_direccion)
+    return cargarArchivo(_direccion)
+
+def indexarPrestamo(_indices, _prestamo):
+    """
+    Agrega un préstamo nuevo a los índices del historial por alumno y por libro. Cada índice lleva
+    diario: se escribe solo la lista del alumno o libro afectado.
+
+    Parámetros:
+        _indices (dict): Ruta del índice -> índice cargado.
+        _prestamo (Prestamo): Préstamo recién registrado.
+
+    Retorno:
+        None
+    """
+    idPrestamo = _prestamo["idPrestamo"]
+    for direccion, indice in _indices.items():
+        id = _prestamo[INDICES_DE_PRESTAMOS[direccion]]
+        ids = indice.get(id, [])
+        if idPrestamo in ids: # Ya indexado al reconstruir el índice
+            continue
+        guardarRegistro(direccion, id, ids + [idPrestamo], indice)
+    return None
+
+def versionDelHistorial():
+    """
+    Obtiene un valor barato de calcular que cambia cada vez que cambia el historial de préstamos:
+    la firma de prestamos.json y su diario o, con sqlite, la versión de datos de la base (cambia
+    cuando otra conexión confirma cambios; los de este proceso se anotan al confirmarlos).
+
+    Retorno:
+        tuple: Versión del historial.
+    """
+    if usaBaseDatos(PRESTAMOS_ARCHIVO):
+        return versionDeLaBase()
+    return firmaArchivo(PRESTAMOS_ARCHIVO)
+
+def firmaDelHistorial():
+    """
+    Calcula la firma del historial de préstamos que se guarda en ORIGEN_DERIVADOS_ARCHIVO. Con JSON
+    es la firma de prestamos.json y su diario; con sqlite, el contador de cambios de la tabla (lo
+    suben sus triggers con cada alta, cambio o baja, la haga quien la haga) y el mayor ID.
+
+    Retorno:
+        list: Firma del historial (en la misma forma en que queda en el JSON).
+    """
+    if usaBaseDatos(PRESTAMOS_ARCHIVO):
+        fila = conectarBaseDatos().execute(
+            "SELECT (SELECT valor FROM metadatos WHERE clave = 'versionPrestamos'), (SELECT MAX(id) FROM prestamos)"
+        ).fetchone()
+        return ["sqlite", fila[0], fila[1]]
+    return json.loads(json.dumps(["json", firmaArchivo(PRESTAMOS_ARCHIVO)]))
+
+def leerOrigen():
+    """
+    Lee la firma del historial con la que se escribieron por última vez los archivos derivados.
+
+    Retorno:
+        list|None: Firma guardada, o None si no hay o es de otro formato de derivados.
+    """
+    try:
+        archivo = open(ORIGEN_DERIVADOS_ARCHIVO, mode="r", encoding="utf-8")
+        try:
+            origen = json.load(archivo)
+        finally:
+            archivo.close()
+    except (FileNotFoundError, ValueError):
+        return None
+    if not isinstance(origen, dict) or origen.get("formato") != FORMATO_DERIVADOS:
+        return None
+    return origen.get("firma")
+
+def escribirOrigen(_firma):
+    """
+    Guarda de forma atómica la firma del historial con la que quedaron al día los archivos
+    derivados. Se escribe siempre después de ellos.
+
+    Parámetros:
+        _firma (list): Firma del historial (ver firmaDelHistorial).
+
+    Retorno:
+        None
+    """
+    temporal = escribirTemporal(ORIGEN_DERIVADOS_ARCHIVO, {"formato": FORMATO_DERIVADOS, "firma": _firma})
+    os.replace(temporal, ORIGEN_DERIVADOS_ARCHIVO)
+    return None
+
+def derivadosAlDia():
+    """
+    Indica si los archivos derivados del historial (ARCHIVOS_DERIVADOS y las particiones) están al
+    día con prestamos.json, comparando la firma del historial con la guardada en
+    ORIGEN_DERIVADOS_ARCHIVO, sin escribir nada. Cada proceso vuelve a comparar solo cuando el
+    historial cambió desde la última comprobación.
+
+    Retorno:
+        bool: True si están al día.
+    """
+    global origenVerificado
+    version = versionDelHistorial()
+    if origenVerificado is not None and origenVerificado == version:
+        return True
+    if leerOrigen() == firmaDelHistorial():
+        origenVerificado = version
+        return True
+    return False
+
+def verificarDerivados():
+    """
+    Comprueba que los archivos derivados del historial estén al día (ver derivadosAlDia). Si no lo
+    están (un corte entre la escritura del historial y la de los derivados, un prestamos.json
+    editado o restaurado a mano, un cambio de formato) se reconstruyen todos, con los archivos de
+    préstamo bloqueados.
+
+    Retorno:
+        None
+    """
+    if not derivadosAlDia():
+        ejecutarEnLote(ARCHIVOS_DE_PRESTAMO, actualizarDerivados, False)
+    return None
+
+def actualizarDerivados(_forzar=False):
+    """
+    Con los archivos de préstamo ya bloqueados, vuelve a comparar la firma del historial (otra
+    terminal pudo haberlos reconstruido mientras se esperaba el bloqueo) y, si no coincide o si se
+    pide, reconstruye todos los archivos derivados y las particiones. Se ejecuta dentro de un lote:
+    los derivados se escriben junto con él y la firma nueva al confirmarlo (ver escribirPendientes).
+
+    Parámetros:
+        _forzar (bool): Si es True, reconstruye aunque la firma coincida.
+
+    Retorno:
+        bool: True si se reconstruyeron.
+    """
+    global origenVerificado
+    version = versionDelHistorial()
+    if not _forzar and leerOrigen() == firmaDelHistorial():
+        origenVerificado = version
+        return False
+
+    reconstruirPrestamosActivos()
+    reconstruirAgregados()
+    if not usaBaseDatos(PRESTAMOS_ARCHIVO): # Con sqlite los índices y las particiones no se usan
+        for direccion in INDICES_DE_PRESTAMOS:
+            reconstruirIndicePrestamos(direccion)
+        reconstruirParticiones()
+    origenVerificado = version
+    return True
+
+def pedirYValidarId(_diccionario, _etiqueta, _validarExistente, _validacion):
+    """
+    Solicita un ID y valida su existencia o inexistencia según lo que se ingrese como parámetro.
+
+    Parámetros:
+        _diccionario (dict): Diccionario donde buscar la existencia o inexistencia de un valor.
+        _etiqueta (str): Nombre para el mensaje de error (ej. "alumno", "libro").
+        _validarExistente (bool): True si el ID debe existir y estar activo, False si debe ser nuevo.
+        _validacion (str): Tipo de validación para el ID ("id" o "idPrestamo").
+
+    Retorno:
+        str|None: ID validado (en mayúsculas) o None si el usuario ingresa '0' para volver o se captura 
+        una excepción.
+    """
+    try:
+        entrada = validarDato(input(f"Ingrese el ID del {_etiqueta}: "), "id", _validacion).strip().upper()
+
+        # Caso id préstamo: _diccionario tiene solo los préstamos activos
+        if _validacion == "idPrestamo" and _validarExistente:
+            valido = False
+            while not valido:
+                if entrada == "0": # Opción de volver
+                    return None
+                
+                if entrada not in _diccionario: # Chequeo existencia del id entre los activos
+                    print("Error: el ID de préstamo no existe o ya fue finalizado.")
+                else:
+                    valido = True
+
+                if not valido:
+                    entrada = validarDato(
+                        input("Por favor ingrese un ID de préstamo válido (0 para volver): "),
+                        "préstamo",
+                        "idPrestamo"
+                    ).strip().upper()
+            return entrada
+        
+        # Caso id alumno/libro: chequeo de campo 'activo'
+        if _validarExistente and _validacion != "idPrestamo":
+            while entrada not in _diccionario or not _diccionario[entrada]["activo"]:
+                print(f"Error: el ID del {_etiqueta} no existe o está inactivo.")
+                entrada = input(f"Por favor, ingrese el ID del {_etiqueta} (0 para volver): ").strip().upper()
+                if entrada == "0": # Opción de volver
+                    return None
+                else:
+                    entrada = validarDato(entrada, "id", _validacion).upper()
+
+            return entrada
+        else:
+            # Caso creación de nuevo id: chequeo de no existencia previa
+            while entrada in _diccionario:
+                print(f"Error: el ID del {_etiqueta} que ingresó ya existe.")
+                entrada = input(f"Por favor ingrese un nuevo ID del {_etiqueta} (0 para volver): ").strip().upper()
+                if entrada == "0": # Opción de volver
+                    return None
+                else:
+                    entrada = validarDato(entrada, "id", _validacion).upper()
+
+            return entrada
+    except Exception as e:
+        print(f"Error inesperado en el pedido y validación de ID: {e}")
+        return None
+    
+def obtenerValor(_etiqueta, _tipoDato):
+    """
+    Pide al usuario el valor correspondiente a un campo y lo valida según su tipo de dato.
+
+    Parámetros:
+        _etiqueta (str): Nombre del campo a solicitar (ej. "autores", "costo", etc.).
+        _tipoDato (str): Tipo de validación a aplicar ("autores", "numero", "string", "email", "direccion", etc.).
+
+    Retorno:
+        dict|int|str|None: 
+            - Si el campo es "autores", devuelve un diccionario con las claves "autor1", "autor2" y "autor3".  
+            - Si el tipo de dato es "numero", devuelve un entero.  
+            - Para otros tipos, devuelve la cadena validada.
+            - Si se captura una excepción lo informa y devuelve None.
+    """
+    try:
+        if _etiqueta == "autores":
+            autores = validarDato(input("\nIngresar autores (separados por coma, máx 3): ").strip(), "autores", "autores")
+            return convertirValor("autores", autores)
+
+        if _tipoDato == "numero":
+            mensaje = "Ingresar costo de garantía ($): " if _etiqueta == "costo" else f"Ingresar {_etiqueta}: "
+            entrada = validarDato(input(mensaje), _etiqueta, "numero")
+            return convertirValor("numero", entrada)
+
+        # Valida el resto de los tipos de datos (string, email, dirección, etc.)
+        mensaje = f"Ingresar {_etiqueta}: "
+        entrada = validarDato(input(mensaje), _etiqueta, _tipoDato)
+        return entrada
+    except Exception as e:
+        print(f"Error inesperado al obtener valor: {e}")
+        return None
+
+def convertirValor(_tipoDato, _dato):
+    """
+    Convierte un dato ya validado al formato con el que se guarda en el registro.
+
+    Parámetros:
+        _tipoDato (str): Tipo de dato del campo ("autores", "numero", "string", etc.).
+        _dato (str): Cadena validada.
+
+    Retorno:
+        dict|int|str:
+            - Si el tipo es "autores", un diccionario con las claves "autor1", "autor2" y "autor3".
+            - Si el tipo es "numero", un entero.
+            - Para otros tipos, la cadena sin espacios al inicio y al final.
+    """
+    if _tipoDato == "autores":
+        autoresCortados = [
+            parte.strip() for parte in _dato.split(",") if parte.strip() # Separa la cadena de autores por coma y elimina los espacios en blanco al ppio y al final
+        ]
+        autoresRellenados = (autoresCortados + ["", "", ""])[:3] # Rellena con 3 cadenas vacías y aplica un slice para solo obtener 3 elementos
+        return {
+            "autor1": autoresRellenados[0], # Completa el diccionario con cada uno de los elementos
+            "autor2": autoresRellenados[1],
+            "autor3": autoresRellenados[2],
+        }
+
+    if _tipoDato == "numero":
+        return int(_dato)
+
+    return _dato.strip()
+
+def atributoDeCampo(_campo):
+    """
+    Obtiene el atributo del registro que corresponde a una ruta de campo del esquema.
+
+    Parámetros:
+        _campo (str): Ruta del campo (ej. "nombre", "telefono.celular").
+
+    Retorno:
+        str: Nombre del atributo (ej. "nombre", "celular").
+    """
+    return _campo.rsplit(".", 1)[-1]
+
+def asignarValorEnRegistro(_registro, _campo, _valor):
+    """
+    Asigna un valor a un campo de un registro.
+
+    Parámetros:
+        _registro (Registro): Registro donde se guardará el valor.
+        _campo (str): Ruta del campo del esquema. En las rutas anidadas del JSON (ej.
+        "telefono.celular") el último nivel es el atributo del registro.
+        _valor: Valor a asignar en el registro.
+
+    Retorno:
+        None: Se modifica el registro y devuelve None. Si se captura una excepción lo informa 
+        y devuelve None.
+    """
+    try:
+        setattr(_registro, atributoDeCampo(_campo), _valor)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al asignar valor al registro: {e}")
+        return None
+
+def versionDeRegistro(_registro):
+    """
+    Obtiene la versión de un registro, que aumenta en 1 cada vez que se guarda un cambio. Los
+    registros creados antes del versionado se consideran versión 0.
+
+    Parámetros:
+        _registro (dict|None): Registro de alumno o libro.
+
+    Retorno:
+        int|None: Versión del registro, o None si el registro no existe.
+    """
+    if _registro is None:
+        return None
+    return _registro.get("version", 0)
+
+def nuevaVersion(_registro):
+    """
+    Aumenta en 1 la versión de un registro que está por guardarse.
+
+    Parámetros:
+        _registro (dict): Registro de alumno o libro.
+
+    Retorno:
+        None: Se modifica el registro y devuelve None.
+    """
+    _registro["version"] = versionDeRegistro(_registro) + 1
+    return None
+
+def guardarRegistroNuevo(_ruta, _etiqueta, _id, _registro):
+    """
+    Guarda un registro nuevo con el archivo bloqueado, verificando que otra terminal no haya
+    creado el mismo ID mientras se cargaban los datos.
+
+    Parámetros:
+        _ruta (str): Ruta del archivo JSON donde se guardan los registros.
+        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
+        _id (str): ID del nuevo registro.
+        _registro (dict): Registro a guardar.
+
+    Retorno:
+        bool: True si se guardó, False si el ID ya existe (se informa el motivo).
+    """
+    bloqueos = bloquearArchivos([_ruta])
+    try:
+        diccionario = cargarArchivo(_ruta)
+        if _id in diccionario:
+            print(f"Error: el ID del {_etiqueta} {_id} ya existe.")
+            return False
+        _registro["version"] = 1
+        guardarRegistro(_ruta, _id, _registro, diccionario)
+        return True
+    finally:
+        liberarArchivos(bloqueos)
+
+def actualizarRegistro(_ruta, _etiqueta, _id, _cambios, _registroLeido=None):
+    """
+    Aplica cambios a un registro activo con control optimista de versiones: el registro se lee sin
+    bloquear, y recién al guardar se bloquea el archivo y se verifica que siga en la versión leída.
+    Si otra terminal lo modificó en el medio pero sin tocar los campos que se cambian, los cambios
+    se aplican sobre la versión actual; si tocó alguno de ellos no se guarda nada, para no pisar su
+    valor, y se informa el valor actual para que el usuario decida.
+
+    Parámetros:
+        _ruta (str): Ruta del archivo JSON donde se guardan los registros.
+        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
+        _id (str): ID del registro a modificar.
+        _cambios (list): Tuplas (campo o ruta de campo, valor) a asignar.
+        _registroLeido (Registro|None): Registro tal como estaba cuando el usuario decidió el
+        cambio. Si es None se toma el registro actual.
+
+    Retorno:
+        bool: True si el registro se guardó, False si no existe, está inactivo o sus campos fueron
+        cambiados desde otra terminal (se informa el motivo).
+    """
+    bloqueos = bloquearArchivos([_ruta])
+    try:
+        diccionario = cargarArchivo(_ruta)
+        actual = diccionario.get(_id)
+        if actual is None or not actual["activo"]:
+            print(f"Error: el ID del {_etiqueta} {_id} no existe o está inactivo.")
+            return False
+
+        if _registroLeido is not None and versionDeRegistro(actual) != versionDeRegistro(_registroLeido):
+            # Otra terminal guardó el registro después de leerlo: solo se sigue si cambió otros campos
+            atributos = [atributoDeCampo(campoReal) for campoReal, valor in _cambios]
+            enConflicto = [
+                atributo for atributo in atributos
+                if getattr(actual, atributo, None) != getattr(_registroLeido, atributo, None)
+            ]
+            if enConflicto:
+                print(f"Error: el {_etiqueta} {_id} fue modificado desde otra terminal y el cambio no se guardó. Valores actuales:")
+                for atributo in enConflicto:
+                    print(f"- {atributo}: {getattr(actual, atributo, None)}")
+                print("Revise los valores y vuelva a intentarlo.")
+                return False
+            print(f"Aviso: el {_etiqueta} {_id} fue modificado desde otra terminal en otros campos; se aplica el cambio sobre la versión actual.")
+
+        # Trabaja sobre una copia: la caché solo cambia a través de guardarRegistro
+        registro = copy.deepcopy(actual)
+        for campoReal, valor in _cambios:
+            asignarValorEnRegistro(registro, campoReal, valor)
+        nuevaVersion(registro)
+        guardarRegistro(_ruta, _id, registro, diccionario)
+        return True
+    finally:
+        liberarArchivos(bloqueos)
+
+def crearRegistro(_ruta, _etiqueta, _esquema):
+    """
+    Pide datos al usuario según un esquema y crea un nueva registro en el archivo JSON.
+
+    Parámetros:
+        _ruta (str): Ruta del archivo JSON donde se guardaran los registros.
+        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
+        _esquema (dict): Estructura que define el campo ID y la lista de campos que se pediran.
+    
+    Retorno:
+        None: Se crea el registro, se guarda sobre el archivo JSON y devuelve None. Si el usuario 
+        ingresa '0' para volver o se captura una excepción se informa y devuelve None.
+    """
+    try:
+        diccionario = cargarArchivo(_ruta)
+
+        # Pide y valida el id
+        idValidador = _esquema['id']
+        id = pedirYValidarId(diccionario, _etiqueta, False, idValidador)
+        if id is None:
+            return None
+
+        # Crea el registro con el flag activo True
+        registro = Alumno() if _etiqueta == "alumno" else Libro()
+
+        # Construye el mapa donde vuelca el esquema con el formato: etiqueta -> (campoReal, tipoDato)
+        opciones = {
+            etiqueta: (campoReal, tipoDato)
+            for etiqueta, campoReal, tipoDato in _esquema['campos']
+        }
+
+        # Para cada campo del esquema pide el valor y lo asigna
+        for etiqueta, (campoReal, tipoDato) in opciones.items():
+            valor = obtenerValor(etiqueta, tipoDato)
+            asignarValorEnRegistro(registro, campoReal, valor)
+
+        # En el caso de alumno inicializa las infracciones en 0
+        if _etiqueta == "alumno":
+            registro["infracciones"] = 0
+
+        # Guarda el registro correspondiente al id, si otra terminal no lo creó mientras tanto
+        if not guardarRegistroNuevo(_ruta, _etiqueta, id, registro):
+            return None
+
+        print(f"{_etiqueta.capitalize()} {id} registrado correctamente.")
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al crear registro: {e}")
+        return None
+
+def modificarRegistro(_ruta, _etiqueta, _esquema):
+    """
+    Pide un campo y un nuevo valor para modificar un registro existente en el archivo JSON.
+
+    Parámetros:
+        _ruta (str): Ruta del archivo JSON donde se guardaran los registros.
+        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
+        _esquema (dict): Estructura que define el campo ID y la lista de campos disponibles para modificar.
+    
+    Retorno:
+        None: Se modifica el registro, se guarda sobre el archivo JSON y devuelve None. Si el usuario 
+        ingresa '0' para volver o se captura una excepción se informa y devuelve None.
+    """
+    try:
+        diccionario = cargarArchivo(_ruta)
+
+        # Pide y valida el id
+        idValidador = _esquema['id']
+        id = pedirYValidarId(diccionario, _etiqueta, True, idValidador)
+        if id is None:
+            return None
+        registroLeido = diccionario[id] # Los registros en memoria no se modifican: se reemplazan al guardar
+
+        # Construye el mapa donde vuelca el esquema con el formato: etiqueta -> (campoReal, tipoDato)
+        opciones = {
+            etiqueta: (campoReal, tipoDato)
+            for etiqueta, campoReal, tipoDato in _esquema["campos"]
+        }
+
+        # Muestra menú de campos modificables
+        print("\nCampos disponibles para modificar:")
+        for etiqueta in opciones:
+            print(f"- {etiqueta}")
+
+        # Pide y valida la selección
+        etiquetaSeleccionada = validarDato(
+            input("\nIngresá el campo a modificar (respetando tildes): ").strip().lower(),
+            "campo",
+            "string"
+        )
+        while etiquetaSeleccionada not in opciones:
+            etiquetaSeleccionada = validarDato(
+                input("Error. Por favor ingrese un campo disponible de la lista: ").strip().lower(),
+                "campo",
+                "string"
+            )
+
+        # Obtiene la ruta y el tipo de dato del campo seleccionado
+        campoReal, tipoDato = opciones[etiquetaSeleccionada]
+        
+        # Pide el valor y lo guarda, controlando que nadie haya cambiado el registro mientras tanto
+        valor = obtenerValor(etiquetaSeleccionada, tipoDato)
+        if not actualizarRegistro(_ruta, _etiqueta, id, [(campoReal, valor)], registroLeido):
+            return None
+
+        print(f"\n{_etiqueta.capitalize()} {id} modificado correctamente.")
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al modificar registro: {e}")
+        return None
+
+def inactivarRegistro(_ruta, _etiqueta, _esquema):
+    """
+    Marca como inactiva un registro existente guardando su campo "activo" en False.
+
+    Parámetros:
+        _ruta (str): Ruta del archivo JSON donde se guardaran los registros.
+        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
+        _esquema (dict): Estructura que define el campo ID del registro.
+    
+    Retorno:
+        None: Se inactiva el registro, se guarda sobre el archivo JSON y devuelve None. Si el usuario 
+        ingresa '0' para volver o se captura una excepción se informa y devuelve None.
+    """
+    try:
+        diccionario = cargarArchivo(_ruta)
+
+        # Pide y valida el id
         idValidador = _esquema['id']
         id = pedirYValidarId(diccionario, _etiqueta, True, idValidador)
         if id is None:
             return None
 
-        # Construye el mapa donde vuelca el esquema con el formato: etiqueta -> (campoReal, tipoDato)
-        opciones = {
-            etiqueta: (campoReal, tipoDato)
-            for etiqueta, campoReal, tipoDato in _esquema["campos"]
-        }
+        # Sobreescribe el campo 'activo' de ese id en False
+        if not actualizarRegistro(_ruta, _etiqueta, id, [('activo', False)]):
+            return None
+
+        print(f"{_etiqueta.capitalize()} {id} inactivado correctamente.")
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al inactivar registro: {e}")
+        return None
+
+def validarYConvertirValor(_etiqueta, _tipoDato, _valor):
+    """
+    Valida un valor recibido sin interacción con el usuario y lo convierte al formato del registro.
+
+    Parámetros:
+        _etiqueta (str): Nombre del campo para el mensaje de error.
+        _tipoDato (str): Tipo de validación del campo.
+        _valor (str|int): Valor recibido (los números pueden llegar como int).
+
+    Retorno:
+        tuple: (valor convertido, None) si es válido, o (None, motivo) si no lo es.
+    """
+    dato = "" if _valor is None else str(_valor).strip()
+    if not obtenerValidador(_tipoDato)(dato):
+        return None, f"el valor '{dato}' no es un/a {_etiqueta} válido/a"
+    return convertirValor(_tipoDato, dato), None
+
+def armarRegistroNuevo(_diccionario, _etiqueta, _esquema, _id, _valores):
+    """
+    Valida el ID y todos los campos de un registro nuevo y lo arma con la forma del archivo JSON.
+
+    Parámetros:
+        _diccionario (dict): Registros existentes (para rechazar IDs repetidos).
+        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
+        _esquema (dict): Estructura que define el campo ID y la lista de campos.
+        _id (str): ID del nuevo registro.
+        _valores (dict): Valores por etiqueta de campo (ej. {"nombre": "Ana", "celular": "1122334455"}).
+
+    Retorno:
+        tuple: (id, registro, None) si todo es válido, o (id, None, motivo) si no lo es.
+    """
+    id = "" if _id is None else str(_id).strip().upper()
+    if not obtenerValidador(_esquema['id'])(id):
+        return id, None, f"el ID '{id}' no es un ID de {_etiqueta} válido"
+    if id in _diccionario:
+        return id, None, f"el ID del {_etiqueta} {id} ya existe"
+
+    # Crea el registro con el flag activo True y valida cada campo del esquema
+    registro = Alumno() if _etiqueta == "alumno" else Libro()
+    for etiqueta, campoReal, tipoDato in _esquema['campos']:
+        valor, motivo = validarYConvertirValor(etiqueta, tipoDato, _valores.get(etiqueta))
+        if motivo is not None:
+            return id, None, motivo
+        asignarValorEnRegistro(registro, campoReal, valor)
+
+    # En el caso de alumno inicializa las infracciones en 0
+    if _etiqueta == "alumno":
+        registro["infracciones"] = 0
+    return id, registro, None
+
+def crearRegistroConDatos(_ruta, _etiqueta, _esquema, _id, _valores):
+    """
+    Crea un registro sin interacción con el usuario a partir de un ID y los valores de todos los
+    campos del esquema.
+
+    Parámetros:
+        _ruta (str): Ruta del archivo JSON donde se guardan los registros.
+        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
+        _esquema (dict): Estructura que define el campo ID y la lista de campos.
+        _id (str): ID del nuevo registro.
+        _valores (dict): Valores por etiqueta de campo (ej. {"nombre": "Ana", "celular": "1122334455"}).
+
+    Retorno:
+        bool: True si el registro se creó, False si algún dato no es válido (se informa el motivo).
+    """
+    diccionario = cargarArchivo(_ruta)
+
+    id, registro, motivo = armarRegistroNuevo(diccionario, _etiqueta, _esquema, _id, _valores)
+    if motivo is not None:
+        print(f"Error: {motivo}.")
+        return False
+
+    return guardarRegistroNuevo(_ruta, _etiqueta, id, registro)
+
+def modificarRegistroConDatos(_ruta, _etiqueta, _esquema, _id, _valores):
+    """
+    Modifica uno o más campos de un registro activo sin interacción con el usuario. Si algún valor
+    no es válido no se modifica ningún campo.
+
+    Parámetros:
+        _ruta (str): Ruta del archivo JSON donde se guardan los registros.
+        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
+        _esquema (dict): Estructura que define la lista de campos modificables.
+        _id (str): ID del registro a modificar.
+        _valores (dict): Nuevos valores por etiqueta de campo.
+
+    Retorno:
+        bool: True si el registro se modificó, False en caso contrario (se informa el motivo).
+    """
+    diccionario = cargarArchivo(_ruta)
+
+    id = str(_id).strip().upper()
+    if id not in diccionario or not diccionario[id]["activo"]:
+        print(f"Error: el ID del {_etiqueta} {id} no existe o está inactivo.")
+        return False
+
+    opciones = {
+        etiqueta: (campoReal, tipoDato)
+        for etiqueta, campoReal, tipoDato in _esquema["campos"]
+    }
+
+    # Valida todos los valores antes de asignar alguno
+    cambios = []
+    for etiqueta, valor in _valores.items():
+        if etiqueta not in opciones:
+            print(f"Error: '{etiqueta}' no es un campo de {_etiqueta} modificable.")
+            return False
+        campoReal, tipoDato = opciones[etiqueta]
+        valorConvertido, motivo = validarYConvertirValor(etiqueta, tipoDato, valor)
+        if motivo is not None:
+            print(f"Error: {motivo}.")
+            return False
+        cambios.append((campoReal, valorConvertido))
+
+    return actualizarRegistro(_ruta, _etiqueta, id, cambios)
+
+def inactivarRegistroPorId(_ruta, _etiqueta, _id):
+    """
+    Marca como inactivo un registro activo sin interacción con el usuario.
+
+    Parámetros:
+        _ruta (str): Ruta del archivo JSON donde se guardan los registros.
+        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
+        _id (str): ID del registro a inactivar.
+
+    Retorno:
+        bool: True si el registro se inactivó, False si no existe o ya estaba inactivo.
+    """
+    diccionario = cargarArchivo(_ruta)
+
+    id = str(_id).strip().upper()
+    if id not in diccionario or not diccionario[id]["activo"]:
+        print(f"Error: el ID del {_etiqueta} {id} no existe o está inactivo.")
+        return False
+
+    return actualizarRegistro(_ruta, _etiqueta, id, [('activo', False)])
+
+def resolverCampoListado(_esquema, _campo):
+    """
+    Obtiene el atributo del registro que corresponde a un campo indicado para ordenar o filtrar
+    un listado.
+
+    Parámetros:
+        _esquema (dict): Esquema del listado (ej. ALUMNO_ESQUEMA_LISTADO).
+        _campo (str): Etiqueta del campo (ej. "apellido", "género"), su atributo (ej. "genero") o "id".
+
+    Retorno:
+        str|None: Nombre del atributo ("id" para la clave del registro) o None si el campo no existe.
+    """
+    campo = _campo.strip().lower()
+    if campo == _esquema['id']:
+        return "id"
+    for etiqueta, campoReal, tipoDato in _esquema['campos']:
+        atributo = atributoDeCampo(campoReal)
+        if campo in (etiqueta.lower(), atributo.lower()):
+            return atributo
+    return None
+
+def recorrerRegistros(_ruta, _esquema, _filtros=None, _orden=None):
+    """
+    Recorre los registros activos de una colección de a uno, sin copiarla. Sin orden los registros
+    salen en el orden del archivo y el recorrido se puede cortar en cualquier momento (ej. con
+    itertools.islice) sin haber visitado el resto.
+
+    Parámetros:
+        _ruta (str): Ruta del archivo JSON donde se guardan los registros.
+        _esquema (dict): Esquema del listado, con los campos por los que se puede filtrar u ordenar.
+        _filtros (dict|None): Valor buscado por campo (ej. {"género": "novela"}). Los textos deben
+        contener el valor, sin distinguir mayúsculas; el resto de los campos debe ser igual.
+        _orden (list|None): Campos por los que se ordena, en orden de prioridad. Un "-" adelante
+        ordena ese campo de mayor a menor (ej. ["-costo", "título"]).
+
+    Retorno:
+        iterator: Pares (id, registro) de los registros activos que cumplen los filtros.
+    """
+    filtros = []
+    for campo, valor in (_filtros or {}).items():
+        atributo = resolverCampoListado(_esquema, campo)
+        if atributo is None:
+            raise ValueError(f"el campo '{campo}' no existe")
+        filtros.append((atributo, str(valor).strip().casefold()))
+
+    orden = []
+    for campo in (_orden or []):
+        descendente = campo.startswith("-")
+        atributo = resolverCampoListado(_esquema, campo.lstrip("-"))
+        if atributo is None:
+            raise ValueError(f"el campo '{campo.lstrip('-')}' no existe")
+        orden.append((atributo, descendente))
+
+    def cumpleFiltros(_par):
+        for atributo, buscado in filtros:
+            valor = _par[0] if atributo == "id" else getattr(_par[1], atributo)
+            if isinstance(valor, str):
+                if buscado not in valor.casefold():
+                    return False
+            elif str(valor).casefold() != buscado:
+                return False
+        return True
+
+    registros = (par for par in cargarArchivo(_ruta).items() if par[1].activo)
+    if filtros:
+        registros = filter(cumpleFiltros, registros)
+    if not orden:
+        return registros
+
+    # Ordenar obliga a ver todos los registros; se ordena por el último campo primero (el orden
+    # de Python es estable) y cada campo en su sentido
+    registros = list(registros)
+    for atributo, descendente in reversed(orden):
+        def claveDeOrden(_par, _atributo=atributo):
+            valor = _par[0] if _atributo == "id" else getattr(_par[1], _atributo)
+            if isinstance(valor, str):
+                valor = valor.casefold()
+            return (valor is None, valor if valor is not None else 0)
+        registros.sort(key=claveDeOrden, reverse=descendente)
+    return iter(registros)
+
+def formatearPaginaRegistros(_registros, _esquema):
+    """
+    Arma el texto de una página del listado de registros.
+
+    Parámetros:
+        _registros (list): Pares (id, registro) de la página.
+        _esquema (dict): Estructura que define la lista de campos a mostrar.
+
+    Retorno:
+        str: Texto de la página, con un bloque por registro.
+    """
+    atributos = [(etiqueta.upper(), atributoDeCampo(campoReal)) for etiqueta, campoReal, tipoDato in _esquema['campos']]
+    separador = "-" * 50
+    lineas = []
+    for id, registro in _registros:
+        lineas.append(f"ID: {id}")
+        for etiqueta, atributo in atributos:
+            lineas.append(f"{etiqueta}: {getattr(registro, atributo)}")
+        lineas.append(separador)
+    return "\n".join(lineas) + "\n"
+
+def listarRegistros(_ruta, _etiqueta, _esquema, _filtros=None, _orden=None, _desde=0, _cantidad=None, _pausar=True, _tamanioPagina=TAMANIO_PAGINA_LISTADO):
+    """
+    Muestra por consola el listado de los registros activos según el esquema, de a una página por
+    vez. Cada página se imprime con una sola escritura y solo se recorren los registros que se
+    muestran, así que la primera página aparece enseguida aunque la colección sea muy grande.
+
+    Parámetros:
+        _ruta (str): Ruta del archivo JSON donde se guardan los registros.
+        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
+        _esquema (dict): Estructura que define la lista de campos a mostrar.
+        _filtros (dict|None): Valor buscado por campo (ver recorrerRegistros).
+        _orden (list|None): Campos por los que se ordena (ver recorrerRegistros).
+        _desde (int): Cantidad de registros que se saltean antes del primero que se muestra.
+        _cantidad (int|None): Máximo de registros a mostrar. None muestra todos.
+        _pausar (bool): True para preguntar antes de cada página siguiente (menú), False para
+        imprimirlas seguidas (línea de comandos).
+        _tamanioPagina (int): Registros por página.
+    
+    Retorno:
+        None: Se lista el registro y devuelve None. Si no se encontraron registros activos 
+        o se captura una excepción se informa y devuelve None.
+    """
+    try:
+        registros = recorrerRegistros(_ruta, _esquema, _filtros, _orden)
+        hasta = None if _cantidad is None else _desde + _cantidad
+        registros = itertools.islice(registros, _desde, hasta)
+
+        # Si no hay elementos imprime mensaje de aviso y sale
+        pagina = list(itertools.islice(registros, _tamanioPagina))
+        if not pagina:
+            print(f"No se encontraron {_etiqueta}s activos.")
+            return None
+
+        # Imprime la lista de registros activos. Se toma la página siguiente antes de preguntar,
+        # para no ofrecer más registros cuando ya no quedan
+        texto = f"\nLISTADO DE {_etiqueta.upper()}S ACTIVOS\n{'-' * 50}\n"
+        mostrados = 0
+        while pagina:
+            sys.stdout.write(texto + formatearPaginaRegistros(pagina, _esquema))
+            texto = ""
+            mostrados += len(pagina)
+            pagina = list(itertools.islice(registros, _tamanioPagina))
+            if pagina and _pausar:
+                respuesta = input(f"Registros {_desde + 1} a {_desde + mostrados}. ENTER para ver más, [0] para terminar: ")
+                if respuesta.strip() == "0":
+                    return None
+        return None
+    except ValueError as detalle:
+        print(f"Error: {detalle}.")
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al listar registros: {e}")
+        return None
+
+def obtenerIndiceTexto(_ruta):
+    """
+    Devuelve el índice de búsqueda de una colección (ver CLASES_DE_BUSQUEDA). Se arma una sola vez y se
+    reutiliza mientras cargarArchivo devuelva el mismo diccionario, es decir, mientras no cambie la
+    versión de la colección en la caché (firma del archivo o versión de datos de sqlite); los
+    cambios de este proceso se le aplican desde guardarRegistro. Solo se vuelve a armar si otra
+    terminal cambió la colección o si un lote que la modificó se descartó.
+
+    Parámetros:
+        _ruta (str): Ruta del archivo JSON (una de CAMPOS_DE_BUSQUEDA).
+
+    Retorno:
+        IndiceTexto: Índice al día con la colección (IndiceTolerante para los alumnos).
+    """
+    diccionario = cargarArchivo(_ruta)
+    indice = indicesTexto.get(_ruta)
+    if indice is None or indice.diccionario is not diccionario:
+        indice = CLASES_DE_BUSQUEDA[_ruta].desdeRegistros(CAMPOS_DE_BUSQUEDA[_ruta], diccionario)
+        indicesTexto[_ruta] = indice
+    return indice
+
+def buscarRegistros(_ruta, _texto, _limite=MAX_RESULTADOS_BUSQUEDA):
+    """
+    Busca los registros activos que contienen todas las palabras de un texto en sus campos de
+    búsqueda, sin distinguir tildes ni mayúsculas. En los alumnos alcanza con el comienzo de cada
+    palabra y se tolera un error de tipeo (ver IndiceTolerante).
+
+    Parámetros:
+        _ruta (str): Ruta del archivo JSON (una de CAMPOS_DE_BUSQUEDA).
+        _texto (str): Palabras a buscar (ej. "garcia marquez").
+        _limite (int): Cantidad máxima de registros a devolver.
+
+    Retorno:
+        tuple: (cantidad total de coincidencias activas, {id: registro} con las de menor ID hasta _limite).
+    """
+    indice = obtenerIndiceTexto(_ruta)
+    diccionario = indice.diccionario
+    coincidencias = [clave for clave in indice.buscar(_texto) if diccionario[clave].activo]
+    return len(coincidencias), {clave: diccionario[clave] for clave in heapq.nsmallest(_limite, coincidencias)}
+
+def formatearInformes(_diccionario, _anio, _titulo, _esDinero=False):
+    """
+    Formatea un informe anual en forma de tabla con columnas mensuales.
+
+    Parámetros:
+        _diccionario (dict): Diccionario donde las claves son los nombres y los valores son listas con 12 números (uno por mes).
+        _anio (int o str): Año del informe.
+        _titulo (str): Título centrado que aparecerá en la parte superior del informe.
+        _esDinero (bool): Si es True, los valores se muestran con signo '$' y dos decimales.
+
+    Retorno:
+        str: Cadena formateada con encabezados, filas alineadas y totales por mes, o cadena vacía en caso de excepción.
+    """
+    try:
+        _anio = int(_anio)
+        anchoNombre = 50
+        anchoMes = 10
+        totalColumnas = anchoNombre + (12 * anchoMes)
+
+        meses = [
+            "ENE",
+            "FEB",
+            "MAR",
+            "ABR",
+            "MAY",
+            "JUN",
+            "JUL",
+            "AGO",
+            "SEP",
+            "OCT",
+            "NOV",
+            "DIC",
+        ]
+
+        salida = []
+        salida.append("-" * totalColumnas)
+        salida.append(_titulo.center(totalColumnas))
+        salida.append("-" * totalColumnas)
+
+        encabezado = f"{'Libros':<{anchoNombre}}"
+        for mes in meses:
+            encabezado += f"{mes}.{_anio % 100:02d}".rjust(anchoMes)
+        salida.append(encabezado)
+        salida.append("-" * totalColumnas)
+
+        for libro, valores in _diccionario.items():
+            fila = f"{libro:<{anchoNombre}}"
+            for val in valores:
+                if val == 0:
+                    fila += f"{'':>{anchoMes}}"
+                else:
+                    fila += f"{'$' + format(val, '.2f'):>{anchoMes}}" if _esDinero else f"{val:>{anchoMes}}"
+            salida.append(fila)
+
+        salida.append("-" * totalColumnas)
+        return "\n".join(salida)
+    except Exception as e:
+        print(f"Error inesperado al formatear informe: {e}")
+        return ""
+
+def ingresarAlumno():
+    """
+    Registra un nuevo alumno. Permite crear un nuevo registro a partir del esquema correspondiente, 
+    guardándolo en su archivo JSON.
+
+    Retorno:
+        None: Se crea el registro y devuelve None. Si se captura una excepción se informa y devuelve None.
+    """
+    try:
+        crearRegistro(ALUMNOS_ARCHIVO, "alumno", ALUMNO_ESQUEMA)
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al ingresar alumno: {e}")
+        return None
+
+def modificarAlumno():
+    """
+    Modifica los datos de un alumno existente. Permite cambiar uno de los campos de un alumno existente 
+    identificado por ID.
+
+    Retorno:
+        None: Se modifica el registro y devuelve None. Si se captura una excepción se informa y devuelve None.
+    """
+    try:
+        modificarRegistro(ALUMNOS_ARCHIVO, "alumno", ALUMNO_ESQUEMA)
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al modificar alumno: {e}")
+        return None
+
+def inactivarAlumno():
+    """
+    Marca como inactivo a un alumno existente (baja lógica) identificado por ID.
+
+    Retorno:
+        None: Se inactiva el registro y devuelve None. Si se captura una excepción se informa y devuelve None.
+    """
+    try:
+        inactivarRegistro(ALUMNOS_ARCHIVO, "alumno", ALUMNO_ESQUEMA)
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al inactivar alumno: {e}")
+        return None
+
+def listarAlumnos():
+    """
+    Imprime por consola el listado de alumnos activos y sus datos, de a una página por vez.
+
+    Retorno:
+        None: Se listan los registros y devuelve None. Si se captura una excepción se informa y devuelve None.
+    """
+    try:
+        listarRegistros(ALUMNOS_ARCHIVO, "alumno", ALUMNO_ESQUEMA_LISTADO)
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al listar alumnos: {e}")
+        return None
+
+def generarBusquedaAlumnos(_texto):
+    """
+    Genera el listado de alumnos activos cuyo nombre, apellido o email coinciden con las palabras
+    buscadas, aunque estén incompletas o tengan un error de tipeo.
+
+    Parámetros:
+        _texto (str): Palabras a buscar (ej. "mart lop", "fernandes").
+
+    Retorno:
+        str: Listado formateado con encabezados.
+    """
+    total, alumnos = buscarRegistros(ALUMNOS_ARCHIVO, _texto)
+    if total == 0:
+        return f"No se encontraron alumnos activos para '{_texto}'."
+
+    salida = []
+    salida.append(f"Alumnos que coinciden con '{_texto}'")
+    salida.append(f"{'ID':<10}{'Nombre':<25}{'Apellido':<25}{'Email':<40}")
+    salida.append("-" * 100)
+    for id, alumno in alumnos.items():
+        salida.append(f"{id:<10}{alumno.nombre[:23]:<25}{alumno.apellido[:23]:<25}{alumno.email[:38]:<40}")
+    if total > len(alumnos):
+        salida.append(f"Se muestran {len(alumnos)} de {total} coincidencias; agregue palabras para acotar la búsqueda.")
+    return "\n".join(salida)
+
+def buscarAlumnos():
+    """
+    Pide el nombre, el apellido o el email de un alumno (completos o su comienzo) e imprime por
+    consola los alumnos activos que coinciden, con su ID.
+
+    Retorno:
+        None: Se imprime el listado y devuelve None. Si el usuario ingresa '0' para volver o se
+        captura una excepción se informa y devuelve None.
+    """
+    try:
+        texto = input("Ingrese nombre, apellido o email del alumno (0 para volver): ").strip()
+        while not texto:
+            texto = input("Error. Ingrese al menos una palabra (0 para volver): ").strip()
+        if texto == "0":
+            return None
+
+        print(generarBusquedaAlumnos(texto))
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al buscar alumnos: {e}")
+        return None
 
-        # Muestra menú de campos modificables
-        print("\nCampos disponibles para modificar:")
-        for etiqueta in opciones:
-            print(f"- {etiqueta}")
+def ingresarLibro():
+    """
+    Registra un nuevo libro. Permite crear un nuevo registro a partir del esquema correspondiente, 
+    guardándolo en su archivo JSON.
 
-        # Pide y valida la selección
-        etiquetaSeleccionada = validarDato(
-            input("\nIngresá el campo a modificar (respetando tildes): ").strip().lower(),
-            "campo",
-            "string"
-        )
-        while etiquetaSeleccionada not in opciones:
-            etiquetaSeleccionada = validarDato(
-                input("Error. Por favor ingrese un campo disponible de la lista: ").strip().lower(),
-                "campo",
-                "string"
-            )
+    Retorno:
+        None: Se crea el registro y devuelve None. Si se captura una excepción se informa y devuelve None.
+    """
+    try:
+        crearRegistro(LIBROS_ARCHIVO, "libro", LIBRO_ESQUEMA)
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al ingresar libro: {e}")
+        return None
 
-        # Obtiene la ruta y el tipo de dato del campo seleccionado
-        campoReal, tipoDato = opciones[etiquetaSeleccionada]
-        
-        # Pide el valor y lo asigna
-        valor = obtenerValor(etiquetaSeleccionada, tipoDato)
-        asignarValorEnRegistro(diccionario[id], campoReal, valor)
+def modificarLibro():
+    """
+    Modifica los datos de un libro existente. Permite cambiar uno de los campos de un libro existente 
+    identificado por ID.
+
+    Retorno:
+        None: Se modifica el registro y devuelve None. Si se captura una excepción se informa y devuelve None.
+    """
+    try:
+        modificarRegistro(LIBROS_ARCHIVO, "libro", LIBRO_ESQUEMA)
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al modificar libro: {e}")
+        return None
 
-        escribirArchivo(_ruta, diccionario)
+def inactivarLibro():
+    """
+    Marca como inactivo a un libro existente (baja lógica) identificado por ID.
 
-        print(f"\n{_etiqueta.capitalize()} {id} modificado correctamente.")
+    Retorno:
+        None: Se inactiva el registro y devuelve None. Si se captura una excepción se informa y devuelve None.
+    """
+    try:
+        inactivarRegistro(LIBROS_ARCHIVO, "libro", LIBRO_ESQUEMA)
         return None
     except (FileNotFoundError, OSError) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
         return None
     except Exception as e:
-        print(f"Error inesperado al modificar registro: {e}")
+        print(f"Error inesperado al inactivar libro: {e}")
         return None
 
-def inactivarRegistro(_ruta, _etiqueta, _esquema):
+def listarLibros():
+    """
+    Imprime por consola el listado de libros activos y sus datos, de a una página por vez.
+
+    Retorno:
+        None: Se listan los registros y devuelve None. Si se captura una excepción se informa y devuelve None.
+    """
+    try:
+        listarRegistros(LIBROS_ARCHIVO, "libro", LIBRO_ESQUEMA_LISTADO)
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al listar libros: {e}")
+        return None
+
+def generarBusquedaLibros(_texto):
+    """
+    Genera el listado de libros activos cuyo título, autores, género o editorial contienen todas
+    las palabras buscadas.
+
+    Parámetros:
+        _texto (str): Palabras a buscar.
+
+    Retorno:
+        str: Listado formateado con encabezados.
+    """
+    total, libros = buscarRegistros(LIBROS_ARCHIVO, _texto)
+    if total == 0:
+        return f"No se encontraron libros activos para '{_texto}'."
+
+    salida = []
+    salida.append(f"Libros que coinciden con '{_texto}'")
+    salida.append(f"{'ID':<10}{'Título':<40}{'Autor(es)':<40}{'Editorial':<25}")
+    salida.append("-" * 115)
+    for id, libro in libros.items():
+        autores = ", ".join(autor for autor in (libro.autor1, libro.autor2, libro.autor3) if autor)
+        salida.append(f"{id:<10}{libro.titulo[:38]:<40}{autores[:38]:<40}{libro.editorial[:23]:<25}")
+    if total > len(libros):
+        salida.append(f"Se muestran {len(libros)} de {total} coincidencias; agregue palabras para acotar la búsqueda.")
+    return "\n".join(salida)
+
+def buscarLibros():
+    """
+    Pide palabras del título, los autores, el género o la editorial e imprime por consola los
+    libros activos que las contienen, con su ID (ej. para registrar un préstamo).
+
+    Retorno:
+        None: Se imprime el listado y devuelve None. Si el usuario ingresa '0' para volver o se
+        captura una excepción se informa y devuelve None.
+    """
+    try:
+        texto = input("Ingrese palabras del título, autor, género o editorial (0 para volver): ").strip()
+        while not texto:
+            texto = input("Error. Ingrese al menos una palabra (0 para volver): ").strip()
+        if texto == "0":
+            return None
+
+        print(generarBusquedaLibros(texto))
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al buscar libros: {e}")
+        return None
+
+def existePrestamo(_idPrestamo):
+    """
+    Indica si un ID ya está en el historial de préstamos (activos y finalizados), incluidos los
+    préstamos pendientes del lote en curso, sin leer el historial completo: con el motor sqlite
+    consulta la fila por su clave y con archivos mira la partición del mes que indica el ID (ver
+    periodoDeIdPrestamo), salvo que el historial ya esté en memoria.
+
+    Parámetros:
+        _idPrestamo (str): ID a buscar.
+
+    Retorno:
+        bool: True si ya hay un préstamo con ese ID.
+    """
+    if loteActual is not None:
+        if PRESTAMOS_ARCHIVO in loteActual["diccionarios"]:
+            return _idPrestamo in loteActual["diccionarios"][PRESTAMOS_ARCHIVO]
+        entradas = loteActual["pendientes"].get(PRESTAMOS_ARCHIVO)
+        if entradas and _idPrestamo in entradas:
+            return entradas[_idPrestamo] is not None
+
+    if usaBaseDatos(PRESTAMOS_ARCHIVO):
+        fila = conectarBaseDatos().execute("SELECT 1 FROM prestamos WHERE id = ?", (_idPrestamo,)).fetchone()
+        return fila is not None
+    periodo = periodoDeIdPrestamo(_idPrestamo)
+    if PRESTAMOS_ARCHIVO in cacheArchivos or periodo is None:
+        return _idPrestamo in (cargarArchivo(PRESTAMOS_ARCHIVO) or {})
+    return _idPrestamo in cargarParticion(*periodo)
+
+def generarIdPrestamo():
+    """
+    Genera el ID de un préstamo nuevo: fecha y hora con microsegundos ('YYYY.MM.DD HH:MM:SS.ffffff'),
+    que se ordena igual que los IDs anteriores sin sufijo. Si el reloj no avanzó (o retrocedió)
+    desde el último ID de este proceso, se usa el microsegundo siguiente. Se llama con el diario de
+    préstamos bloqueado, así que las demás terminales generan sus IDs antes o después, nunca a la
+    vez; además se descarta cualquier ID que ya esté en el historial (ver existePrestamo), por
+    ejemplo si el reloj retrocedió entre dos ejecuciones o lo usó otra terminal con otra hora.
+
+    Retorno:
+        tuple: (ID del préstamo, datetime del instante usado).
+    """
+    global ultimoInstantePrestamo
+    instante = datetime.now()
+    if ultimoInstantePrestamo is not None and instante <= ultimoInstantePrestamo:
+        instante = ultimoInstantePrestamo + timedelta(microseconds=1)
+
+    idPrestamo = instante.strftime("%Y.%m.%d %H:%M:%S.%f")
+    while existePrestamo(idPrestamo):
+        instante += timedelta(microseconds=1)
+        idPrestamo = instante.strftime("%Y.%m.%d %H:%M:%S.%f")
+
+    ultimoInstantePrestamo = instante
+    return idPrestamo, instante
+
+def registrarPrestamoConDatos(_idAlumno, _idLibro):
+    """
+    Registra un préstamo sin interacción con el usuario, con ID automático de fecha/hora (ver
+    generarIdPrestamo), y
+    actualiza el diario de préstamos, la partición del mes, el índice de activos y los agregados
+    mensuales en un solo lote (ver ejecutarEnLote).
+
+    Parámetros:
+        _idAlumno (str): ID de un alumno existente y activo.
+        _idLibro (str): ID de un libro existente y activo.
+
+    Retorno:
+        str|None: ID del préstamo registrado, o None si el alumno o el libro no son válidos (se
+        informa el motivo).
+    """
+    return ejecutarEnLote(ARCHIVOS_DE_PRESTAMO, aplicarAltaPrestamo, _idAlumno, _idLibro)
+
+def aplicarAltaPrestamo(_idAlumno, _idLibro):
+    """
+    Aplica el alta de un préstamo dentro de un lote. Ver registrarPrestamoConDatos.
+
+    Parámetros:
+        _idAlumno (str): ID del alumno.
+        _idLibro (str): ID del libro.
+
+    Retorno:
+        str|None: ID del préstamo registrado, o None si los datos no son válidos.
+    """
+    alumnos = cargarArchivo(ALUMNOS_ARCHIVO)
+    libros = cargarArchivo(LIBROS_ARCHIVO)
+    activos = cargarPrestamosActivos()
+    agregados = cargarAgregados()
+    indices = {}
+    if not usaBaseDatos(PRESTAMOS_ARCHIVO): # En sqlite la tabla ya tiene índices por alumno y libro
+        indices = {direccion: cargarIndicePrestamos(direccion) for direccion in INDICES_DE_PRESTAMOS}
+
+    if _idAlumno not in alumnos or not alumnos[_idAlumno]["activo"]:
+        print(f"Error: el ID del alumno {_idAlumno} no existe o está inactivo.")
+        return None
+    if _idLibro not in libros or not libros[_idLibro]["activo"]:
+        print(f"Error: el ID del libro {_idLibro} no existe o está inactivo.")
+        return None
+
+    # Genera el id del préstamo y la fecha de inicio
+    idPrestamo, fechaInicio = generarIdPrestamo()
+
+    # Completa los campos del nuevo registro de préstamo
+    prestamo = Prestamo(
+        idPrestamo=idPrestamo,
+        idAlumno=_idAlumno,
+        idLibro=_idLibro,
+        cantidadDias=0,
+        fechaInicio=fechaInicio.strftime("%Y-%m-%d"),
+        fechaFinalizacion="",
+        estadoDevolucionCorrecto=False,
+    )
+
+    # La partición del mes se carga antes de guardar: si se arma ahora, que sea sin el préstamo nuevo
+    particion = None
+    if not usaBaseDatos(PRESTAMOS_ARCHIVO): # En sqlite el índice de fechaInicio ya separa los meses
+        particion = cargarParticion(*periodoDePrestamo(prestamo))
+
+    # Agrega solo el préstamo nuevo al diario, sin reescribir el historial, y a su mes
+    guardarRegistro(PRESTAMOS_ARCHIVO, idPrestamo, prestamo)
+    if particion is not None:
+        guardarRegistro(rutaParticion(*periodoDePrestamo(prestamo)), idPrestamo, prestamo, particion)
+
+    # Lo suma al índice de préstamos activos y a los del historial
+    agregarPrestamoActivo(activos, prestamo)
+    indexarPrestamo(indices, prestamo)
+
+    # Actualiza la cantidad de préstamos del mes para el libro
+    guardarAgregado(agregados, prestamo, 1)
+    return idPrestamo
+
+def registrarPrestamo():
+    """
+    Registra un nuevo préstamo con ID automático de fecha/hora para alumno y libro válidos y lo
+    agrega al diario de préstamos.
+
+    Retorno:
+        None: Se crea el registro, se guarda sobre el archivo JSON y devuelve None. Si el usuario 
+        ingresa '0' para volver o se captura una excepción se informa y devuelve None.
+    """
+    try:
+        alumnos = cargarArchivo(ALUMNOS_ARCHIVO)
+        libros = cargarArchivo(LIBROS_ARCHIVO)
+
+        # Pide y valida el id del alumno
+        idAlumno = pedirYValidarId(alumnos, "alumno", True, "id")
+        if idAlumno is None:
+            return None
+
+        # Pide y valida el id del libro
+        idLibro = pedirYValidarId(libros, "libro", True, "id")
+        if idLibro is None:
+            return None
+
+        idPrestamo = registrarPrestamoConDatos(idAlumno, idLibro)
+        if idPrestamo is None:
+            return None
+
+        print(f"Préstamo con ID: {idPrestamo} registrado exitosamente.")
+        return None
+    except (FileNotFoundError, OSError) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        return None
+    except Exception as e:
+        print(f"Error inesperado al registrar préstamo: {e}")
+        return None
+
+def finalizarPrestamoConDatos(_idPrestamo, _devolucionCorrecta):
+    """
+    Finaliza un préstamo activo sin interacción con el usuario: calcula el monto, registra la
+    devolución, suma la infracción si corresponde y actualiza el índice de activos y los agregados.
+    Todos los archivos se escriben juntos, una vez cada uno (ver ejecutarEnLote).
+
+    Parámetros:
+        _idPrestamo (str): ID de un préstamo activo.
+        _devolucionCorrecta (bool): True si la devolución fue correcta.
+
+    Retorno:
+        dict|None: Diccionario con "diasPrestamo", "costoDiario", "montoTotal" e "infraccion" (bool),
+        o None si el préstamo no existe o ya fue finalizado (se informa el motivo).
+    """
+    return ejecutarEnLote(ARCHIVOS_DE_PRESTAMO, aplicarFinalizacionPrestamo, _idPrestamo, _devolucionCorrecta)
+
+def aplicarFinalizacionPrestamo(_idPrestamo, _devolucionCorrecta):
+    """
+    Aplica la finalización de un préstamo dentro de un lote. Ver finalizarPrestamoConDatos.
+
+    Parámetros:
+        _idPrestamo (str): ID de un préstamo activo.
+        _devolucionCorrecta (bool): True si la devolución fue correcta.
+
+    Retorno:
+        dict|None: Resultado de la finalización, o None si el préstamo no está activo.
+    """
+    alumnos = cargarArchivo(ALUMNOS_ARCHIVO)
+    libros = cargarArchivo(LIBROS_ARCHIVO)
+
+    # Solo los préstamos activos pueden finalizarse: se valida contra su índice, sin leer el historial
+    activos = cargarPrestamosActivos()
+    agregados = cargarAgregados()
+    if _idPrestamo not in activos["prestamos"]:
+        print(f"Error: el ID de préstamo {_idPrestamo} no existe o ya fue finalizado.")
+        return None
+
+    # Trabaja sobre una copia para no alterar la caché si la operación no llega a guardarse
+    prestamo = comoRegistro(PRESTAMOS_ARCHIVO, _idPrestamo, copy.copy(activos["prestamos"][_idPrestamo]))
+
+    # Convierte la fecha de inicio al formato "YYYY-MM-DD"
+    fechaInicio = datetime.strptime(prestamo["fechaInicio"], "%Y-%m-%d")
+
+    # Asigna la fecha de finalización al día y horario actual
+    fechaFin = datetime.now()
+
+    # Calcula los días de préstamo (1 por defecto)
+    diasPrestamo = (fechaFin - fechaInicio).days
+    if diasPrestamo == 0:
+        diasPrestamo = 1
+
+    # Calula el monto total (costo diario del libro * días de préstamo)
+    idLibro = prestamo["idLibro"]
+    costoDiario = libros[idLibro]["costoGarantia"]
+    montoTotal = costoDiario * diasPrestamo
+
+    # Asigna los valores de finalización al registro del préstamo
+    prestamo["fechaFinalizacion"] = fechaFin.strftime("%Y-%m-%d")
+    prestamo["cantidadDias"] = diasPrestamo
+    prestamo["estadoDevolucionCorrecto"] = _devolucionCorrecta
+
+    # Si la devolución no fue correcta suma una infracción al alumno y la cuenta en los agregados
+    if not _devolucionCorrecta:
+        idAlumno = prestamo["idAlumno"]
+        alumno = copy.copy(alumnos[idAlumno])
+        alumno["infracciones"] += 1
+        nuevaVersion(alumno)
+        guardarRegistro(ALUMNOS_ARCHIVO, idAlumno, alumno, alumnos)
+        guardarAgregado(agregados, prestamo, _incorrectas=1)
+
+    # Actualiza el préstamo en el historial y en la partición de su mes de inicio
+    particion = None
+    if not usaBaseDatos(PRESTAMOS_ARCHIVO):
+        particion = cargarParticion(*periodoDePrestamo(prestamo))
+    guardarRegistro(PRESTAMOS_ARCHIVO, _idPrestamo, prestamo)
+    if particion is not None:
+        guardarRegistro(rutaParticion(*periodoDePrestamo(prestamo)), _idPrestamo, prestamo, particion)
+
+    quitarPrestamoActivo(activos, _idPrestamo)
+
+    return {
+        "diasPrestamo": diasPrestamo,
+        "costoDiario": costoDiario,
+        "montoTotal": montoTotal,
+        "infraccion": not _devolucionCorrecta,
+    }
+
+def finalizarPrestamo():
     """
-    Marca como inactiva un registro existente guardando su campo "activo" en False.
+    Finaliza un préstamo, registra la devolución, calcula el monto y actualiza infracciones. 
+    Guarda los datos actualizados en los archivos JSON correspondientes.
 
-    Parámetros:
-        _ruta (str): Ruta del archivo JSON donde se guardaran los registros.
-        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
-        _esquema (dict): Estructura que define el campo ID del registro.
-    
     Retorno:
-        None: Se inactiva el registro, se guarda sobre el archivo JSON y devuelve None. Si el usuario 
-        ingresa '0' para volver o se captura una excepción se informa y devuelve None.
+        None: Se modifican los registros, se guardan sobre los archivos JSON, se informa y 
+        devuelve None. Si el usuario ingresa '0' para volver o se captura una excepción se informa 
+        y devuelve None.
     """
     try:
-        diccionario = cargarArchivo(_ruta)
+        # Solo los préstamos activos pueden finalizarse: se valida contra su índice, sin leer el historial
+        activos = cargarPrestamosActivos()
 
-        # Pide y valida el id
-        idValidador = _esquema['id']
-        id = pedirYValidarId(diccionario, _etiqueta, True, idValidador)
-        if id is None:
+        # Pide y valida el id del préstamo
+        idPrestamo = pedirYValidarId(activos["prestamos"], "préstamo", True, "idPrestamo")
+        if idPrestamo is None:
             return None
 
-        # Sobreescribe el campo 'activo' de ese id en False
-        diccionario[id]['activo'] = False
+        # Pregunta y valida si la devolución fue correcta
+        devolucion = validarDato(input("¿La devolución es correcta? (s = sí / n = no): ").strip().lower(), "respuesta", "string")
+        while devolucion not in ("s", "n"):
+            print("Error. Ingrese 's' o 'n'.")
+            devolucion = validarDato(input("¿La devolución es correcta? (s = sí / n = no): ").strip().lower(), "respuesta", "string")
+
+        resultado = finalizarPrestamoConDatos(idPrestamo, devolucion == "s")
+        if resultado is None:
+            return None
 
-        escribirArchivo(_ruta, diccionario)
+        if resultado["infraccion"]:
+            print("Se añadió 1 infracción al alumno.")
+
+        print(f"\nPréstamo finalizado correctamente.")
+        print(f"Días prestados: {resultado['diasPrestamo']}")
+        print(f"Costo por día : {resultado['costoDiario']}")
+        print(f"Total a pagar : {resultado['montoTotal']}\n")
 
-        print(f"{_etiqueta.capitalize()} {id} inactivado correctamente.")
         return None
     except (FileNotFoundError, OSError) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
         return None
     except Exception as e:
-        print(f"Error inesperado al inactivar registro: {e}")
+        print(f"Error inesperado al finalizar préstamo: {e}")
         return None
 
-def listarRegistros(_ruta, _etiqueta, _esquema):
+def listarPrestamosActivos():
     """
-    Muestra por consola el listado de los registros activos según el esquema.
+    Imprime por consola los préstamos sin finalizar, todos o solo los de un alumno o un libro,
+    usando el índice de préstamos activos.
 
-    Parámetros:
-        _ruta (str): Ruta del archivo JSON donde se guardan los registros.
-        _etiqueta (str): Nombre del registro para mensajes (ej. "alumno", "libro", etc.).
-        _esquema (dict): Estructura que define la lista de campos a mostrar.
-    
     Retorno:
-        None: Se lista el registro y devuelve None. Si no se encontraron registros activos 
-        o se captura una excepción se informa y devuelve None.
+        None: Se imprime el listado y devuelve None. Si se captura una excepción se informa y
+        devuelve None.
     """
     try:
-        diccionario = cargarArchivo(_ruta)
-        
-        # Crea un diccionario que solo contiene elementos con el campo 'activo' en True
-        activos = {k:v for k,v in diccionario.items() if v['activo']}
+        alumnos = cargarArchivo(ALUMNOS_ARCHIVO)
+        libros = cargarArchivo(LIBROS_ARCHIVO)
+        activos = cargarPrestamosActivos()
+
+        # Pide un filtro opcional por alumno o libro
+        filtro = input("Ingrese un ID de alumno o libro para filtrar (ENTER para ver todos): ").strip().upper()
+        if filtro == "":
+            ids = list(activos["prestamos"])
+        elif filtro in activos["porAlumno"]:
+            ids = activos["porAlumno"][filtro]
+        else:
+            ids = activos["porLibro"].get(filtro, [])
 
-        # Si no hay elementos en el diccionario imprime mensaje de aviso y sale
-        if not activos:
-            print(f"No se encontraron {_etiqueta}s activos.")
+        if not ids:
+            print("No se encontraron préstamos activos.")
             return None
-        
-        # Imprime la lista de registros activos
-        print(f"\nLISTADO DE {_etiqueta.upper()}S ACTIVOS")
-        print("-" * 50)
-
-        for id, registro in activos.items():
-            print(f"ID: {id}")
-
-            # Obtiene los valores de cada campo y los imprime
-            for etiqueta, campoReal, tipoDato in _esquema['campos']:
 
-                if '.' in campoReal: # Caso de ruta anidada
-                    partes = campoReal.split('.') # Separa la ruta por punto
-                    nodo = registro
-                    for parte in partes: # Itera los valores de la ruta 
-                        nodo = nodo[parte] # Apunta al valor de ruta de esa iteración
-                    valor = nodo # Asigna el valor de la ruta
-                else:  # Caso de clave común
-                    valor = registro[campoReal]
+        # Prepara encabezados
+        salida = []
+        salida.append("Préstamos activos")
+        salida.append(f"{'ID Préstamo':<30}{'Inicio':<15}{'Alumno':<35}{'Libro':<35}")
+        salida.append("-" * 115)
 
-                print(f"{etiqueta.upper()}: {valor}")
+        for idPrestamo in sorted(ids):
+            prestamo = activos["prestamos"][idPrestamo]
+            idAlumno = prestamo["idAlumno"]
+            nombreAlumno = alumnos.get(idAlumno, {}).get("nombre", f"Alumno {idAlumno}")
+            idLibro = prestamo["idLibro"]
+            tituloLibro = libros.get(idLibro, {}).get("titulo", f"Libro {idLibro}")
+            salida.append(f"{idPrestamo:<30}{prestamo['fechaInicio']:<15}{nombreAlumno:<35}{tituloLibro:<35}")
 
-            print("-" * 50)
+        print("\n".join(salida))
         return None
     except (FileNotFoundError, OSError) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
         return None
     except Exception as e:
-        print(f"Error inesperado al listar registros: {e}")
+        print(f"Error inesperado al listar préstamos activos: {e}")
         return None
 
-def formatearInformes(_diccionario, _anio, _titulo, _esDinero=False):
+def consultarHistorialPrestamos(_direccionIndice, _id):
     """
-    Formatea un informe anual en forma de tabla con columnas mensuales.
+    Obtiene todos los préstamos (activos y finalizados) de un alumno o de un libro. Con archivos
+    toma los IDs del índice del historial y lee cada préstamo de la partición del mes que indica su
+    ID (ver periodoDeIdPrestamo), salvo que el historial ya esté en memoria; solo si alguno no está
+    donde su ID indica se lee el historial completo. Con el motor sqlite consulta la tabla por su índice. En ambos casos el costo depende
+    de la cantidad de préstamos del alumno o libro y de los meses en que los tuvo, no del historial.
 
     Parámetros:
-        _diccionario (dict): Diccionario donde las claves son los nombres y los valores son listas con 12 números (uno por mes).
-        _anio (int o str): Año del informe.
-        _titulo (str): Título centrado que aparecerá en la parte superior del informe.
-        _esDinero (bool): Si es True, los valores se muestran con signo '$' y dos decimales.
+        _direccionIndice (str): PRESTAMOS_POR_ALUMNO_ARCHIVO o PRESTAMOS_POR_LIBRO_ARCHIVO.
+        _id (str): ID del alumno o del libro.
 
     Retorno:
-        str: Cadena formateada con encabezados, filas alineadas y totales por mes, o cadena vacía en caso de excepción.
+        dict: Préstamos por idPrestamo, del más antiguo al más reciente.
     """
-    try:
-        _anio = int(_anio)
-        anchoNombre = 50
-        anchoMes = 10
-        totalColumnas = anchoNombre + (12 * anchoMes)
+    campo = INDICES_DE_PRESTAMOS[_direccionIndice]
+    if usaBaseDatos(PRESTAMOS_ARCHIVO):
+        return cargarTabla("prestamos", f"{campo} = ? ORDER BY id", (_id,))
+
+    ids = cargarIndicePrestamos(_direccionIndice).get(_id, [])
+    if PRESTAMOS_ARCHIVO in cacheArchivos: # Ya leído (ej. en el servicio): no hace falta ir a las particiones
+        prestamos = cargarArchivo(PRESTAMOS_ARCHIVO) or {}
+        return {idPrestamo: prestamos[idPrestamo] for idPrestamo in ids if idPrestamo in prestamos}
+
+    particiones = {}
+    resultado = {}
+    faltantes = []
+    for idPrestamo in ids:
+        periodo = periodoDeIdPrestamo(idPrestamo)
+        if periodo is not None and periodo not in particiones:
+            particiones[periodo] = cargarParticion(*periodo)
+        if periodo is not None and idPrestamo in particiones[periodo]:
+            resultado[idPrestamo] = particiones[periodo][idPrestamo]
+        else:
+            faltantes.append(idPrestamo)
 
-        meses = [
-            "ENE",
-            "FEB",
-            "MAR",
-            "ABR",
-            "MAY",
-            "JUN",
-            "JUL",
-            "AGO",
-            "SEP",
-            "OCT",
-            "NOV",
-            "DIC",
-        ]
+    # IDs cargados a mano que no empiezan con su fecha de inicio
+    if faltantes:
+        prestamos = cargarArchivo(PRESTAMOS_ARCHIVO) or {}
+        for idPrestamo in faltantes:
+            if idPrestamo in prestamos:
+                resultado[idPrestamo] = prestamos[idPrestamo]
+    return {idPrestamo: resultado[idPrestamo] for idPrestamo in ids if idPrestamo in resultado}
 
-        salida = []
-        salida.append("-" * totalColumnas)
-        salida.append(_titulo.center(totalColumnas))
-        salida.append("-" * totalColumnas)
+def generarHistorialPrestamos(_direccionIndice, _id):
+    """
+    Genera el listado de todos los préstamos de un alumno o de un libro con su estado.
 
-        encabezado = f"{'Libros':<{anchoNombre}}"
-        for mes in meses:
-            encabezado += f"{mes}.{_anio % 100:02d}".rjust(anchoMes)
-        salida.append(encabezado)
-        salida.append("-" * totalColumnas)
+    Parámetros:
+        _direccionIndice (str): PRESTAMOS_POR_ALUMNO_ARCHIVO o PRESTAMOS_POR_LIBRO_ARCHIVO.
+        _id (str): ID del alumno o del libro.
 
-        for libro, valores in _diccionario.items():
-            fila = f"{libro:<{anchoNombre}}"
-            for val in valores:
-                if val == 0:
-                    fila += f"{'':>{anchoMes}}"
-                else:
-                    fila += f"{'$' + format(val, '.2f'):>{anchoMes}}" if _esDinero else f"{val:>{anchoMes}}"
-            salida.append(fila)
+    Retorno:
+        str: Listado formateado con encabezados.
+    """
+    alumnos = cargarArchivo(ALUMNOS_ARCHIVO)
+    libros = cargarArchivo(LIBROS_ARCHIVO)
+    prestamos = consultarHistorialPrestamos(_direccionIndice, _id)
+    porAlumno = _direccionIndice == PRESTAMOS_POR_ALUMNO_ARCHIVO
+
+    # Prepara encabezados, con la columna del otro lado del préstamo
+    if porAlumno:
+        alumno = alumnos.get(_id, {})
+        titulo = f"Historial de préstamos del alumno {_id} ({alumno.get('nombre', '')} {alumno.get('apellido', '')})"
+    else:
+        titulo = f"Historial de préstamos del libro {_id} ({libros.get(_id, {}).get('titulo', '')})"
+    salida = []
+    salida.append(titulo)
+    salida.append(f"{'ID Préstamo':<30}{'Inicio':<13}{'Fin':<13}{'Días':>6}  {'Estado':<12}{'Libro' if porAlumno else 'Alumno':<35}")
+    salida.append("-" * 109)
+
+    for idPrestamo, prestamo in prestamos.items():
+        if prestamo["fechaFinalizacion"] == "":
+            estado = "Activo"
+        elif prestamo.get("estadoDevolucionCorrecto", True):
+            estado = "Correcta"
+        else:
+            estado = "Incorrecta"
+        if porAlumno:
+            idLibro = prestamo["idLibro"]
+            otro = libros.get(idLibro, {}).get("titulo", f"Libro {idLibro}")
+        else:
+            idAlumno = prestamo["idAlumno"]
+            otro = alumnos.get(idAlumno, {}).get("nombre", f"Alumno {idAlumno}")
+        salida.append(
+            f"{idPrestamo:<30}{prestamo['fechaInicio']:<13}{prestamo['fechaFinalizacion']:<13}"
+            f"{prestamo['cantidadDias']:>6}  {estado:<12}{otro:<35}"
+        )
 
-        salida.append("-" * totalColumnas)
-        return "\n".join(salida)
-    except Exception as e:
-        print(f"Error inesperado al formatear informe: {e}")
-        return ""
+    salida.append("-" * 109)
+    salida.append(f"Total: {len(prestamos)} préstamo(s)")
+    return "\n".join(salida)
 
-def ingresarAlumno():
+def imprimirHistorialPrestamos(_direccionIndice, _etiqueta):
     """
-    Registra un nuevo alumno. Permite crear un nuevo registro a partir del esquema correspondiente, 
-    guardándolo en su archivo JSON.
+    Solicita un ID de alumno o libro (activo o no) e imprime por consola su historial de préstamos.
+
+    Parámetros:
+        _direccionIndice (str): PRESTAMOS_POR_ALUMNO_ARCHIVO o PRESTAMOS_POR_LIBRO_ARCHIVO.
+        _etiqueta (str): "alumno" o "libro".
 
     Retorno:
-        None: Se crea el registro y devuelve None. Si se captura una excepción se informa y devuelve None.
+        None: Se imprime el historial y devuelve None. Si el usuario ingresa '0' para volver o se
+        captura una excepción se informa y devuelve None.
     """
     try:
-        crearRegistro(ALUMNOS_ARCHIVO, "alumno", ALUMNO_ESQUEMA)
+        registros = cargarArchivo(ALUMNOS_ARCHIVO if _etiqueta == "alumno" else LIBROS_ARCHIVO)
+        id = validarDato(input(f"Ingrese el ID del {_etiqueta}: "), "id", "id").strip().upper()
+        while id != "0" and id not in registros:
+            print(f"Error: el ID del {_etiqueta} no existe.")
+            id = input(f"Por favor, ingrese el ID del {_etiqueta} (0 para volver): ").strip().upper()
+        if id == "0":
+            return None
+
+        print(generarHistorialPrestamos(_direccionIndice, id))
         return None
     except (FileNotFoundError, OSError) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
         return None
     except Exception as e:
-        print(f"Error inesperado al ingresar alumno: {e}")
+        print(f"Error inesperado al imprimir historial de préstamos: {e}")
         return None
 
-def modificarAlumno():
+def imprimirHistorialAlumno():
     """
-    Modifica los datos de un alumno existente. Permite cambiar uno de los campos de un alumno existente 
-    identificado por ID.
+    Solicita un ID de alumno e imprime por consola todos sus préstamos.
 
     Retorno:
-        None: Se modifica el registro y devuelve None. Si se captura una excepción se informa y devuelve None.
+        None
     """
-    try:
-        modificarRegistro(ALUMNOS_ARCHIVO, "alumno", ALUMNO_ESQUEMA)
-        return None
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
-        return None
-    except Exception as e:
-        print(f"Error inesperado al modificar alumno: {e}")
-        return None
+    return imprimirHistorialPrestamos(PRESTAMOS_POR_ALUMNO_ARCHIVO, "alumno")
 
-def inactivarAlumno():
+def imprimirHistorialLibro():
     """
-    Marca como inactivo a un alumno existente (baja lógica) identificado por ID.
+    Solicita un ID de libro e imprime por consola todos sus préstamos.
 
     Retorno:
-        None: Se inactiva el registro y devuelve None. Si se captura una excepción se informa y devuelve None.
+        None
     """
-    try:
-        inactivarRegistro(ALUMNOS_ARCHIVO, "alumno", ALUMNO_ESQUEMA)
-        return None
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
-        return None
-    except Exception as e:
-        print(f"Error inesperado al inactivar alumno: {e}")
-        return None
+    return imprimirHistorialPrestamos(PRESTAMOS_POR_LIBRO_ARCHIVO, "libro")
 
-def listarAlumnos():
+def generarResumenMensual(_anio, _mes, _prestamos=None):
     """
-    Imprime por consola el listado de alumnos activos y sus datos.
+    Genera el listado de préstamos iniciados en un año y mes.
+
+    Parámetros:
+        _anio (int): Año del listado.
+        _mes (int): Mes del listado (1-12).
+        _prestamos (iterable|None): Pares (idPrestamo, préstamo) a recorrer (ej. recorrerPrestamos())
+        en lugar de leer el período. Por defecto se lee solo la partición del mes.
 
     Retorno:
-        None: Se listan los registros y devuelve None. Si se captura una excepción se informa y devuelve None.
+        str: Listado formateado con encabezados.
     """
-    try:
-        esquema = {
-            'id': ALUMNO_ESQUEMA['id'],
-            'campos': ALUMNO_ESQUEMA['campos'] + [
-                ('infracciones', 'infracciones', 'numero')
-            ]
-        }
-        listarRegistros(ALUMNOS_ARCHIVO, "alumno", esquema)
-        return None
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
-        return None
-    except Exception as e:
-        print(f"Error inesperado al listar alumnos: {e}")
-        return None
+    alumnos = cargarArchivo(ALUMNOS_ARCHIVO)
+    libros = cargarArchivo(LIBROS_ARCHIVO)
+
+    # Obtiene solo los préstamos iniciados en el período
+    if _prestamos is None:
+        prestamos = consultarPrestamosPorPeriodo(_anio, _mes).items()
+    else:
+        prestamos = (
+            (clave, prestamo) for clave, prestamo in _prestamos
+            if periodoDePrestamo(prestamo) == (_anio, _mes)
+        )
 
-def ingresarLibro():
+    # Prepara encabezados
+    salida = []
+    salida.append(f"Listado de reservas del mes {_mes}/{_anio}")
+    salida.append(f"{'Fecha/Hora':<35}{'Alumno':<35}{'Libro':<35}")
+    salida.append("-" * 105)
+
+    # Formatea los préstamos
+    for clave, prestamo in prestamos:
+        fechaHora = clave
+        idAlumno = prestamo["idAlumno"]
+        nombreAlumno = alumnos.get(idAlumno, {}).get(
+            "nombre", f"Alumno {idAlumno}"
+        )
+        idLibro = prestamo["idLibro"]
+        tituloLibro = libros.get(idLibro, {}).get("titulo", f"Libro {idLibro}")
+        salida.append(f"{fechaHora:<35}{nombreAlumno:<35}{tituloLibro:<35}")
+
+    return "\n".join(salida)
+
+def imprimirResumenMensual():
     """
-    Registra un nuevo libro. Permite crear un nuevo registro a partir del esquema correspondiente, 
-    guardándolo en su archivo JSON.
+    Solicita un año y mes e imprime por consola el listado de préstamos iniciados en ese periodo.
 
     Retorno:
-        None: Se crea el registro y devuelve None. Si se captura una excepción se informa y devuelve None.
+        None: Se imprime el resumen y devuelve None. Si se captura una excepción se informa y 
+        devuelve None.
     """
     try:
-        crearRegistro(LIBROS_ARCHIVO, "libro", LIBRO_ESQUEMA)
+        # Pide y valida el año y mes a imprimir
+        anio = int(validarDato(input("Ingrese el año (formato AAAA): "),"año", "numero"))
+        mes = int(validarDato(input("Ingrese el mes (1-12): "), "mes", "numero"))
+
+        # Imprime los préstamos formateados
+        print(generarResumenMensual(anio, mes))
         return None
     except (FileNotFoundError, OSError) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
         return None
     except Exception as e:
-        print(f"Error inesperado al ingresar libro: {e}")
+        print(f"Error inesperado al imprimir resumen mensual: {e}")
         return None
 
-def modificarLibro():
+def generarResumenAnualPorLibroCantidad(_anio, _prestamos=None):
     """
-    Modifica los datos de un libro existente. Permite cambiar uno de los campos de un libro existente 
-    identificado por ID.
+    Genera la tabla anual con la cantidad de préstamos de cada libro mes a mes.
+
+    Parámetros:
+        _anio (int): Año del informe.
+        _prestamos (iterable|None): Pares (idPrestamo, préstamo) a recorrer en lugar de leer los
+        agregados (ver agregadosDelAnio).
 
     Retorno:
-        None: Se modifica el registro y devuelve None. Si se captura una excepción se informa y devuelve None.
+        str: Tabla formateada por formatearInformes.
+    """
+    libros = cargarArchivo(LIBROS_ARCHIVO)
+
+    # Lee las 12 cantidades mensuales de cada libro de los agregados
+    agregados = cargarAgregados() if _prestamos is None else agregadosDelAnio(_anio, _prestamos)
+    resumen = {
+        idLibro: [celda[0] for celda in celdasDelAnio(agregados, _anio, idLibro)]
+        for idLibro in libros.keys()
+    }
+
+    # Genera el resumen por título de libro
+    resumenPorTitulo = {
+        libros.get(idLibro, {}).get("titulo", f"Libro {idLibro}"): valores
+        for idLibro, valores in resumen.items()
+    }
+
+    # Formatea el resumen para generar la tabla con cantidades
+    return formatearInformes(resumenPorTitulo, _anio, "Resumen Anual de Reservas por Libro (Cantidades)")
+
+def imprimirResumenAnualPorLibroCantidad():
+    """
+    Solicita un año e imprime por consola cuántos préstamos tuvo cada libro mes a mes.
+
+    Retorno:
+        None: Se imprime el resumen y devuelve None. Si se captura una excepción se informa y 
+        devuelve None.
     """
     try:
-        modificarRegistro(LIBROS_ARCHIVO, "libro", LIBRO_ESQUEMA)
+        # Pide y valida el año a imprimir
+        anio = int(validarDato(input("Ingrese el año (formato AAAA): "),"año", "numero"))
+
+        print(generarResumenAnualPorLibroCantidad(anio))
         return None
     except (FileNotFoundError, OSError) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
         return None
     except Exception as e:
-        print(f"Error inesperado al modificar libro: {e}")
+        print(f"Error inesperado al imprimir resumen anual de reservas por libro: {e}")
         return None
 
-def inactivarLibro():
+def generarResumenAnualPorLibroPesos(_anio, _prestamos=None):
     """
-    Marca como inactivo a un libro existente (baja lógica) identificado por ID.
+    Genera la tabla anual del dinero en garantía movido por libro mes a mes.
+
+    Parámetros:
+        _anio (int): Año del informe.
+        _prestamos (iterable|None): Pares (idPrestamo, préstamo) a recorrer en lugar de leer los
+        agregados (ver agregadosDelAnio).
 
     Retorno:
-        None: Se inactiva el registro y devuelve None. Si se captura una excepción se informa y devuelve None.
+        str: Tabla formateada por formatearInformes con valores en pesos.
+    """
+    libros = cargarArchivo(LIBROS_ARCHIVO)
+    agregados = cargarAgregados() if _prestamos is None else agregadosDelAnio(_anio, _prestamos)
+
+    # Libros con movimiento en el año, según los agregados de sus 12 meses
+    idsLibros = []
+    for mes in range(1, 13):
+        for idLibro in agregados.get(claveDePeriodo(_anio, mes), {}):
+            if idLibro not in idsLibros:
+                idsLibros.append(idLibro)
+
+    # Construye el resumen de montos leyendo las 12 celdas de cada libro, con su costo de garantía
+    # actual; los libros con el mismo título se suman en una sola fila
+    resumen = {}
+    for idLibro in idsLibros:
+        nombreLibro = libros.get(idLibro, {}).get("titulo", f"Libro {idLibro}")
+        costo = libros.get(idLibro, {}).get("costoGarantia", 0)
+        if nombreLibro not in resumen:
+            resumen[nombreLibro] = [0] * 12
+        for mes, celda in enumerate(celdasDelAnio(agregados, _anio, idLibro)):
+            resumen[nombreLibro][mes] += celda[0] * costo
+
+    # Formatea el resumen para generar la tabla en pesos
+    return formatearInformes(resumen, _anio, "Resumen Anual de Reservas por Libro (Pesos)", _esDinero=True)
+
+def imprimirResumenAnualPorLibroPesos():
+    """
+    Solicita un año e imprime por consola el resumen anual del dinero en garantía movido por libro.
+
+    Retorno:
+        None: Se imprime el resumen y devuelve None. Si se captura una excepción se informa y 
+        devuelve None.
     """
     try:
-        inactivarRegistro(LIBROS_ARCHIVO, "libro", LIBRO_ESQUEMA)
+        # Pide y valida el año a imprimir
+        anio = int(validarDato(input("Ingrese el año (formato AAAA): "),"año", "numero"))
+
+        print(generarResumenAnualPorLibroPesos(anio))
         return None
     except (FileNotFoundError, OSError) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
         return None
     except Exception as e:
-        print(f"Error inesperado al inactivar libro: {e}")
+        print(f"Error inesperado al imprimir resumen anual por libro: {e}")
         return None
 
-def listarLibros():
+def generarResumenAnualDevolucionesIncorrectas(_anio, _prestamos=None):
     """
-    Imprime por consola el listado de libros activos y sus datos.
+    Genera la tabla anual de devoluciones incorrectas por mes.
+
+    Parámetros:
+        _anio (int): Año del informe.
+        _prestamos (iterable|None): Pares (idPrestamo, préstamo) a recorrer en lugar de leer los
+        agregados (ver agregadosDelAnio).
 
     Retorno:
-        None: Se listan los registros y devuelve None. Si se captura una excepción se informa y devuelve None.
+        str: Tabla formateada con una columna por mes.
     """
-    try:
-        base = [
-            etiqueta for etiqueta in LIBRO_ESQUEMA['campos']
-            if etiqueta[0] != 'autores'
-        ]
+    meses = [
+        "ENE",
+        "FEB",
+        "MAR",
+        "ABR",
+        "MAY",
+        "JUN",
+        "JUL",
+        "AGO",
+        "SEP",
+        "OCT",
+        "NOV",
+        "DIC",
+    ]
 
-        autores = [
-            ('Autor 1', 'autores.autor1', 'string'),
-            ('Autor 2', 'autores.autor2', 'string'),
-            ('Autor 3', 'autores.autor3', 'string'),
-        ]
+    # Para cada mes (1–12), suma las devoluciones incorrectas de todos los libros en los agregados
+    agregados = cargarAgregados() if _prestamos is None else agregadosDelAnio(_anio, _prestamos)
+    incorrectasPorMes = []
+    for mes in range(1, 13):
+        celdas = agregados.get(claveDePeriodo(_anio, mes), {})
+        incorrectasPorMes.append(sum(celda[1] for celda in celdas.values()))
+
+    # Construye la tabla 'salida' manualmente
+    anchoTotal = 160
+    salida = []
+    salida.append("-" * anchoTotal)
+    salida.append(
+        "Resumen anual de reservas con devolución incorrecta".center(anchoTotal)
+    )
+    salida.append("-" * anchoTotal)
 
-        esquema = {
-            'id': LIBRO_ESQUEMA['id'],
-            'campos': base + autores
-        }
+    encabezado = "MESES".ljust(15)
+    for m in meses:
+        encabezado += f"{m}.{str(_anio)[-2:]}".center(12)
+    salida.append(encabezado)
+
+    salida.append("-" * anchoTotal)
+
+    fila = "Devol.Incorrect".ljust(15)
+    for val in incorrectasPorMes:
+        fila += f"{val}".center(12)
+    salida.append(fila)
+
+    salida.append("-" * anchoTotal)
+    return "\n".join(salida)
+
+def imprimirResumenAnualDevolucionesIncorrectas():
+    """
+    Solicita un año e imprime por consola el resumen anual de devoluciones incorrectas por mes.
+
+    Retorno:
+        None: Se imprime el resumen y devuelve None. Si se captura una excepción se informa y 
+        devuelve None.
+    """
+    try:
+        # Pide y valida el año a imprimir
+        anio = int(validarDato(input("Ingrese el año (formato AAAA): "),"año", "numero"))
 
-        listarRegistros(LIBROS_ARCHIVO, "libro", esquema)
+        # Imprime la tabla
+        print(generarResumenAnualDevolucionesIncorrectas(anio))
         return None
     except (FileNotFoundError, OSError) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
         return None
     except Exception as e:
-        print(f"Error inesperado al listar libros: {e}")
+        print(f"Error inesperado al imprimir resumen anual de devoluciones incorrectas: {e}")
         return None
 
-def registrarPrestamo():
+def leerLineasJson(_ruta):
     """
-    Registra un nuevo préstamo con ID automático de fecha/hora para alumno y libro válidos y lo 
-    agrega al archivo JSON correspondiente.
+    Lee un archivo JSON Lines de a una línea por vez.
+
+    Parámetros:
+        _ruta (str): Ruta del archivo (un objeto JSON por línea).
 
     Retorno:
-        None: Se crea el registro, se guarda sobre el archivo JSON y devuelve None. Si el usuario 
-        ingresa '0' para volver o se captura una excepción se informa y devuelve None.
+        generator: Un diccionario por cada línea no vacía, o None si la línea no es JSON válido
+        (se informa el número de línea).
     """
+    archivo = open(_ruta, mode="r", encoding="utf-8")
     try:
-        alumnos = cargarArchivo(ALUMNOS_ARCHIVO)
-        libros = cargarArchivo(LIBROS_ARCHIVO)
-        prestamos = cargarArchivo(PRESTAMOS_ARCHIVO)
+        for numero, linea in enumerate(archivo, start=1):
+            if linea.strip() == "":
+                continue
+            try:
+                yield json.loads(linea)
+            except ValueError:
+                print(f"Error: la línea {numero} de {_ruta} no es un JSON válido.")
+                yield None
+    finally:
+        archivo.close()
 
-        # Pide y valida el id del alumno
-        idAlumno = pedirYValidarId(alumnos, "alumno", True, "id")
-        if idAlumno is None:
-            return None
+def leerFilasImportacion(_ruta):
+    """
+    Lee de a una fila un archivo CSV (con encabezado) o JSON Lines, según su extensión.
 
-        # Pide y valida el id del libro
-        idLibro = pedirYValidarId(libros, "libro", True, "id")
-        if idLibro is None:
-            return None
+    Parámetros:
+        _ruta (str): Ruta del archivo. Las columnas o claves son "id" y las etiquetas de los campos
+        del esquema (ej. "nombre", "dirección", "celular").
 
-        # Genera el id del préstamo y la fecha de inicio
-        idPrestamo = datetime.now().strftime("%Y.%m.%d %H:%M:%S")
-        fechaInicio = datetime.now()
-
-        # Completa los campos del nuevo registro de préstamo
-        prestamos[idPrestamo] = {
-            "idPrestamo": idPrestamo,
-            "idAlumno": idAlumno,
-            "idLibro": idLibro,
-            "cantidadDias": 0,
-            "fechaInicio": fechaInicio.strftime("%Y-%m-%d"),
-            "fechaFinalizacion": "",
-            "estadoDevolucionCorrecto": False,
-        }
+    Retorno:
+        generator: Tuplas (número de línea, fila) donde fila es un diccionario, o None si la línea
+        no pudo interpretarse.
+    """
+    archivo = open(_ruta, mode="r", encoding="utf-8-sig", newline="")
+    try:
+        if _ruta.lower().endswith(".csv"):
+            lector = csv.DictReader(archivo)
+            for fila in lector:
+                # Normaliza los encabezados para aceptar mayúsculas y espacios
+                yield lector.line_num, {(clave or "").strip().lower(): valor for clave, valor in fila.items()}
+        else:
+            for numero, linea in enumerate(archivo, start=1):
+                if linea.strip() == "":
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except ValueError:
+                    yield numero, None
+                    continue
+                yield numero, fila if isinstance(fila, dict) else None
+    finally:
+        archivo.close()
 
-        escribirArchivo(PRESTAMOS_ARCHIVO, prestamos)
+def importarRegistros(_rutaEntrada, _ruta, _etiqueta, _esquema, _rutaErrores=None):
+    """
+    Importa alumnos o libros desde un archivo CSV o JSON Lines. Cada fila se valida con las mismas
+    reglas del esquema que usa el menú; las filas válidas se guardan todas juntas con una única
+    escritura y las rechazadas se vuelcan, con su motivo, a un informe de errores. Si la
+    importación falla (ej. el archivo no se puede leer hasta el final) no se guarda ninguna fila;
+    dentro de un lote en curso se suma a él y solo se deshacen sus filas (ver ejecutarEnLote).
 
-        print(f"Préstamo con ID: {idPrestamo} registrado exitosamente.")
-        return None
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
-        return None
-    except Exception as e:
-        print(f"Error inesperado al registrar préstamo: {e}")
-        return None
+    Parámetros:
+        _rutaEntrada (str): Archivo a importar (.csv con encabezado o .jsonl).
+        _ruta (str): Archivo JSON de la colección destino.
+        _etiqueta (str): "alumno" o "libro".
+        _esquema (dict): Esquema de la colección.
+        _rutaErrores (str|None): Informe de filas rechazadas (JSON Lines). Por defecto se usa
+        el nombre del archivo importado terminado en ".errores.jsonl".
 
-def finalizarPrestamo():
+    Retorno:
+        tuple: (cantidad de filas importadas, cantidad de filas rechazadas).
     """
-    Finaliza un préstamo, registra la devolución, calcula el monto y actualiza infracciones. 
-    Guarda los datos actualizados en los archivos JSON correspondientes.
+    if _rutaErrores is None:
+        _rutaErrores = os.path.splitext(_rutaEntrada)[0] + ".errores.jsonl"
+
+    archivoErrores = open(_rutaErrores, mode="w", encoding="utf-8")
+    try:
+        # Todas las filas válidas se escriben juntas al final, o ninguna si la importación falla
+        importadas, rechazadas = ejecutarEnLote([_ruta], aplicarImportacion, _rutaEntrada, _ruta, _etiqueta, _esquema, archivoErrores)
+    finally:
+        archivoErrores.close()
+
+    print(f"{_etiqueta.capitalize()}s importados: {importadas}. Filas rechazadas: {rechazadas}.")
+    if rechazadas:
+        print(f"Detalle de las filas rechazadas en {_rutaErrores}")
+    return importadas, rechazadas
+
+def aplicarImportacion(_rutaEntrada, _ruta, _etiqueta, _esquema, _archivoErrores):
+    """
+    Aplica una importación dentro de un lote. Ver importarRegistros.
+
+    Parámetros:
+        _rutaEntrada (str): Archivo a importar (.csv con encabezado o .jsonl).
+        _ruta (str): Archivo JSON de la colección destino.
+        _etiqueta (str): "alumno" o "libro".
+        _esquema (dict): Esquema de la colección.
+        _archivoErrores (file): Informe de filas rechazadas, ya abierto para escribir.
 
     Retorno:
-        None: Se modifican los registros, se guardan sobre los archivos JSON, se informa y 
-        devuelve None. Si el usuario ingresa '0' para volver o se captura una excepción se informa 
-        y devuelve None.
+        tuple: (cantidad de filas importadas, cantidad de filas rechazadas).
     """
-    try:
-        alumnos = cargarArchivo(ALUMNOS_ARCHIVO)
-        libros = cargarArchivo(LIBROS_ARCHIVO)
-        prestamos = cargarArchivo(PRESTAMOS_ARCHIVO)
+    importadas = 0
+    rechazadas = 0
+    diccionario = cargarArchivo(_ruta)
+    for numero, fila in leerFilasImportacion(_rutaEntrada):
+        if fila is None:
+            id, registro, motivo = None, None, "la línea no es un registro válido"
+        else:
+            valores = {campo: valor for campo, valor in fila.items() if campo != "id"}
+            id, registro, motivo = armarRegistroNuevo(diccionario, _etiqueta, _esquema, fila.get("id"), valores)
 
-        # Pide y valida el id del préstamo
-        idPrestamo = pedirYValidarId(prestamos, "préstamo", True, "idPrestamo")
-        if idPrestamo is None:
-            return None
+        if motivo is not None:
+            rechazadas += 1
+            _archivoErrores.write(json.dumps({"linea": numero, "motivo": motivo, "fila": fila}, ensure_ascii=False) + "\n")
+            continue
 
-        prestamo = prestamos[idPrestamo]
+        # Queda en memoria: un ID repetido más adelante en el mismo archivo también se rechaza
+        registro["version"] = 1
+        guardarRegistro(_ruta, id, registro, diccionario)
+        importadas += 1
+    return importadas, rechazadas
 
-        # Convierte la fecha de inicio al formato "YYYY-MM-DD"
-        fechaInicio = datetime.strptime(prestamo["fechaInicio"], "%Y-%m-%d")
+def separarCampos(_pares):
+    """
+    Convierte argumentos con la forma "campo=valor" en un diccionario.
+
+    Parámetros:
+        _pares (list): Cadenas "campo=valor" (el campo es la etiqueta del esquema, ej. "email").
 
-        # Asigna la fecha de finalización al día y horario actual
-        fechaFin = datetime.now()
+    Retorno:
+        dict: Valores por etiqueta de campo.
+    """
+    valores = {}
+    for par in _pares:
+        if "=" not in par:
+            raise ValueError(f"el argumento '{par}' no tiene la forma campo=valor")
+        campo, valor = par.split("=", 1)
+        valores[campo.strip().lower()] = valor
+    return valores
+
+def convertirBooleano(_valor):
+    """
+    Interpreta un valor de sí o no recibido en un lote o en un pedido del servicio. Acepta
+    booleanos, 1/0 y las cadenas true/false, si/sí/no y 1/0 (sin distinguir mayúsculas).
 
-        # Calcula los días de préstamo (1 por defecto)
-        diasPrestamo = (fechaFin - fechaInicio).days
-        if diasPrestamo == 0:
-            diasPrestamo = 1
+    Parámetros:
+        _valor (bool|int|str): Valor recibido.
 
-        # Calula el monto total (costo diario del libro * días de préstamo)
-        idLibro = prestamo["idLibro"]
-        costoDiario = libros[idLibro]["costoGarantia"]
-        montoTotal = costoDiario * diasPrestamo
+    Retorno:
+        bool: El valor interpretado. Cualquier otro valor lanza ValueError.
+    """
+    if isinstance(_valor, bool):
+        return _valor
+    if isinstance(_valor, int) and _valor in (0, 1):
+        return _valor == 1
+    if isinstance(_valor, str):
+        texto = _valor.strip().lower()
+        if texto in ("true", "si", "sí", "1"):
+            return True
+        if texto in ("false", "no", "0"):
+            return False
+    raise ValueError(f"'{_valor}' no es un valor de sí o no (true/false, si/no, 1/0)")
 
-        # Asigna los valores de fecha de finalización y cantidad de días al registro del préstamo
-        prestamo["fechaFinalizacion"] = fechaFin.strftime("%Y-%m-%d")
-        prestamo["cantidadDias"] = diasPrestamo
+def procesarEntradaLote(_comando, _entrada, _ruta, _etiqueta, _esquema, _devolucionCorrecta):
+    """
+    Aplica una entrada de un lote con la operación no interactiva correspondiente.
 
-        # Pregunta y valida si la devolución fue correcta
-        devolucion = validarDato(input("¿La devolución es correcta? (s = sí / n = no): ").strip().lower(), "respuesta", "string")
-        while devolucion not in ("s", "n"):
-            print("Error. Ingrese 's' o 'n'.")
-            devolucion = validarDato(input("¿La devolución es correcta? (s = sí / n = no): ").strip().lower(), "respuesta", "string")
+    Parámetros:
+        _comando (str): "ingresar", "modificar", "inactivar", "prestar" o "devolver".
+        _entrada (dict): Datos de la entrada (id y campos, idAlumno/idLibro o idPrestamo/correcta).
+        _ruta (str|None): Archivo de la entidad para ingresar, modificar o inactivar.
+        _etiqueta (str|None): "alumno" o "libro".
+        _esquema (dict|None): Esquema de la entidad.
+        _devolucionCorrecta (bool): Valor por defecto de "correcta" al devolver.
 
-        devolucionCorrecta = devolucion == "s"
+    Retorno:
+        bool: True si la entrada se aplicó, False si tuvo error (se informa el motivo).
+    """
+    if _comando == "ingresar":
+        valores = {campo: valor for campo, valor in _entrada.items() if campo != "id"}
+        return crearRegistroConDatos(_ruta, _etiqueta, _esquema, _entrada.get("id", ""), valores)
 
-        # Si la devolución no fue correcta suma una infracción al alumno
-        if not devolucionCorrecta:
-            idAlumno = prestamo["idAlumno"]
-            alumnos[idAlumno]["infracciones"] += 1
-            escribirArchivo(ALUMNOS_ARCHIVO, alumnos)
-            print("Se añadió 1 infracción al alumno.")
+    if _comando == "modificar":
+        valores = {campo: valor for campo, valor in _entrada.items() if campo != "id"}
+        return modificarRegistroConDatos(_ruta, _etiqueta, _esquema, _entrada.get("id", ""), valores)
 
-        escribirArchivo(ALUMNOS_ARCHIVO, alumnos)
-        escribirArchivo(PRESTAMOS_ARCHIVO, prestamos)
+    if _comando == "inactivar":
+        return inactivarRegistroPorId(_ruta, _etiqueta, _entrada.get("id", ""))
 
-        print(f"\nPréstamo finalizado correctamente.")
-        print(f"Días prestados: {diasPrestamo}")
-        print(f"Costo por día : {costoDiario}")
-        print(f"Total a pagar : {montoTotal}\n")
+    if _comando == "prestar":
+        idAlumno = str(_entrada.get("idAlumno", "")).strip().upper()
+        idLibro = str(_entrada.get("idLibro", "")).strip().upper()
+        idPrestamo = registrarPrestamoConDatos(idAlumno, idLibro)
+        if idPrestamo is None:
+            return False
+        print(f"Préstamo con ID: {idPrestamo} registrado exitosamente.")
+        return True
 
-        return None
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
-        return None
-    except Exception as e:
-        print(f"Error inesperado al finalizar préstamo: {e}")
-        return None
+    # Caso "devolver"
+    idPrestamo = str(_entrada.get("idPrestamo", "")).strip()
+    try:
+        correcta = convertirBooleano(_entrada.get("correcta", _devolucionCorrecta))
+    except ValueError as detalle:
+        print(f"Error: el campo 'correcta' del préstamo {idPrestamo} es inválido: {detalle}.")
+        return False
+    resultado = finalizarPrestamoConDatos(idPrestamo, correcta)
+    if resultado is None:
+        return False
+    print(f"Préstamo {idPrestamo} finalizado. Total a pagar: {resultado['montoTotal']}")
+    return True
 
-def imprimirResumenMensual():
+def precargarDatos():
     """
-    Solicita un año y mes e imprime por consola el listado de préstamos iniciados en ese periodo.
+    Lee y deja en memoria todos los archivos que usan las operaciones y arma los índices de
+    búsqueda, para que el primer pedido al servicio no tenga que esperar el parseo.
 
     Retorno:
-        None: Se imprime el resumen y devuelve None. Si se captura una excepción se informa y 
-        devuelve None.
+        None
     """
-    try:
-        alumnos = cargarArchivo(ALUMNOS_ARCHIVO)
-        libros = cargarArchivo(LIBROS_ARCHIVO)
-        prestamos = cargarArchivo(PRESTAMOS_ARCHIVO)
+    for direccion in (ALUMNOS_ARCHIVO, LIBROS_ARCHIVO, PRESTAMOS_ARCHIVO):
+        cargarArchivo(direccion)
+    for direccion in CAMPOS_DE_BUSQUEDA:
+        obtenerIndiceTexto(direccion)
+    cargarPrestamosActivos()
+    cargarAgregados()
+    return None
+
+def despacharPedido(_metodo, _partes, _consulta, _cuerpo):
+    """
+    Ejecuta la operación que corresponde a un pedido HTTP del servicio.
+
+    Rutas:
+        GET    /alumnos | /libros                  Registros activos.
+        GET    /alumnos?buscar= | /libros?buscar=  Búsqueda por nombre, apellido o email (alumnos) o por
+                                                   título, autores, género o editorial (libros).
+        GET    /alumnos?desde=&cantidad=&orden=&campo=valor  Una página de los registros activos (también
+                                                   /libros), ordenada por los campos separados por coma
+                                                   ("-" adelante, de mayor a menor) y filtrada por campo.
+        GET    /alumnos/ID | /libros/ID            Un registro.
+        POST   /alumnos | /libros                  Alta: {"id": ..., campo: valor, ...} por etiqueta.
+        PATCH  /alumnos/ID | /libros/ID            Modificación: {campo: valor, ...}.
+        DELETE /alumnos/ID | /libros/ID            Inactivación.
+        GET    /prestamos/activos[?alumno=&libro=] Préstamos sin finalizar.
+        GET    /alumnos/ID/prestamos | /libros/ID/prestamos  Historial completo de préstamos.
+        POST   /prestamos                          Alta: {"idAlumno": ..., "idLibro": ...}.
+        POST   /prestamos/ID/devolucion            Finalización: {"correcta": true|false}.
+        GET    /informes/mensual?anio=&mes=        Informes (también cantidades, pesos e incorrectas).
 
-        # Pide y valida el año y mes a imprimir
-        anio = int(validarDato(input("Ingrese el año (formato AAAA): "),"año", "numero"))
-        mes = int(validarDato(input("Ingrese el mes (1-12): "), "mes", "numero"))
+    Parámetros:
+        _metodo (str): Método HTTP en mayúsculas.
+        _partes (list): Segmentos de la ruta (ej. ["alumnos", "A1001"]).
+        _consulta (dict): Parámetros de la consulta (?clave=valor).
+        _cuerpo (dict): Cuerpo JSON del pedido.
 
-        # Prepara encabezados
-        salida = []
-        salida.append(f"Listado de reservas del mes {mes}/{anio}")
-        salida.append(f"{'Fecha/Hora':<35}{'Alumno':<35}{'Libro':<35}")
-        salida.append("-" * 105)
-
-        # Filtra y formatea los préstamos
-        for clave, prestamo in prestamos.items():
-            fecha = prestamo["fechaInicio"]
-            if fecha.startswith(f"{anio}-{str(mes).zfill(2)}"):
-                fechaHora = clave
-                idAlumno = prestamo["idAlumno"]
-                nombreAlumno = alumnos.get(idAlumno, {}).get(
-                    "nombre", f"Alumno {idAlumno}"
-                )
-                idLibro = prestamo["idLibro"]
-                tituloLibro = libros.get(idLibro, {}).get("titulo", f"Libro {idLibro}")
-                salida.append(f"{fechaHora:<35}{nombreAlumno:<35}{tituloLibro:<35}")
+    Retorno:
+        tuple: (código de estado HTTP, resultado serializable a JSON).
+    """
+    if len(_partes) in (1, 2) and _partes[0] in ("alumnos", "libros"):
+        ruta, etiqueta, esquema = (
+            (ALUMNOS_ARCHIVO, "alumno", ALUMNO_ESQUEMA) if _partes[0] == "alumnos"
+            else (LIBROS_ARCHIVO, "libro", LIBRO_ESQUEMA)
+        )
+        if len(_partes) == 1 and _metodo == "GET" and ruta in CAMPOS_DE_BUSQUEDA and "buscar" in _consulta:
+            total, registros = buscarRegistros(ruta, _consulta["buscar"])
+            return 200, {"total": total, "registros": registros}
+        if len(_partes) == 1 and _metodo == "GET" and _consulta:
+            desde = int(_consulta.get("desde", 0))
+            cantidad = int(_consulta.get("cantidad", TAMANIO_PAGINA_LISTADO))
+            orden = [campo for campo in _consulta.get("orden", "").split(",") if campo.strip()]
+            filtros = {campo: valor for campo, valor in _consulta.items() if campo not in ("desde", "cantidad", "orden")}
+            listado = ALUMNO_ESQUEMA_LISTADO if ruta == ALUMNOS_ARCHIVO else LIBRO_ESQUEMA_LISTADO
+            registros = recorrerRegistros(ruta, listado, filtros, orden)
+            return 200, dict(itertools.islice(registros, max(desde, 0), max(desde, 0) + max(cantidad, 0)))
+        if len(_partes) == 1 and _metodo == "GET":
+            return 200, {id: registro for id, registro in cargarArchivo(ruta).items() if registro["activo"]}
+        if len(_partes) == 1 and _metodo == "POST":
+            valores = {campo: valor for campo, valor in _cuerpo.items() if campo != "id"}
+            if crearRegistroConDatos(ruta, etiqueta, esquema, _cuerpo.get("id"), valores):
+                return 201, {"id": str(_cuerpo.get("id")).strip().upper()}
+            return 400, None
+
+        id = _partes[1].upper()
+        if _metodo == "GET":
+            registro = cargarArchivo(ruta).get(id)
+            return (200, registro) if registro is not None else (404, None)
+        if _metodo == "PATCH":
+            return (200, None) if modificarRegistroConDatos(ruta, etiqueta, esquema, id, _cuerpo) else (400, None)
+        if _metodo == "DELETE":
+            return (200, None) if inactivarRegistroPorId(ruta, etiqueta, id) else (404, None)
+
+    elif len(_partes) == 3 and _partes[0] in ("alumnos", "libros") and _partes[2] == "prestamos" and _metodo == "GET":
+        direccionIndice = PRESTAMOS_POR_ALUMNO_ARCHIVO if _partes[0] == "alumnos" else PRESTAMOS_POR_LIBRO_ARCHIVO
+        return 200, consultarHistorialPrestamos(direccionIndice, _partes[1].upper())
+
+    elif _partes == ["prestamos"] and _metodo == "POST":
+        idPrestamo = registrarPrestamoConDatos(str(_cuerpo.get("idAlumno", "")).upper(), str(_cuerpo.get("idLibro", "")).upper())
+        return (201, {"idPrestamo": idPrestamo}) if idPrestamo is not None else (400, None)
+
+    elif _partes == ["prestamos", "activos"] and _metodo == "GET":
+        activos = cargarPrestamosActivos()
+        if "alumno" in _consulta:
+            ids = activos["porAlumno"].get(_consulta["alumno"].upper(), [])
+        elif "libro" in _consulta:
+            ids = activos["porLibro"].get(_consulta["libro"].upper(), [])
+        else:
+            ids = activos["prestamos"]
+        return 200, {idPrestamo: activos["prestamos"][idPrestamo] for idPrestamo in sorted(ids)}
+
+    elif len(_partes) == 3 and _partes[0] == "prestamos" and _partes[2] == "devolucion" and _metodo == "POST":
+        resultado = finalizarPrestamoConDatos(_partes[1], convertirBooleano(_cuerpo.get("correcta", True)))
+        return (200, resultado) if resultado is not None else (404, None)
+
+    elif len(_partes) == 2 and _partes[0] == "informes" and _metodo == "GET":
+        anio = int(_consulta.get("anio", ""))
+        if _partes[1] == "mensual":
+            return 200, {"texto": generarResumenMensual(anio, int(_consulta.get("mes", "")))}
+        elif _partes[1] == "cantidades":
+            return 200, {"texto": generarResumenAnualPorLibroCantidad(anio)}
+        elif _partes[1] == "pesos":
+            return 200, {"texto": generarResumenAnualPorLibroPesos(anio)}
+        elif _partes[1] == "incorrectas":
+            return 200, {"texto": generarResumenAnualDevolucionesIncorrectas(anio)}
+
+    return 404, None
+
+def atenderPedido(_metodo, _destino, _cuerpo):
+    """
+    Atiende un pedido del servicio. Los mensajes que las operaciones imprimen por consola (ej. los
+    errores de validación) se devuelven en la respuesta en lugar de imprimirse.
 
-        # Imprime los préstamos formateados
-        print("\n".join(salida))
-        return None
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
-        return None
+    Parámetros:
+        _metodo (str): Método HTTP.
+        _destino (str): Ruta con la consulta (ej. "/informes/pesos?anio=2025").
+        _cuerpo (bytes): Cuerpo del pedido (JSON o vacío).
+
+    Retorno:
+        tuple: (código de estado HTTP, diccionario {"ok", "resultado", "mensajes"}).
+    """
+    salida = io.StringIO()
+    try:
+        cuerpo = json.loads(_cuerpo) if _cuerpo else {}
+        if not isinstance(cuerpo, dict):
+            raise ValueError("el cuerpo debe ser un objeto JSON")
+        partesDestino = urlsplit(_destino)
+        partes = [parte for parte in unquote(partesDestino.path).split("/") if parte]
+        consulta = {clave: valores[-1] for clave, valores in parse_qs(partesDestino.query).items()}
+        with contextlib.redirect_stdout(salida):
+            estado, resultado = despacharPedido(_metodo.upper(), partes, consulta, cuerpo)
+    except ValueError as detalle:
+        estado, resultado = 400, None
+        salida.write(f"Error: pedido inválido ({detalle}).\n")
     except Exception as e:
-        print(f"Error inesperado al imprimir resumen mensual: {e}")
-        return None
+        estado, resultado = 500, None
+        salida.write(f"Error inesperado al atender el pedido: {e}\n")
 
-def imprimirResumenAnualPorLibroCantidad():
+    mensajes = [linea for linea in salida.getvalue().splitlines() if linea.strip()]
+    return estado, {"ok": estado < 400, "resultado": resultado, "mensajes": mensajes}
+
+async def atenderConexion(_lector, _escritor):
     """
-    Solicita un año e imprime por consola cuántos préstamos tuvo cada libro mes a mes.
+    Lee un pedido HTTP/1.1 de una conexión, lo atiende y responde en JSON cerrando la conexión.
+
+    Parámetros:
+        _lector (asyncio.StreamReader): Lectura de la conexión.
+        _escritor (asyncio.StreamWriter): Escritura de la conexión.
 
     Retorno:
-        None: Se imprime el resumen y devuelve None. Si se captura una excepción se informa y 
-        devuelve None.
+        None
     """
     try:
-        libros = cargarArchivo(LIBROS_ARCHIVO)
-        prestamos = cargarArchivo(PRESTAMOS_ARCHIVO)
+        lineaPedido = (await _lector.readline()).decode("latin-1").split()
+        if len(lineaPedido) < 2:
+            return None
+        metodo, destino = lineaPedido[0], lineaPedido[1]
+
+        encabezados = {}
+        linea = await _lector.readline()
+        while linea not in (b"\r\n", b"\n", b""):
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            encabezados[nombre.strip().lower()] = valor.strip()
+            linea = await _lector.readline()
+        largo = int(encabezados.get("content-length", "0") or "0")
+        cuerpo = await _lector.readexactly(largo) if largo > 0 else b""
+
+        # Las operaciones se ejecutan de a una en el hilo del servicio: no hay dos pedidos a la vez sobre los datos
+        estado, respuesta = atenderPedido(metodo, destino, cuerpo)
+
+        contenido = json.dumps(respuesta, ensure_ascii=False, default=serializarRegistro).encode("utf-8")
+        _escritor.write(
+            (
+                f"HTTP/1.1 {estado} {HTTPStatus(estado).phrase}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(contenido)}\r\n"
+                f"Connection: close\r\n\r\n"
+            ).encode("latin-1") + contenido
+        )
+        await _escritor.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        _escritor.close()
+    return None
+
+async def escribirEnSegundoPlano(_intervalo):
+    """
+    Tarea del servicio que cada cierto intervalo escribe a disco los cambios acumulados (una vez
+    por archivo, de forma atómica) y abre un lote nuevo para los pedidos siguientes.
 
-        # Pide y valida el año a imprimir
-        anio = int(validarDato(input("Ingrese el año (formato AAAA): "),"año", "numero"))
+    Parámetros:
+        _intervalo (float): Segundos entre escrituras.
 
-        # Crea un diccionario con una lista de 12 ceros (uno por cada mes) para cada libro
-        resumen = {idLibro: [0] * 12 for idLibro in libros.keys()}
-
-        # Cuenta los préstamos por mes, filtrados por año
-        for prestamo in prestamos.values():
-            fecha = prestamo["fechaInicio"]
-            if fecha.startswith(str(anio)):
-                mes = int(fecha[5:7])  # Extrae el mes
-                libro = prestamo["idLibro"]
-                if libro in resumen:
-                    resumen[libro][mes - 1] += 1
-        
-        # Genera el resumen por título de libro
-        resumenPorTitulo = {
-            libros.get(idLibro, {}).get("titulo", f"Libro {idLibro}"): valores
-            for idLibro, valores in resumen.items()
-        }
+    Retorno:
+        None: Corre hasta que se cancela. Si una escritura falla, el error se informa (los cambios
+        de ese lote se pierden y los datos se vuelven a leer de disco) y la tarea sigue corriendo.
+    """
+    while True:
+        await asyncio.sleep(_intervalo)
+        if loteActual is not None and loteActual["pendientes"]:
+            try:
+                confirmarLote()
+            except (OSError, sqlite3.Error) as detalle:
+                print("Error al escribir los cambios del servicio; no se guardaron:", detalle)
+            except Exception as e:
+                print(f"Error inesperado al escribir los cambios del servicio; no se guardaron: {e}")
+            finally:
+                # Siempre queda un lote abierto para los pedidos siguientes
+                if loteActual is None:
+                    iniciarLote(ARCHIVOS_DEL_SERVICIO)
+
+async def ejecutarServicio(_host, _puerto, _intervalo):
+    """
+    Levanta el servidor HTTP y la tarea de escritura en segundo plano.
 
-        # Formatea el resumen para generar la tabla con cantidades y la imprime
-        informe = formatearInformes(resumenPorTitulo, anio, "Resumen Anual de Reservas por Libro (Cantidades)")
-        print(informe)
-        return None
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
-        return None
-    except Exception as e:
-        print(f"Error inesperado al imprimir resumen anual de reservas por libro: {e}")
-        return None
+    Parámetros:
+        _host (str): Dirección en la que escucha.
+        _puerto (int): Puerto en el que escucha.
+        _intervalo (float): Segundos entre escrituras a disco.
 
-def imprimirResumenAnualPorLibroPesos():
+    Retorno:
+        None: Corre hasta que se interrumpe (Ctrl+C) o recibe SIGTERM.
     """
-    Solicita un año e imprime por consola el resumen anual del dinero en garantía movido por libro.
+    detener = asyncio.Event()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, detener.set)
+    except (NotImplementedError, AttributeError): # Windows: solo se detiene con Ctrl+C
+        pass
+
+    servidor = await asyncio.start_server(atenderConexion, _host, _puerto)
+    escritor = asyncio.ensure_future(escribirEnSegundoPlano(_intervalo))
+    print(f"Servicio escuchando en http://{_host}:{_puerto} (Ctrl+C para detener).")
+    try:
+        async with servidor:
+            await detener.wait()
+    finally:
+        escritor.cancel()
+    print("\nServicio detenido.")
+
+def servir(_host=HOST_SERVICIO, _puerto=PUERTO_SERVICIO, _intervalo=INTERVALO_ESCRITURA_SERVICIO):
+    """
+    Ejecuta la biblioteca como servicio HTTP/JSON de larga duración. Los datos se leen una sola vez
+    y quedan en memoria; los pedidos se aplican sobre esa copia y una tarea en segundo plano los
+    escribe a disco cada _intervalo segundos y al detener el servicio. Mientras corre, el servicio
+    tiene bloqueados los archivos: las demás terminales deben operar a través de él.
+
+    Parámetros:
+        _host (str): Dirección en la que escucha.
+        _puerto (int): Puerto en el que escucha.
+        _intervalo (float): Segundos entre escrituras a disco.
 
     Retorno:
-        None: Se imprime el resumen y devuelve None. Si se captura una excepción se informa y 
-        devuelve None.
+        int: 0 al detenerse, 1 si no se pudieron escribir los últimos cambios.
     """
+    iniciarLote(ARCHIVOS_DEL_SERVICIO)
+    codigo = 0
     try:
-        libros = cargarArchivo(LIBROS_ARCHIVO)
-        prestamos = cargarArchivo(PRESTAMOS_ARCHIVO)
-
-        # Pide y valida el año a imprimir
-        anio = int(validarDato(input("Ingrese el año (formato AAAA): "),"año", "numero"))
+        precargarDatos()
+        asyncio.run(ejecutarServicio(_host, _puerto, _intervalo))
+    except KeyboardInterrupt:
+        print("\nServicio detenido.")
+    finally:
+        # Escribe lo que haya quedado pendiente
+        try:
+            confirmarLote()
+        except (OSError, sqlite3.Error) as detalle:
+            print("Error al escribir los últimos cambios del servicio:", detalle)
+            codigo = 1
+    return codigo
+
+def ejecutarLineaDeComandos(_argumentos):
+    """
+    Ejecuta una operación en lote a partir de argumentos de línea de comandos, sin menú ni
+    preguntas. Todas las entradas se aplican sobre los datos cargados una sola vez y cada archivo
+    modificado se escribe una única vez al final.
+
+    Ejemplos:
+        python Entrega2.py ingresar alumno --archivo alumnos_nuevos.jsonl
+        python Entrega2.py importar alumno inscriptos.csv --errores rechazados.jsonl
+        python Entrega2.py modificar libro L1001 costo=3500 editorial=Planeta
+        python Entrega2.py inactivar alumno A1002 A1006
+        python Entrega2.py prestar A1001 L1002 A1003 L1004
+        python Entrega2.py devolver "2025.05.01 09:15:32" --incorrecta
+        python Entrega2.py historial alumno A1003
+        python Entrega2.py buscar libro garcia marquez
+        python Entrega2.py buscar alumno fernandes
+        python Entrega2.py listar libro --orden=-costo,título --filtro género=novela --cantidad 20
+        python Entrega2.py listar alumno --desde 100 --cantidad 50
+        python Entrega2.py informe cantidades 2025
+        python Entrega2.py informe mensual 2025 5 --streaming
+        python Entrega2.py reconstruir
+        python Entrega2.py servir --puerto 8080
 
-        resumen = {}
+    Parámetros:
+        _argumentos (list): Argumentos recibidos (sin el nombre del programa).
 
-        # Construye el resumen de montos
-        for prestamo in prestamos.values():
-            fecha = prestamo["fechaInicio"]
-            if fecha.startswith(str(anio)):
-                mes = int(fecha[5:7]) - 1
-                idLibro = prestamo["idLibro"]
-                nombreLibro = libros.get(idLibro, {}).get("titulo", f"Libro {idLibro}")
-                costo = libros.get(idLibro, {}).get("costoGarantia", 0)
+    Retorno:
+        int: 0 si todas las entradas se procesaron bien, 1 si alguna tuvo error.
+    """
+    parser = argparse.ArgumentParser(
+        prog="Entrega2.py",
+        description="Operaciones en lote sobre alumnos, libros y préstamos. Sin argumentos se abre el menú.",
+    )
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    for comando, ayuda in (
+        ("ingresar", "ID seguido de campo=valor, o --archivo JSONL con 'id' y los campos"),
+        ("modificar", "ID seguido de campo=valor, o --archivo JSONL con 'id' y los campos a cambiar"),
+        ("inactivar", "uno o más IDs, o --archivo JSONL con 'id'"),
+    ):
+        subparser = comandos.add_parser(comando, help=ayuda)
+        subparser.add_argument("entidad", choices=["alumno", "libro"])
+        subparser.add_argument("datos", nargs="*")
+        subparser.add_argument("--archivo", help="archivo JSON Lines con una entrada por línea")
+
+    subparser = comandos.add_parser("importar", help="importa un CSV o JSONL validado, con informe de filas rechazadas")
+    subparser.add_argument("entidad", choices=["alumno", "libro"])
+    subparser.add_argument("archivo", help="archivo .csv (con encabezado) o .jsonl")
+    subparser.add_argument("--errores", help="informe de filas rechazadas (por defecto <archivo>.errores.jsonl)")
+
+    subparser = comandos.add_parser("prestar", help="pares ID_ALUMNO ID_LIBRO, o --archivo JSONL con 'idAlumno' e 'idLibro'")
+    subparser.add_argument("datos", nargs="*")
+    subparser.add_argument("--archivo", help="archivo JSON Lines con una entrada por línea")
+
+    subparser = comandos.add_parser("devolver", help="uno o más ID de préstamo, o --archivo JSONL con 'idPrestamo' y 'correcta'")
+    subparser.add_argument("datos", nargs="*")
+    subparser.add_argument("--archivo", help="archivo JSON Lines con una entrada por línea")
+    subparser.add_argument("--incorrecta", action="store_true", help="registra las devoluciones como incorrectas")
+
+    subparser = comandos.add_parser("historial", help="imprime todos los préstamos de un alumno o de un libro")
+    subparser.add_argument("entidad", choices=["alumno", "libro"])
+    subparser.add_argument("id")
+
+    subparser = comandos.add_parser("buscar", help="busca alumnos (nombre, apellido, email) o libros (título, autores, género, editorial) activos")
+    subparser.add_argument("entidad", choices=["alumno", "libro"])
+    subparser.add_argument("palabras", nargs="+")
+
+    subparser = comandos.add_parser("listar", help="imprime los alumnos o libros activos, filtrados y ordenados por campo")
+    subparser.add_argument("entidad", choices=["alumno", "libro"])
+    subparser.add_argument("--orden", default="", help="campos por los que se ordena, separados por coma; con '-' adelante, de mayor a menor (ej. --orden=-costo,título)")
+    subparser.add_argument("--filtro", nargs="+", default=[], help="campo=valor que deben cumplir los registros")
+    subparser.add_argument("--desde", type=int, default=0, help="registros que se saltean antes del primero que se imprime")
+    subparser.add_argument("--cantidad", type=int, help="máximo de registros a imprimir (por defecto, todos)")
+
+    subparser = comandos.add_parser("informe", help="imprime un informe")
+    subparser.add_argument("tipo", choices=["mensual", "cantidades", "pesos", "incorrectas"])
+    subparser.add_argument("anio", type=int)
+    subparser.add_argument("mes", type=int, nargs="?")
+    subparser.add_argument("--streaming", action="store_true", help="recalcula el informe recorriendo solo los préstamos del período, sin los agregados")
+
+    comandos.add_parser("reconstruir", help="vuelve a armar los índices derivados del historial de préstamos (activos, agregados, historial por alumno y libro, particiones) y las fotos binarias de las colecciones")
+
+    subparser = comandos.add_parser("servir", help="atiende las operaciones como servicio HTTP/JSON con los datos en memoria")
+    subparser.add_argument("--host", default=HOST_SERVICIO)
+    subparser.add_argument("--puerto", type=int, default=PUERTO_SERVICIO)
+    subparser.add_argument("--intervalo", type=float, default=INTERVALO_ESCRITURA_SERVICIO, help="segundos entre escrituras a disco")
+
+    argumentos = parser.parse_args(_argumentos)
+
+    if argumentos.comando == "servir":
+        return servir(argumentos.host, argumentos.puerto, argumentos.intervalo)
+
+    if argumentos.comando == "reconstruir":
+        try:
+            ejecutarEnLote(ARCHIVOS_DE_PRESTAMO, actualizarDerivados, True)
+            ejecutarEnLote(list(SNAPSHOT_COLUMNAS), escribirFotosColecciones)
+        except (OSError, sqlite3.Error) as detalle:
+            print("Error al reconstruir los índices derivados:", detalle)
+            return 1
+        print("Índices derivados del historial y fotos de las colecciones reconstruidos.")
+        return 0
+
+    # Los historiales, los listados, las búsquedas y los informes solo leen: se imprimen y termina
+    if argumentos.comando == "historial":
+        direccionIndice = PRESTAMOS_POR_ALUMNO_ARCHIVO if argumentos.entidad == "alumno" else PRESTAMOS_POR_LIBRO_ARCHIVO
+        print(generarHistorialPrestamos(direccionIndice, argumentos.id.upper()))
+        return 0
+
+    if argumentos.comando == "listar":
+        try:
+            filtros = separarCampos(argumentos.filtro)
+        except ValueError as detalle:
+            parser.error(str(detalle))
+        ruta, esquema = (
+            (ALUMNOS_ARCHIVO, ALUMNO_ESQUEMA_LISTADO) if argumentos.entidad == "alumno"
+            else (LIBROS_ARCHIVO, LIBRO_ESQUEMA_LISTADO)
+        )
+        orden = [campo for campo in argumentos.orden.split(",") if campo.strip()]
+        listarRegistros(ruta, argumentos.entidad, esquema, filtros, orden, max(argumentos.desde, 0), argumentos.cantidad, False)
+        return 0
+
+    if argumentos.comando == "buscar":
+        texto = " ".join(argumentos.palabras)
+        print(generarBusquedaAlumnos(texto) if argumentos.entidad == "alumno" else generarBusquedaLibros(texto))
+        return 0
+
+    if argumentos.comando == "informe":
+        prestamos = None
+        if argumentos.streaming:
+            prestamos = recorrerPrestamosDelPeriodo(argumentos.anio, argumentos.mes if argumentos.tipo == "mensual" else None)
+        if argumentos.tipo == "mensual":
+            if argumentos.mes is None:
+                parser.error("el informe mensual requiere año y mes")
+            print(generarResumenMensual(argumentos.anio, argumentos.mes, prestamos))
+        elif argumentos.tipo == "cantidades":
+            print(generarResumenAnualPorLibroCantidad(argumentos.anio, prestamos))
+        elif argumentos.tipo == "pesos":
+            print(generarResumenAnualPorLibroPesos(argumentos.anio, prestamos))
+        else:
+            print(generarResumenAnualDevolucionesIncorrectas(argumentos.anio, prestamos))
+        return 0
+
+    ruta, etiqueta, esquema = None, None, None
+    if argumentos.comando in ("ingresar", "modificar", "inactivar", "importar"):
+        etiqueta = argumentos.entidad
+        ruta, esquema = (ALUMNOS_ARCHIVO, ALUMNO_ESQUEMA) if etiqueta == "alumno" else (LIBROS_ARCHIVO, LIBRO_ESQUEMA)
+
+    # La importación valida y escribe por su cuenta, con informe de errores
+    if argumentos.comando == "importar":
+        try:
+            importadas, rechazadas = importarRegistros(argumentos.archivo, ruta, etiqueta, esquema, argumentos.errores)
+        except (FileNotFoundError, OSError, sqlite3.Error) as detalle:
+            print("Error al importar; no se guardó ninguna fila:", detalle)
+            return 1
+        return 0 if rechazadas == 0 else 1
+
+    # Arma las entradas desde el archivo o desde los argumentos
+    try:
+        if argumentos.archivo:
+            entradas = leerLineasJson(argumentos.archivo)
+        elif argumentos.comando in ("ingresar", "modificar"):
+            if not argumentos.datos:
+                parser.error("falta el ID")
+            entradas = [dict(separarCampos(argumentos.datos[1:]), id=argumentos.datos[0])]
+        elif argumentos.comando == "inactivar":
+            entradas = [{"id": id} for id in argumentos.datos]
+        elif argumentos.comando == "prestar":
+            if len(argumentos.datos) % 2 != 0:
+                parser.error("los préstamos se indican en pares ID_ALUMNO ID_LIBRO")
+            entradas = [
+                {"idAlumno": argumentos.datos[i], "idLibro": argumentos.datos[i + 1]}
+                for i in range(0, len(argumentos.datos), 2)
+            ]
+        else:
+            entradas = [{"idPrestamo": id} for id in argumentos.datos]
+    except ValueError as detalle:
+        parser.error(str(detalle))
 
-                if nombreLibro not in resumen:
-                    resumen[nombreLibro] = [0] * 12
-                resumen[nombreLibro][mes] += costo
+    devolucionCorrecta = not getattr(argumentos, "incorrecta", False)
+    correctas = 0
+    errores = 0
 
-        # Formatea el resumen para generar la tabla en pesos y la imprime
-        informe = formatearInformes(resumen, anio, "Resumen Anual de Reservas por Libro (Pesos)", _esDinero=True)
-        print(informe)
-        return None
+    # Bloquea desde el inicio todo lo que el lote va a modificar
+    iniciarLote([ruta] if ruta is not None else ARCHIVOS_DE_PRESTAMO)
+    try:
+        for entrada in entradas:
+            try:
+                if entrada is not None and procesarEntradaLote(
+                    argumentos.comando, entrada, ruta, etiqueta, esquema, devolucionCorrecta
+                ):
+                    correctas += 1
+                else:
+                    errores += 1
+            except Exception as e:
+                print(f"Error inesperado al procesar {entrada}: {e}")
+                errores += 1
     except (FileNotFoundError, OSError) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
-        return None
-    except Exception as e:
-        print(f"Error inesperado al imprimir resumen anual por libro: {e}")
-        return None
+        errores += 1
+    finally:
+        # Escribe una sola vez cada archivo modificado
+        try:
+            confirmarLote()
+        except (OSError, sqlite3.Error) as detalle:
+            print("Error al escribir los cambios del lote; las entradas no se guardaron:", detalle)
+            correctas, errores = 0, correctas + errores
+
+    print(f"Procesadas: {correctas + errores}. Correctas: {correctas}. Con error: {errores}.")
+    return 0 if errores == 0 else 1
+
+def sumarMetrica(_metrica, _cantidad):
+    """
+    Suma una cantidad a una métrica de la operación instrumentada en curso. Si la instrumentación
+    no está activa no hace nada.
 
-def imprimirResumenAnualDevolucionesIncorrectas():
+    Parámetros:
+        _metrica (str): "bytesLeidos", "bytesEscritos", "registrosLeidos" o "registrosEscritos".
+        _cantidad (int): Cantidad a sumar.
+
+    Retorno:
+        None
     """
-    Solicita un año e imprime por consola el resumen anual de devoluciones incorrectas por mes.
+    if operacionActual is not None:
+        operacionActual[_metrica] += _cantidad
+    return None
+
+def esperarEntrada(_mensaje=""):
+    """
+    Reemplazo de input() mientras la instrumentación está activa: descuenta del tiempo de la
+    operación lo que se espera al usuario.
+
+    Parámetros:
+        _mensaje (str): Mensaje a mostrar.
 
     Retorno:
-        None: Se imprime el resumen y devuelve None. Si se captura una excepción se informa y 
-        devuelve None.
+        str: Texto ingresado.
     """
+    inicio = time.perf_counter()
     try:
-        prestamos = cargarArchivo(PRESTAMOS_ARCHIVO)
-        
-        # Pide y valida el año a imprimir
-        anio = int(validarDato(input("Ingrese el año (formato AAAA): "),"año", "numero"))
+        return builtins.input(_mensaje)
+    finally:
+        if operacionActual is not None:
+            operacionActual["esperaUsuario"] += time.perf_counter() - inicio
 
-        meses = [
-            "ENE",
-            "FEB",
-            "MAR",
-            "ABR",
-            "MAY",
-            "JUN",
-            "JUL",
-            "AGO",
-            "SEP",
-            "OCT",
-            "NOV",
-            "DIC",
-        ]
+def envolverOperacion(_nombre, _funcion):
+    """
+    Envuelve una acción del menú para que, al ejecutarse, agregue una línea a la traza con su
+    tiempo total, el tiempo de espera al usuario, los bytes y registros leídos y escritos, y el
+    tiempo de cada función auxiliar instrumentada. Opcionalmente guarda un perfil de cProfile.
 
-        # Para cada mes (1–12), cuenta los préstamos cuyo estadoDevolucionCorrecto sea False (por defecto True si falta)
-        incorrectasPorMes = []
-        for mes in range(1, 13):
-            incorrectas = 0
-            for prestamo in prestamos.values():
-                fecha = prestamo["fechaInicio"]
-                if fecha.startswith(f"{anio}-{str(mes).zfill(2)}"):
-                    if not prestamo.get("estadoDevolucionCorrecto", True):
-                        incorrectas += 1
-            incorrectasPorMes.append(incorrectas)
-
-        # Construye la tabla 'salida' manualmente
-        anchoTotal = 160
-        salida = []
-        salida.append("-" * anchoTotal)
-        salida.append(
-            "Resumen anual de reservas con devolución incorrecta".center(anchoTotal)
-        )
-        salida.append("-" * anchoTotal)
+    Parámetros:
+        _nombre (str): Nombre de la operación en la traza.
+        _funcion (function): Acción a envolver.
 
-        encabezado = "MESES".ljust(15)
-        for m in meses:
-            encabezado += f"{m}.{str(anio)[-2:]}".center(12)
-        salida.append(encabezado)
+    Retorno:
+        function: Función con los mismos parámetros y retorno que _funcion.
+    """
+    def operacion(*_argumentos, **_opciones):
+        global operacionActual
+        if operacionActual is not None: # Operación llamada desde otra: se mide dentro de la primera
+            return _funcion(*_argumentos, **_opciones)
+
+        operacionActual = {
+            "esperaUsuario": 0.0,
+            "bytesLeidos": 0,
+            "bytesEscritos": 0,
+            "registrosLeidos": 0,
+            "registrosEscritos": 0,
+            "llamadas": {},
+        }
+        perfil = cProfile.Profile() if instrumentacion["perfiles"] else None
+        fecha = datetime.now()
+        inicio = time.perf_counter()
+        error = None
+        try:
+            if perfil is not None:
+                perfil.enable()
+            return _funcion(*_argumentos, **_opciones)
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            if perfil is not None:
+                perfil.disable()
+            total = time.perf_counter() - inicio
+            metricas = operacionActual
+            operacionActual = None
+
+            rutaPerfil = None
+            if perfil is not None:
+                rutaPerfil = os.path.join(instrumentacion["perfiles"], f"{fecha.strftime('%Y%m%d-%H%M%S-%f')}-{_nombre}.prof")
+                perfil.dump_stats(rutaPerfil)
+
+            entrada = {
+                "fecha": fecha.isoformat(timespec="milliseconds"),
+                "operacion": _nombre,
+                "segundos": round(total, 6),
+                "esperaUsuario": round(metricas["esperaUsuario"], 6),
+                "proceso": round(total - metricas["esperaUsuario"], 6),
+                "bytesLeidos": metricas["bytesLeidos"],
+                "bytesEscritos": metricas["bytesEscritos"],
+                "registrosLeidos": metricas["registrosLeidos"],
+                "registrosEscritos": metricas["registrosEscritos"],
+                "llamadas": {
+                    nombre: {"cantidad": cantidad, "segundos": round(segundos, 6)}
+                    for nombre, (cantidad, segundos) in metricas["llamadas"].items()
+                },
+                "perfil": rutaPerfil,
+                "error": error,
+            }
+            archivo = open(instrumentacion["traza"], mode="a", encoding="utf-8")
+            archivo.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+            archivo.close()
 
-        salida.append("-" * anchoTotal)
+    operacion.__name__ = _funcion.__name__
+    operacion.__doc__ = _funcion.__doc__
+    return operacion
 
-        fila = "Devol.Incorrect".ljust(15)
-        for val in incorrectasPorMes:
-            fila += f"{val}".center(12)
-        salida.append(fila)
+def envolverAuxiliar(_nombre, _funcion):
+    """
+    Envuelve una función auxiliar para acumular, dentro de la operación en curso, cuántas veces
+    se llamó y cuánto tardó en total.
 
-        salida.append("-" * anchoTotal)
+    Parámetros:
+        _nombre (str): Nombre de la función en la traza.
+        _funcion (function): Función a envolver.
 
-        # Imprime la tabla
-        print("\n".join(salida))
-        return None
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
-        return None
-    except Exception as e:
-        print(f"Error inesperado al imprimir resumen anual de devoluciones incorrectas: {e}")
+    Retorno:
+        function: Función con los mismos parámetros y retorno que _funcion.
+    """
+    def auxiliar(*_argumentos, **_opciones):
+        if operacionActual is None:
+            return _funcion(*_argumentos, **_opciones)
+        llamadas = operacionActual["llamadas"]
+        inicio = time.perf_counter()
+        try:
+            return _funcion(*_argumentos, **_opciones)
+        finally:
+            llamada = llamadas.setdefault(_nombre, [0, 0.0])
+            llamada[0] += 1
+            llamada[1] += time.perf_counter() - inicio
+
+    auxiliar.__name__ = _funcion.__name__
+    auxiliar.__doc__ = _funcion.__doc__
+    return auxiliar
+
+def activarInstrumentacion(_rutaTraza, _directorioPerfiles=None):
+    """
+    Activa la instrumentación: reemplaza en el módulo las acciones de OPERACIONES_INSTRUMENTADAS,
+    las funciones de FUNCIONES_INSTRUMENTADAS y los validadores por versiones que miden, y el
+    input() del módulo por uno que descuenta la espera al usuario. Sin activarla no hay ningún
+    costo extra.
+
+    Parámetros:
+        _rutaTraza (str): Archivo JSON Lines donde se agrega una línea por operación.
+        _directorioPerfiles (str|None): Si se indica, se guarda ahí un perfil de cProfile (.prof)
+        por operación.
+
+    Retorno:
+        None
+    """
+    global input
+    if instrumentacion["traza"] is not None: # Ya activa
         return None
+    instrumentacion["traza"] = _rutaTraza
+    instrumentacion["perfiles"] = _directorioPerfiles
+    if _directorioPerfiles:
+        os.makedirs(_directorioPerfiles, exist_ok=True)
+
+    funciones = globals()
+    for nombre in OPERACIONES_INSTRUMENTADAS:
+        funciones[nombre] = envolverOperacion(nombre, funciones[nombre])
+    for nombre in FUNCIONES_INSTRUMENTADAS:
+        funciones[nombre] = envolverAuxiliar(nombre, funciones[nombre])
+    for tipo in VALIDADORES:
+        VALIDADORES[tipo] = envolverAuxiliar("validacion", VALIDADORES[tipo])
+    input = esperarEntrada
+    return None
 
 # ----------------------------------------------------------------------------------------------
 # CUERPO PRINCIPAL
@@ -1511,7 +6256,7 @@ def main():
         elif opcionMenuPrincipal == "1":  # Opción 1 del menú principal
             while True:
                 while True:
-                    opciones = 4
+                    opciones = 5
                     print()
                     print("---------------------------")
                     print("MENÚ PRINCIPAL > GESTIÓN DE ALUMNOS")
@@ -1520,6 +6265,7 @@ def main():
                     print("[2] Modificar alumno")
                     print("[3] Eliminar alumno")
                     print("[4] Listar alumnos")
+                    print("[5] Buscar alumnos")
                     print("---------------------------")
                     print("[0] Volver al menú anterior")
                     print("---------------------------")
@@ -1551,13 +6297,16 @@ def main():
                 elif opcionSubmenu == "4":  # Opción 4 del submenú
                     listarAlumnos()
 
+                elif opcionSubmenu == "5":  # Opción 5 del submenú
+                    buscarAlumnos()
+
                 input("\nPresione ENTER para volver al menú.")  # Pausa entre opciones
                 print("\n\n")
 
         elif opcionMenuPrincipal == "2":  # Opción 2 del menú principal
             while True:
                 while True:
-                    opciones = 4
+                    opciones = 5
                     print()
                     print("---------------------------")
                     print("MENÚ PRINCIPAL > GESTIÓN DE LIBROS")
@@ -1566,6 +6315,7 @@ def main():
                     print("[2] Modificar libro")
                     print("[3] Eliminar libros")
                     print("[4] Listado de libros")
+                    print("[5] Buscar libros")
                     print("---------------------------")
                     print("[0] Volver al menú anterior")
                     print("---------------------------")
@@ -1596,19 +6346,25 @@ def main():
                 elif opcionSubmenu == "4":  # Opción 4 del submenú
                     listarLibros()
 
+                elif opcionSubmenu == "5":  # Opción 5 del submenú
+                    buscarLibros()
+
                 input("\nPresione ENTER para volver al menú.")  # Pausa entre opciones
                 print("\n\n")
 
         elif opcionMenuPrincipal == "3":  # Opción 3 del menú principal
             while True:
                 while True:
-                    opciones = 2
+                    opciones = 5
                     print()
                     print("---------------------------")
                     print("MENÚ PRINCIPAL > GESTIÓN DE PRÉSTAMOS")
                     print("---------------------------")
                     print("[1] Registro de préstamo")
                     print("[2] Finalización de préstamo")
+                    print("[3] Préstamos activos")
+                    print("[4] Historial de préstamos de un alumno")
+                    print("[5] Historial de préstamos de un libro")
                     print("---------------------------")
                     print("[0] Volver al menú anterior")
                     print("---------------------------")
@@ -1633,6 +6389,15 @@ def main():
                 elif opcionSubmenu == "2":  # Opción 2 del submenú
                     finalizarPrestamo()
 
+                elif opcionSubmenu == "3":  # Opción 3 del submenú
+                    listarPrestamosActivos()
+
+                elif opcionSubmenu == "4":  # Opción 4 del submenú
+                    imprimirHistorialAlumno()
+
+                elif opcionSubmenu == "5":  # Opción 5 del submenú
+                    imprimirHistorialLibro()
+
                 input("\nPresione ENTER para volver al menú.")  # Pausa entre opciones
                 print("\n\n")
 
@@ -1689,5 +6454,12 @@ def main():
             print("\n\n")
 
 
-# Punto de entrada al programa
-main()
+# Punto de entrada al programa: con argumentos ejecuta una operación en lote, sin argumentos abre el menú.
+# Al importarse como módulo no se ejecuta nada: los archivos se leen recién cuando una operación los necesita.
+if __name__ == "__main__":
+    if TRAZA_ARCHIVO:
+        activarInstrumentacion(TRAZA_ARCHIVO, PERFILES_DIRECTORIO)
+    if len(sys.argv) > 1:
+        sys.exit(ejecutarLineaDeComandos(sys.argv[1:]))
+    else:
+        main()
@@ -0,0 +1,487 @@
+"""
+-----------------------------------------------------------------------------------------------
+Título: DESARROLLO PYTHON POR EQUIPO - BENCHMARK DE ENTREGA 2
+Fecha: 17/10/2026
+Autor: Equipo 02
+
+Descripción: Genera datos sintéticos de alumnos, libros y préstamos con la misma forma que los
+archivos JSON de la aplicación y mide el tiempo (y opcionalmente la memoria) de cada operación
+del menú, alimentando las preguntas por consola de forma automática. Los resultados se pueden
+guardar y comparar contra una corrida anterior para detectar regresiones.
+
+Uso:
+    python benchmark.py --alumnos 10000 --libros 50000 --prestamos 5000000
+    python benchmark.py --prestamos 200000 --guardar base.json
+    python benchmark.py --prestamos 200000 --comparar base.json --memoria
+-----------------------------------------------------------------------------------------------
+"""
+
+# ----------------------------------------------------------------------------------------------
+# MÓDULOS
+# ----------------------------------------------------------------------------------------------
+from datetime import datetime, timedelta
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource # Memoria máxima del proceso (solo Linux/macOS)
+except ImportError:
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import Entrega2
+
+# ----------------------------------------------------------------------------------------------
+# CONSTANTES
+# ----------------------------------------------------------------------------------------------
+NOMBRES = ["Ana", "Carlos", "Luisa", "Pedro", "Sofía", "Martín", "Julieta", "Tomás", "Valentina", "Joaquín"]
+APELLIDOS = ["López", "Gómez", "Martínez", "Díaz", "Fernández", "Pérez", "Romero", "Sosa", "Ruiz", "Acosta"]
+CALLES = ["Corrientes", "Belgrano", "Rivadavia", "Santa Fe", "Callao", "Pueyrredón", "Cabildo"]
+GENEROS = ["Novela", "Cuentos", "Poesía", "Ensayo", "Historia", "Ciencia", "Drama"]
+EDITORIALES = ["Sudamericana", "Planeta", "Emecé", "Losada", "Anagrama", "Alfaguara"]
+PALABRAS_TITULO = ["El", "La", "Los", "Camino", "Sombra", "Río", "Ciudad", "Noche", "Jardín", "Viento", "Tiempo", "Mar"]
+PROPORCION_ACTIVOS = 0.05 # Proporción de préstamos sin finalizar
+PROPORCION_INCORRECTAS = 0.1 # Proporción de devoluciones incorrectas
+TOLERANCIA_REGRESION = 0.25 # Aumento de la mediana a partir del cual se marca una regresión
+
+# ----------------------------------------------------------------------------------------------
+# FUNCIONES
+# ----------------------------------------------------------------------------------------------
+def generarAlumnos(_cantidad, _azar):
+    """
+    Genera alumnos sintéticos con la forma de alumnos.json (IDs A100000, A100001, ...).
+
+    Parámetros:
+        _cantidad (int): Cantidad de alumnos.
+        _azar (random.Random): Generador de números al azar (con semilla, para repetir los datos).
+
+    Retorno:
+        dict: ID de alumno -> registro.
+    """
+    alumnos = {}
+    for numero in range(_cantidad):
+        nombre = _azar.choice(NOMBRES)
+        alumnos[f"A{100000 + numero}"] = {
+            "activo": _azar.random() > 0.05,
+            "nombre": nombre,
+            "apellido": _azar.choice(APELLIDOS),
+            "direccion": f"{_azar.choice(CALLES)} {_azar.randint(1, 9999)}",
+            "email": f"{nombre.lower()}{numero}@mail.com",
+            "telefono": {"celular": _azar.randint(1100000000, 1199999999), "fijo": _azar.choice([0, _azar.randint(40000000, 49999999)])},
+            "infracciones": 0,
+        }
+    return alumnos
+
+def generarLibros(_cantidad, _azar):
+    """
+    Genera libros sintéticos con la forma de libros.json (IDs L100000, L100001, ...).
+
+    Parámetros:
+        _cantidad (int): Cantidad de libros.
+        _azar (random.Random): Generador de números al azar.
+
+    Retorno:
+        dict: ID de libro -> registro.
+    """
+    libros = {}
+    for numero in range(_cantidad):
+        libros[f"L{100000 + numero}"] = {
+            "activo": _azar.random() > 0.05,
+            "titulo": " ".join(_azar.sample(PALABRAS_TITULO, 3)) + f" {numero}",
+            "autores": {
+                "autor1": f"{_azar.choice(NOMBRES)} {_azar.choice(APELLIDOS)}",
+                "autor2": "",
+                "autor3": "",
+            },
+            "genero": _azar.choice(GENEROS),
+            "editorial": _azar.choice(EDITORIALES),
+            "costoGarantia": _azar.randint(5, 60) * 100,
+        }
+    return libros
+
+def escribirPrestamos(_ruta, _cantidad, _alumnos, _libros, _azar, _anioDesde, _anioHasta):
+    """
+    Escribe un historial de préstamos sintético directamente en el archivo, de a un préstamo por
+    línea, para no tener millones de registros en memoria. Los préstamos quedan repartidos en el
+    tiempo entre _anioDesde y _anioHasta, con IDs únicos y crecientes.
+
+    Parámetros:
+        _ruta (str): Ruta de prestamos.json.
+        _cantidad (int): Cantidad de préstamos.
+        _alumnos (dict): Alumnos generados.
+        _libros (dict): Libros generados.
+        _azar (random.Random): Generador de números al azar.
+        _anioDesde (int): Primer año del historial.
+        _anioHasta (int): Último año del historial.
+
+    Retorno:
+        None
+    """
+    idsAlumnos = list(_alumnos)
+    idsLibros = list(_libros)
+    inicio = datetime(_anioDesde, 1, 1, 8, 0, 0)
+    paso = (datetime(_anioHasta, 12, 31, 20, 0, 0) - inicio) / max(_cantidad, 1)
+    primerActivo = _cantidad - int(_cantidad * PROPORCION_ACTIVOS) # Los más recientes quedan sin finalizar
+
+    archivo = open(_ruta, mode="w", encoding="utf-8")
+    archivo.write("{\n")
+    for numero in range(_cantidad):
+        instante = inicio + paso * numero
+        idPrestamo = instante.strftime("%Y.%m.%d %H:%M:%S.%f")
+        prestamo = {
+            "idPrestamo": idPrestamo,
+            "idAlumno": _azar.choice(idsAlumnos),
+            "idLibro": _azar.choice(idsLibros),
+            "cantidadDias": 0,
+            "fechaInicio": instante.strftime("%Y-%m-%d"),
+            "fechaFinalizacion": "",
+            "estadoDevolucionCorrecto": False,
+        }
+        if numero < primerActivo:
+            dias = _azar.randint(1, 30)
+            prestamo["cantidadDias"] = dias
+            prestamo["fechaFinalizacion"] = (instante + timedelta(days=dias)).strftime("%Y-%m-%d")
+            prestamo["estadoDevolucionCorrecto"] = _azar.random() > PROPORCION_INCORRECTAS
+        separador = ",\n" if numero < _cantidad - 1 else "\n"
+        archivo.write(f"    {json.dumps(idPrestamo)}: {json.dumps(prestamo, ensure_ascii=False)}{separador}")
+    archivo.write("}\n")
+    archivo.close()
+    return None
+
+def generarDatos(_directorio, _cantidadAlumnos, _cantidadLibros, _cantidadPrestamos, _semilla, _anioDesde, _anioHasta):
+    """
+    Genera los tres archivos de datos en un directorio.
+
+    Parámetros:
+        _directorio (str): Directorio donde se escriben alumnos.json, libros.json y prestamos.json.
+        _cantidadAlumnos (int): Cantidad de alumnos.
+        _cantidadLibros (int): Cantidad de libros.
+        _cantidadPrestamos (int): Cantidad de préstamos.
+        _semilla (int): Semilla del generador al azar.
+        _anioDesde (int): Primer año del historial de préstamos.
+        _anioHasta (int): Último año del historial de préstamos.
+
+    Retorno:
+        tuple: (alumnos, libros) generados, para elegir IDs válidos en las mediciones.
+    """
+    azar = random.Random(_semilla)
+    alumnos = generarAlumnos(_cantidadAlumnos, azar)
+    libros = generarLibros(_cantidadLibros, azar)
+
+    for nombre, diccionario in (("alumnos.json", alumnos), ("libros.json", libros)):
+        archivo = open(os.path.join(_directorio, nombre), mode="w", encoding="utf-8")
+        json.dump(diccionario, archivo, ensure_ascii=False, indent=4)
+        archivo.close()
+    escribirPrestamos(os.path.join(_directorio, "prestamos.json"), _cantidadPrestamos, alumnos, libros, azar, _anioDesde, _anioHasta)
+    return alumnos, libros
+
+def ejecutarConEntradas(_funcion, _entradas, *_argumentos):
+    """
+    Ejecuta una función interactiva respondiendo sus input() con las entradas dadas y descartando
+    lo que imprime.
+
+    Parámetros:
+        _funcion (function): Función a ejecutar.
+        _entradas (list): Respuestas, en el orden en que la función las pide.
+        _argumentos: Argumentos de la función.
+
+    Retorno:
+        str: Lo que la función imprimió.
+
+    Excepciones:
+        RuntimeError: Si la función pidió más o menos entradas que las dadas (la operación no se
+        midió completa).
+    """
+    pendientes = list(_entradas)
+    faltantes = []
+
+    def responder(_mensaje=""):
+        if not pendientes:
+            faltantes.append(_mensaje)
+            raise EOFError("sin más entradas")
+        return pendientes.pop(0)
+
+    salida = io.StringIO()
+    inputOriginal = builtins.input
+    builtins.input = responder
+    try:
+        with contextlib.redirect_stdout(salida):
+            _funcion(*_argumentos)
+    finally:
+        builtins.input = inputOriginal
+
+    if pendientes or faltantes:
+        raise RuntimeError(f"{_funcion.__name__} no consumió las entradas esperadas. Salida:\n{salida.getvalue()[-500:]}")
+    return salida.getvalue()
+
+def medir(_nombre, _operacion, _repeticiones, _memoria):
+    """
+    Mide una operación varias veces.
+
+    Parámetros:
+        _nombre (str): Nombre de la operación en el informe.
+        _operacion (function): Función sin parámetros que ejecuta una repetición.
+        _repeticiones (int): Cantidad de repeticiones.
+        _memoria (bool): Si es True mide también el pico de memoria asignada (más lento).
+
+    Retorno:
+        dict: {"operacion", "repeticiones", "minimoMs", "medianaMs", "maximoMs", "picoKb"}.
+    """
+    tiempos = []
+    pico = 0
+    for repeticion in range(_repeticiones):
+        if _memoria:
+            tracemalloc.start()
+        comienzo = time.perf_counter()
+        _operacion()
+        tiempos.append((time.perf_counter() - comienzo) * 1000)
+        if _memoria:
+            pico = max(pico, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    return {
+        "operacion": _nombre,
+        "repeticiones": _repeticiones,
+        "minimoMs": round(min(tiempos), 3),
+        "medianaMs": round(statistics.median(tiempos), 3),
+        "maximoMs": round(max(tiempos), 3),
+        "picoKb": round(pico / 1024, 1) if _memoria else None,
+    }
+
+def vaciarCaches():
+    """
+    Descarta todo lo que Entrega2 tiene en memoria, para medir una carga en frío.
+
+    Retorno:
+        None
+    """
+    Entrega2.cacheArchivos.clear()
+    Entrega2.particionesCerradas.clear()
+    Entrega2.columnasPrestamos = None
+    return None
+
+def armarOperaciones(_alumnos, _libros, _anio):
+    """
+    Arma la lista de operaciones a medir, cada una como función sin parámetros que responde las
+    preguntas de la operación real del menú.
+
+    Parámetros:
+        _alumnos (dict): Alumnos generados.
+        _libros (dict): Libros generados.
+        _anio (int): Año sobre el que se piden los informes.
+
+    Retorno:
+        list: Tuplas (nombre, función).
+    """
+    alumnosActivos = [id for id, alumno in _alumnos.items() if alumno["activo"]]
+    librosActivos = [id for id, libro in _libros.items() if libro["activo"]]
+    contador = {"alumno": 900000, "libro": 900000}
+
+    def cargaEnFrio():
+        vaciarCaches()
+        for direccion in (Entrega2.ALUMNOS_ARCHIVO, Entrega2.LIBROS_ARCHIVO, Entrega2.PRESTAMOS_ARCHIVO):
+            Entrega2.cargarArchivo(direccion)
+
+    def crearAlumno():
+        contador["alumno"] += 1
+        ejecutarConEntradas(
+            Entrega2.crearRegistro,
+            [f"A{contador['alumno']}", "Ana", "Pérez", "Corrientes 1234", "ana@mail.com", "1122334455", "0"],
+            Entrega2.ALUMNOS_ARCHIVO, "alumno", Entrega2.ALUMNO_ESQUEMA,
+        )
+
+    def crearLibro():
+        contador["libro"] += 1
+        ejecutarConEntradas(
+            Entrega2.crearRegistro,
+            [f"L{contador['libro']}", "Rayuela", "Julio Cortázar", "Novela", "Sudamericana", "2500"],
+            Entrega2.LIBROS_ARCHIVO, "libro", Entrega2.LIBRO_ESQUEMA,
+        )
+
+    def modificarAlumno():
+        ejecutarConEntradas(
+            Entrega2.modificarRegistro,
+            [alumnosActivos[0], "email", "nuevo@mail.com"],
+            Entrega2.ALUMNOS_ARCHIVO, "alumno", Entrega2.ALUMNO_ESQUEMA,
+        )
+
+    def listarLibros():
+        ejecutarConEntradas(
+            Entrega2.listarRegistros, [],
+            Entrega2.LIBROS_ARCHIVO, "libro", Entrega2.LIBRO_ESQUEMA_LISTADO, None, None, 0, None, False,
+        )
+
+    def listarPrimeraPagina():
+        # Con más de una página el listado pregunta antes de seguir: se responde que no
+        entradas = ["0"] if len(librosActivos) > Entrega2.TAMANIO_PAGINA_LISTADO else []
+        ejecutarConEntradas(Entrega2.listarRegistros, entradas, Entrega2.LIBROS_ARCHIVO, "libro", Entrega2.LIBRO_ESQUEMA_LISTADO)
+
+    def registrarPrestamo():
+        ejecutarConEntradas(Entrega2.registrarPrestamo, [alumnosActivos[-1], librosActivos[-1]])
+
+    def finalizarPrestamo():
+        idPrestamo = min(Entrega2.cargarPrestamosActivos()["prestamos"])
+        ejecutarConEntradas(Entrega2.finalizarPrestamo, [idPrestamo, "n"])
+
+    filasInforme = {libro["titulo"]: [numero % 7 for numero in range(12)] for libro in _libros.values()}
+
+    def formatearInforme():
+        Entrega2.formatearInformes(filasInforme, _anio, "Informe de prueba")
+
+    return [
+        ("carga en frío (3 archivos)", cargaEnFrio),
+        ("crearRegistro alumno", crearAlumno),
+        ("crearRegistro libro", crearLibro),
+        ("modificarRegistro alumno", modificarAlumno),
+        ("listarRegistros libros", listarLibros),
+        ("listarRegistros libros (primera página)", listarPrimeraPagina),
+        ("buscarAlumnos", lambda: ejecutarConEntradas(Entrega2.buscarAlumnos, [_alumnos[alumnosActivos[-1]]["apellido"][:4]])),
+        ("buscarLibros", lambda: ejecutarConEntradas(Entrega2.buscarLibros, [_libros[librosActivos[-1]]["titulo"]])),
+        ("registrarPrestamo", registrarPrestamo),
+        ("finalizarPrestamo", finalizarPrestamo),
+        ("imprimirHistorialAlumno", lambda: ejecutarConEntradas(Entrega2.imprimirHistorialAlumno, [alumnosActivos[0]])),
+        ("formatearInformes", formatearInforme),
+        ("imprimirResumenMensual", lambda: ejecutarConEntradas(Entrega2.imprimirResumenMensual, [str(_anio), "6"])),
+        ("imprimirResumenAnualPorLibroCantidad", lambda: ejecutarConEntradas(Entrega2.imprimirResumenAnualPorLibroCantidad, [str(_anio)])),
+        ("imprimirResumenAnualPorLibroPesos", lambda: ejecutarConEntradas(Entrega2.imprimirResumenAnualPorLibroPesos, [str(_anio)])),
+        ("imprimirResumenAnualDevolucionesIncorrectas", lambda: ejecutarConEntradas(Entrega2.imprimirResumenAnualDevolucionesIncorrectas, [str(_anio)])),
+    ]
+
+def imprimirResultados(_resultados, _previos=None, _tolerancia=TOLERANCIA_REGRESION):
+    """
+    Imprime la tabla de resultados y, si hay una corrida anterior, la variación de la mediana.
+
+    Parámetros:
+        _resultados (list): Resultados de medir().
+        _previos (list|None): Resultados de una corrida anterior.
+        _tolerancia (float): Aumento relativo de la mediana a partir del cual se marca una regresión.
+
+    Retorno:
+        int: Cantidad de regresiones encontradas.
+    """
+    previos = {resultado["operacion"]: resultado for resultado in (_previos or [])}
+    regresiones = 0
+
+    print(f"\n{'Operación':<46}{'mín ms':>12}{'mediana ms':>12}{'máx ms':>12}{'pico KB':>12}{'vs. previo':>14}")
+    print("-" * 108)
+    for resultado in _resultados:
+        pico = "-" if resultado["picoKb"] is None else f"{resultado['picoKb']:.1f}"
+        variacion = ""
+        previo = previos.get(resultado["operacion"])
+        if previo is not None and previo["medianaMs"] > 0:
+            cambio = resultado["medianaMs"] / previo["medianaMs"] - 1
+            variacion = f"{cambio:+.0%}"
+            if cambio > _tolerancia:
+                variacion += " REGR."
+                regresiones += 1
+        print(
+            f"{resultado['operacion']:<46}{resultado['minimoMs']:>12.3f}{resultado['medianaMs']:>12.3f}"
+            f"{resultado['maximoMs']:>12.3f}{pico:>12}{variacion:>14}"
+        )
+    print("-" * 108)
+    return regresiones
+
+def main(_argumentos=None):
+    """
+    Genera los datos, mide cada operación e informa los resultados.
+
+    Parámetros:
+        _argumentos (list|None): Argumentos de línea de comandos (por defecto sys.argv).
+
+    Retorno:
+        int: 0 si no hubo regresiones, 1 si alguna operación empeoró más que la tolerancia.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark de las operaciones de Entrega2 sobre datos sintéticos.")
+    parser.add_argument("--alumnos", type=int, default=10000)
+    parser.add_argument("--libros", type=int, default=50000)
+    parser.add_argument("--prestamos", type=int, default=200000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=2025)
+    parser.add_argument("--desde", type=int, default=2020, help="primer año del historial de préstamos")
+    parser.add_argument("--hasta", type=int, default=2025, help="último año del historial de préstamos")
+    parser.add_argument("--motor", choices=["json", "sqlite"], default=Entrega2.MOTOR_ALMACENAMIENTO)
+    parser.add_argument("--directorio", help="directorio de trabajo que se conserva (por defecto uno temporal que se borra al terminar)")
+    parser.add_argument("--memoria", action="store_true", help="mide también el pico de memoria de cada operación")
+    parser.add_argument("--guardar", help="guarda los resultados en un archivo JSON")
+    parser.add_argument("--comparar", help="compara contra resultados guardados con --guardar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_REGRESION)
+    argumentos = parser.parse_args(_argumentos)
+
+    # Las rutas de Entrega2 son relativas: se trabaja dentro del directorio de datos sintéticos
+    directorio = argumentos.directorio or tempfile.mkdtemp(prefix="biblioteca-benchmark-")
+    os.makedirs(directorio, exist_ok=True)
+    directorioOriginal = os.getcwd()
+    os.chdir(directorio)
+    try:
+        comienzo = time.perf_counter()
+        alumnos, libros = generarDatos(".", argumentos.alumnos, argumentos.libros, argumentos.prestamos, argumentos.semilla, argumentos.desde, argumentos.hasta)
+        print(f"Datos generados en {directorio} en {time.perf_counter() - comienzo:.1f} s: "
+              f"{argumentos.alumnos} alumnos, {argumentos.libros} libros, {argumentos.prestamos} préstamos.")
+
+        Entrega2.MOTOR_ALMACENAMIENTO = argumentos.motor
+        if argumentos.motor == "sqlite":
+            comienzo = time.perf_counter()
+            Entrega2.conectarBaseDatos() # Migra los JSON a la base en la primera conexión
+            print(f"Migración a sqlite: {time.perf_counter() - comienzo:.1f} s.")
+
+        # Primer uso: arma los índices derivados (préstamos activos, agregados mensuales, historial y particiones) y, con JSON, las fotos binarias
+        comienzo = time.perf_counter()
+        Entrega2.cargarPrestamosActivos()
+        Entrega2.cargarAgregados()
+        if argumentos.motor == "json":
+            for direccion in Entrega2.INDICES_DE_PRESTAMOS:
+                Entrega2.cargarIndicePrestamos(direccion)
+            Entrega2.reconstruirParticiones()
+            Entrega2.ejecutarEnLote(list(Entrega2.SNAPSHOT_COLUMNAS), Entrega2.escribirFotosColecciones)
+        print(f"Construcción de índices: {time.perf_counter() - comienzo:.1f} s.")
+
+        resultados = [
+            medir(nombre, operacion, argumentos.repeticiones, argumentos.memoria)
+            for nombre, operacion in armarOperaciones(alumnos, libros, argumentos.hasta)
+        ]
+    finally:
+        os.chdir(directorioOriginal)
+        if not argumentos.directorio: # Los datos sintéticos pueden ocupar varios GB: el temporal no se conserva
+            if Entrega2.conexionBaseDatos is not None:
+                Entrega2.conexionBaseDatos.close()
+                Entrega2.conexionBaseDatos = None
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    previos = None
+    if argumentos.comparar:
+        archivo = open(argumentos.comparar, mode="r", encoding="utf-8")
+        previos = json.load(archivo)["resultados"]
+        archivo.close()
+    regresiones = imprimirResultados(resultados, previos, argumentos.tolerancia)
+
+    if resource is not None:
+        maximoKb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin": # En macOS se informa en bytes
+            maximoKb //= 1024
+        print(f"Memoria máxima del proceso: {maximoKb / 1024:.1f} MB")
+
+    if argumentos.guardar:
+        archivo = open(argumentos.guardar, mode="w", encoding="utf-8")
+        json.dump({"parametros": vars(argumentos), "resultados": resultados}, archivo, ensure_ascii=False, indent=4)
+        archivo.close()
+        print(f"Resultados guardados en {argumentos.guardar}")
+
+    if regresiones:
+        print(f"Se encontraron {regresiones} regresiones (tolerancia {argumentos.tolerancia:.0%}).")
+        return 1
+    return 0
+
+# Punto de entrada al programa
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Configuración común de las pruebas de Entrega2: cada prueba corre en un directorio temporal con
+una copia de los archivos JSON de ejemplo y con el estado del módulo vacío, como un proceso nuevo.
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+import Entrega2
+
+ARCHIVOS_DE_EJEMPLO = ["alumnos.json", "libros.json", "prestamos.json"]
+
+def reiniciarEstado():
+    """
+    Deja el estado del módulo como al arrancar un proceso: sin cachés, sin lote ni conexión.
+
+    Retorno:
+        None
+    """
+    if Entrega2.conexionBaseDatos is not None:
+        Entrega2.conexionBaseDatos.close()
+    Entrega2.conexionBaseDatos = None
+    Entrega2.cacheArchivos.clear()
+    Entrega2.particionesCerradas.clear()
+    Entrega2.indicesTexto.clear()
+    Entrega2.vistasDerivadas.clear()
+    Entrega2.columnasPrestamos = None
+    Entrega2.origenVerificado = None
+    Entrega2.ultimoInstantePrestamo = None
+    return None
+
+@pytest.fixture(autouse=True)
+def biblioteca(tmp_path, monkeypatch):
+    """
+    Directorio de trabajo temporal con los datos de ejemplo y el motor de archivos JSON.
+    """
+    for nombre in ARCHIVOS_DE_EJEMPLO:
+        shutil.copy(os.path.join(RAIZ, nombre), tmp_path / nombre)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Entrega2, "MOTOR_ALMACENAMIENTO", "json")
+    reiniciarEstado()
+    yield tmp_path
+    if Entrega2.loteActual is not None:
+        Entrega2.descartarLote()
+    reiniciarEstado()
+
+@pytest.fixture
+def nuevoProceso():
+    """
+    Función que simula que otra ejecución del programa lee los archivos desde cero.
+    """
+    return reiniciarEstado
+
+@pytest.fixture
+def relojFijo(monkeypatch):
+    """
+    Función que fija el instante que devuelve datetime.now() dentro de Entrega2 (None vuelve al
+    reloj real).
+    """
+    original = Entrega2.datetime
+    def fijar(_instante):
+        if _instante is None:
+            monkeypatch.setattr(Entrega2, "datetime", original)
+            return
+        class RelojFijo(original):
+            @classmethod
+            def now(cls, tz=None):
+                return _instante
+        monkeypatch.setattr(Entrega2, "datetime", RelojFijo)
+    return fijar
@@ -0,0 +1,86 @@
+"""
+Pruebas de las búsquedas: libros sin acentos ni mayúsculas al día con cada alta, cambio e
+inactivación; alumnos con prefijos y errores de tipeo, con un índice que se arma una sola vez, se
+actualiza con cada cambio y se rearma si otra terminal cambió la colección.
+"""
+
+import json
+
+import pytest
+
+import Entrega2 as E
+
+def idsEncontrados(_ruta, _texto):
+    return set(E.buscarRegistros(_ruta, _texto)[1])
+
+@pytest.fixture
+def armados(monkeypatch):
+    """
+    Lista con un elemento por cada vez que se arma desde cero el índice de los alumnos.
+    """
+    lista = []
+    armar = E.IndiceTolerante.desdeRegistros
+    def contarYArmar(cls, _campos, _diccionario):
+        lista.append(len(_diccionario))
+        return armar(_campos, _diccionario)
+    monkeypatch.setattr(E.IndiceTolerante, "desdeRegistros", classmethod(contarYArmar))
+    return lista
+
+def testLaBusquedaDeLibrosCubreTodosLosCampos():
+    assert idsEncontrados(E.LIBROS_ARCHIVO, "NOVELA sudamericana") == {"L1009"} # Género y editorial
+    assert idsEncontrados(E.LIBROS_ARCHIVO, "cortazar") == {"L1009"} # Autor sin acento
+    assert idsEncontrados(E.LIBROS_ARCHIVO, "cronica muerte") == {"L1005"} # Palabras del título
+    assert idsEncontrados(E.LIBROS_ARCHIVO, "novela quijote") == set() # Deben estar todas las palabras
+
+def testLaBusquedaSigueLasAltasCambiosEInactivaciones():
+    assert idsEncontrados(E.LIBROS_ARCHIVO, "garcia marquez") == {"L1001", "L1005"} # L1010 está inactivo
+
+    assert E.crearRegistroConDatos(E.LIBROS_ARCHIVO, "libro", E.LIBRO_ESQUEMA, "L2001", {
+        "título": "El otoño del patriarca",
+        "autores": "Gabriel García Márquez",
+        "género": "Novela",
+        "editorial": "Sudamericana",
+        "costo": "2900",
+    })
+    assert "L2001" in idsEncontrados(E.LIBROS_ARCHIVO, "otono patriarca")
+
+    assert E.modificarRegistroConDatos(E.LIBROS_ARCHIVO, "libro", E.LIBRO_ESQUEMA, "L2001", {"título": "Memoria de mis putas tristes"})
+    assert "L2001" not in idsEncontrados(E.LIBROS_ARCHIVO, "patriarca")
+    assert "L2001" in idsEncontrados(E.LIBROS_ARCHIVO, "memoria tristes")
+
+    assert E.inactivarRegistroPorId(E.LIBROS_ARCHIVO, "libro", "L2001")
+    assert "L2001" not in idsEncontrados(E.LIBROS_ARCHIVO, "memoria tristes")
+
+def testLaBusquedaDeAlumnosToleraPrefijosYErrores():
+    assert idsEncontrados(E.ALUMNOS_ARCHIVO, "lop") == {"A1001"}
+    assert idsEncontrados(E.ALUMNOS_ARCHIVO, "lopes") == {"A1001"}
+    assert idsEncontrados(E.ALUMNOS_ARCHIVO, "luisa martines") == {"A1003"}
+    assert idsEncontrados(E.ALUMNOS_ARCHIVO, "gomez") == set() # A1002 está inactivo
+
+@pytest.mark.parametrize("motor", ["json", "sqlite"])
+def testElIndiceSeArmaUnaSolaVez(monkeypatch, armados, motor):
+    monkeypatch.setattr(E, "MOTOR_ALMACENAMIENTO", motor)
+    assert idsEncontrados(E.ALUMNOS_ARCHIVO, "ana") == {"A1001"}
+    assert idsEncontrados(E.ALUMNOS_ARCHIVO, "ana") == {"A1001"}
+
+    # Los cambios se aplican sobre el índice ya armado
+    assert E.modificarRegistroConDatos(E.ALUMNOS_ARCHIVO, "alumno", E.ALUMNO_ESQUEMA, "A1001", {"apellido": "Benítez"})
+    assert idsEncontrados(E.ALUMNOS_ARCHIVO, "benitez") == {"A1001"}
+    assert idsEncontrados(E.ALUMNOS_ARCHIVO, "lopez") == set()
+    assert len(armados) == 1
+
+def testLaBusquedaVeLosCambiosDeOtraTerminal(armados):
+    assert "A1001" in idsEncontrados(E.ALUMNOS_ARCHIVO, "lopez")
+
+    # Otra terminal reescribe alumnos.json mientras el índice ya está armado
+    archivo = open(E.ALUMNOS_ARCHIVO, mode="r", encoding="utf-8")
+    alumnos = json.load(archivo)
+    archivo.close()
+    alumnos["A1001"]["apellido"] = "Benítez"
+    archivo = open(E.ALUMNOS_ARCHIVO, mode="w", encoding="utf-8")
+    json.dump(alumnos, archivo, ensure_ascii=False, indent=4)
+    archivo.close()
+
+    assert "A1001" not in idsEncontrados(E.ALUMNOS_ARCHIVO, "lopez")
+    assert "A1001" in idsEncontrados(E.ALUMNOS_ARCHIVO, "benitez")
+    assert len(armados) == 2
@@ -0,0 +1,43 @@
+"""
+Pruebas del índice de préstamos activos y del resto de los archivos derivados del historial: se
+mantienen con cada alta y finalización, y se rearman si quedaron atrás del historial.
+"""
+
+import Entrega2 as E
+
+def testElIndiceSigueLasAltasYFinalizaciones(nuevoProceso, capsys):
+    primero = E.registrarPrestamoConDatos("A1001", "L1001")
+    segundo = E.registrarPrestamoConDatos("A1001", "L1002")
+    E.finalizarPrestamoConDatos(primero, True)
+
+    nuevoProceso()
+    activos = E.cargarPrestamosActivos()
+    assert primero not in activos["prestamos"] and segundo in activos["prestamos"]
+    assert activos["porAlumno"]["A1001"] == [segundo]
+    assert activos["porLibro"].get("L1001", []) == []
+
+    # Un préstamo ya finalizado no se vuelve a finalizar
+    assert E.finalizarPrestamoConDatos(primero, False) is None
+    assert "ya fue finalizado" in capsys.readouterr().out
+    assert E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"]["infracciones"] == 0
+
+def testLosDerivadosSeRearmanSiElHistorialQuedoAdelante(nuevoProceso):
+    E.cargarPrestamosActivos() # Arma los derivados y anota con qué historial están al día
+
+    # Corte después de escribir el historial y antes de los derivados
+    prestamo = E.Prestamo(
+        idPrestamo="2026.01.02 10:00:00.000000",
+        idAlumno="A1004",
+        idLibro="L1003",
+        cantidadDias=0,
+        fechaInicio="2026-01-02",
+        fechaFinalizacion="",
+        estadoDevolucionCorrecto=False,
+    )
+    E.agregarAlDiario(E.PRESTAMOS_ARCHIVO, [(prestamo.idPrestamo, prestamo)])
+
+    nuevoProceso()
+    assert prestamo.idPrestamo in E.cargarPrestamosActivos()["prestamos"]
+    assert prestamo.idPrestamo in E.cargarIndicePrestamos(E.PRESTAMOS_POR_ALUMNO_ARCHIVO)["A1004"]
+    assert prestamo.idPrestamo in E.cargarParticion(2026, 1)
+    assert E.cargarAgregados()[E.claveDePeriodo(2026, 1)]["L1003"] == [1, 0]
@@ -0,0 +1,53 @@
+"""
+Pruebas del diario de préstamos: lo escrito se vuelve a aplicar al leer aunque el proceso se haya
+cortado y la compactación no pierde nada.
+"""
+
+import json
+
+import Entrega2 as E
+
+def leerJson(_ruta):
+    archivo = open(_ruta, mode="r", encoding="utf-8")
+    try:
+        return json.load(archivo)
+    finally:
+        archivo.close()
+
+def testUnPrestamoDelDiarioSeLeeEnOtroProceso(nuevoProceso):
+    idPrestamo = E.registrarPrestamoConDatos("A1001", "L1001")
+
+    # El alta solo se agrega al diario: el archivo base no se reescribe
+    assert idPrestamo not in leerJson(E.PRESTAMOS_ARCHIVO)
+
+    nuevoProceso()
+    prestamos = E.cargarArchivo(E.PRESTAMOS_ARCHIVO)
+    assert prestamos[idPrestamo]["idAlumno"] == "A1001"
+    assert prestamos[idPrestamo]["fechaFinalizacion"] == ""
+
+def testUnaEntradaCortadaSeDescartaSinPerderLasSiguientes(nuevoProceso, capsys):
+    primero = E.registrarPrestamoConDatos("A1001", "L1001")
+
+    # Corte en el medio de una escritura: queda una línea a medias al final del diario
+    diario = open(E.PRESTAMOS_DIARIO, mode="a", encoding="utf-8")
+    diario.write('{"clave": "2026.01.01 00:00:00.000000", "regis')
+    diario.close()
+
+    nuevoProceso()
+    segundo = E.registrarPrestamoConDatos("A1003", "L1002")
+
+    nuevoProceso()
+    prestamos = E.cargarArchivo(E.PRESTAMOS_ARCHIVO)
+    assert primero in prestamos
+    assert segundo in prestamos
+    assert "2026.01.01 00:00:00.000000" not in prestamos
+    assert "entrada incompleta" in capsys.readouterr().out
+
+def testLaCompactacionConservaElHistorial(nuevoProceso, monkeypatch):
+    monkeypatch.setattr(E, "MAX_ENTRADAS_DIARIO", 2)
+    ids = [E.registrarPrestamoConDatos("A1001", idLibro) for idLibro in ("L1001", "L1002", "L1003")]
+
+    nuevoProceso()
+    prestamos = E.cargarArchivo(E.PRESTAMOS_ARCHIVO)
+    assert all(idPrestamo in prestamos for idPrestamo in ids)
+    assert len(prestamos) == 13
@@ -0,0 +1,72 @@
+"""
+Pruebas de los resúmenes de Entrega1 sobre el historial por columnas: dan lo mismo que contar
+préstamo por préstamo y las columnas se arman una sola vez y siguen a los préstamos nuevos.
+"""
+
+import random
+
+import Entrega1
+
+LIBROS = {
+    "L1001": {"titulo": "Cien años de soledad", "costoGarantia": 2500},
+    "L1002": {"titulo": "Rayuela", "costoGarantia": 1800},
+    "L1003": {"titulo": "Ficciones", "costoGarantia": 2000},
+}
+
+def armarPrestamos(_cantidad):
+    azar = random.Random(7)
+    prestamos = {}
+    for numero in range(_cantidad):
+        prestamos[f"P{numero}"] = {
+            "idLibro": azar.choice(["L1001", "L1002", "L1003", "L1099"]), # L1099 no está en los libros
+            "fechaInicio": f"{azar.choice([2024, 2025])}-{azar.randint(1, 12):02d}-{azar.randint(1, 28):02d}",
+            "estadoDevolucionCorrecto": azar.random() < 0.7,
+        }
+    return prestamos
+
+def contarUnoPorUno(_prestamos, _anio):
+    cantidades = {}
+    for prestamo in _prestamos.values():
+        if prestamo["fechaInicio"].startswith(str(_anio)):
+            meses = cantidades.setdefault(prestamo["idLibro"], [0] * 12)
+            meses[int(prestamo["fechaInicio"][5:7]) - 1] += 1
+    return cantidades
+
+def testLosResumenesCoincidenConElConteoPorPrestamo(monkeypatch):
+    monkeypatch.setattr(Entrega1, "columnasCache", None)
+    prestamos = armarPrestamos(500)
+    for anio in (2024, 2025, 2030):
+        esperado = contarUnoPorUno(prestamos, anio)
+        cantidades = Entrega1.resumenAnualPorLibroCantidad(prestamos, anio, LIBROS)
+        assert cantidades == {**{idLibro: [0] * 12 for idLibro in LIBROS}, **esperado}
+
+        pesos = Entrega1.resumenAnualPorLibroPesos(prestamos, LIBROS, anio)
+        assert pesos == {
+            LIBROS.get(idLibro, {}).get("titulo", f"Libro {idLibro}"): [valor * LIBROS.get(idLibro, {}).get("costoGarantia", 0) for valor in meses]
+            for idLibro, meses in esperado.items()
+        }
+
+        for mes in range(1, 13):
+            delMes = [p for p in prestamos.values() if p["fechaInicio"].startswith(f"{anio}-{mes:02d}")]
+            correctos = sum(1 for p in delMes if p["estadoDevolucionCorrecto"])
+            assert Entrega1.resumenMensual(prestamos, anio, mes) == (len(delMes), correctos, len(delMes) - correctos)
+
+def testLasColumnasSeArmanUnaSolaVez(monkeypatch):
+    monkeypatch.setattr(Entrega1, "columnasCache", None)
+    prestamos = armarPrestamos(50)
+    armados = []
+    cargar = Entrega1.cargarFilaEnColumnas
+    def contarYCargar(_columnas, _idPrestamo, _prestamo):
+        armados.append(_idPrestamo)
+        cargar(_columnas, _idPrestamo, _prestamo)
+    monkeypatch.setattr(Entrega1, "cargarFilaEnColumnas", contarYCargar)
+
+    antes = Entrega1.resumenMensual(prestamos, 2025, 3)
+    Entrega1.resumenAnualPorLibroCantidad(prestamos, 2025, LIBROS)
+    assert len(armados) == 50
+
+    # Un préstamo nuevo se agrega a las columnas ya armadas
+    prestamos["P50"] = {"idLibro": "L1002", "fechaInicio": "2025-03-10", "estadoDevolucionCorrecto": False}
+    Entrega1.actualizarColumnasPrestamos(prestamos, "P50")
+    assert Entrega1.resumenMensual(prestamos, 2025, 3) == (antes[0] + 1, antes[1], antes[2] + 1)
+    assert len(armados) == 51
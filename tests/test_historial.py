@@ -0,0 +1,32 @@
+"""
+Pruebas del historial de préstamos por alumno y por libro: los índices se mantienen con cada alta
+y los préstamos se leen de las particiones de sus meses, sin cargar el historial completo.
+"""
+
+import Entrega2 as E
+
+def testElHistorialSeLeeDeLasParticiones(nuevoProceso):
+    idPrestamo = E.registrarPrestamoConDatos("A1001", "L1001")
+
+    nuevoProceso()
+    historial = E.consultarHistorialPrestamos(E.PRESTAMOS_POR_ALUMNO_ARCHIVO, "A1001")
+    assert list(historial) == ["2025.05.01 09:15:32", idPrestamo]
+    assert E.PRESTAMOS_ARCHIVO not in E.cacheArchivos
+
+def testLosIndicesSiguenLasAltasSinRearmarse(nuevoProceso, monkeypatch):
+    E.cargarIndicePrestamos(E.PRESTAMOS_POR_LIBRO_ARCHIVO) # El primer uso arma los derivados
+    rearmados = []
+    reconstruir = E.reconstruirIndicePrestamos
+    monkeypatch.setattr(E, "reconstruirIndicePrestamos", lambda _direccion: rearmados.append(_direccion) or reconstruir(_direccion))
+
+    antes = list(E.consultarHistorialPrestamos(E.PRESTAMOS_POR_LIBRO_ARCHIVO, "L1002"))
+    primero = E.registrarPrestamoConDatos("A1001", "L1002")
+    E.finalizarPrestamoConDatos(primero, False)
+    segundo = E.registrarPrestamoConDatos("A1003", "L1002")
+
+    nuevoProceso()
+    historial = E.consultarHistorialPrestamos(E.PRESTAMOS_POR_LIBRO_ARCHIVO, "L1002")
+    assert list(historial) == antes + [primero, segundo]
+    assert historial[primero]["estadoDevolucionCorrecto"] is False
+    assert "L1002" in E.generarHistorialPrestamos(E.PRESTAMOS_POR_LIBRO_ARCHIVO, "L1002")
+    assert rearmados == []
@@ -0,0 +1,40 @@
+"""
+Pruebas de los IDs de préstamo: no se repiten aunque el reloj se repita o vuelva atrás, y se
+ordenan igual que el momento del alta, también junto a los IDs anteriores sin microsegundos.
+"""
+
+from datetime import datetime
+
+import Entrega2 as E
+
+def testLosIdsNoSeRepitenAunqueElRelojVuelvaAtras(nuevoProceso, relojFijo):
+    relojFijo(datetime(2026, 3, 10, 9, 0, 0))
+    ids = []
+
+    # Otra ejecución con el mismo reloj: el préstamo anterior ya está finalizado
+    for idLibro in ("L1001", "L1002"):
+        nuevoProceso()
+        ids.append(E.registrarPrestamoConDatos("A1001", idLibro))
+        E.finalizarPrestamoConDatos(ids[-1], True)
+
+    # Dentro de un mismo lote, sin que el proceso recuerde el último ID
+    def dosAltas():
+        altas = []
+        for idLibro in ("L1003", "L1004"):
+            E.ultimoInstantePrestamo = None
+            altas.append(E.aplicarAltaPrestamo("A1003", idLibro))
+        return altas
+    ids += E.ejecutarEnLote(E.ARCHIVOS_DE_PRESTAMO, dosAltas)
+
+    assert len(set(ids)) == 4
+    assert all(idPrestamo.startswith("2026.03.10 09:00:00.") for idPrestamo in ids)
+    nuevoProceso()
+    assert len(E.cargarArchivo(E.PRESTAMOS_ARCHIVO)) == 14
+
+def testLosIdsSeOrdenanComoLasAltas(relojFijo):
+    ids = []
+    for instante in (datetime(2025, 5, 1, 9, 15, 32), datetime(2025, 5, 1, 9, 15, 32), datetime(2025, 5, 1, 9, 15, 33)):
+        relojFijo(instante)
+        ids.append(E.registrarPrestamoConDatos("A1001", "L1001"))
+    assert ids[:2] == ["2025.05.01 09:15:32.000000", "2025.05.01 09:15:32.000001"]
+    assert sorted(["2025.05.01 09:15:32"] + ids) == ["2025.05.01 09:15:32"] + ids
@@ -0,0 +1,83 @@
+"""
+Pruebas de la importación de alumnos y libros: las filas válidas se guardan juntas en una sola
+escritura, las rechazadas van con su motivo al informe de errores y una importación que falla no
+guarda nada.
+"""
+
+import json
+
+import pytest
+
+import Entrega2 as E
+
+def escribirTexto(_ruta, _lineas):
+    archivo = open(_ruta, mode="w", encoding="utf-8")
+    archivo.write("\n".join(_lineas) + "\n")
+    archivo.close()
+
+def leerErrores(_ruta):
+    archivo = open(_ruta, mode="r", encoding="utf-8")
+    try:
+        return [json.loads(linea) for linea in archivo]
+    finally:
+        archivo.close()
+
+def testUnCsvGuardaLasFilasValidasEInformaLasDemas(nuevoProceso, monkeypatch):
+    escribirTexto("alumnos.csv", [
+        "ID,Nombre,Apellido,Dirección,Email,Celular,Fijo",
+        "A2001,Julia,Paz,Calle 1,julia@mail.com,1122334455,47891234",
+        "A2002,Tomás,Ríos,Calle 2,no-es-un-email,1122334455,47891234",
+        "A1001,Ana,López,Calle 3,ana2@mail.com,1122334455,47891234", # ID existente
+        "A2003,Sol,Vega,Calle 4,sol@mail.com,1199887766,0",
+        "A2003,Sol,Vega,Calle 4,sol@mail.com,1199887766,0", # Repetido en el mismo archivo
+    ])
+    escrituras = []
+    escribir = E.escribirPendientes
+    monkeypatch.setattr(E, "escribirPendientes", lambda _lote: escrituras.append(1) or escribir(_lote))
+
+    assert E.importarRegistros("alumnos.csv", E.ALUMNOS_ARCHIVO, "alumno", E.ALUMNO_ESQUEMA) == (2, 3)
+    assert len(escrituras) == 1
+    assert [error["linea"] for error in leerErrores("alumnos.errores.jsonl")] == [3, 4, 6]
+
+    nuevoProceso()
+    alumnos = E.cargarArchivo(E.ALUMNOS_ARCHIVO)
+    assert alumnos["A2001"].apellido == "Paz" and alumnos["A2003"].activo
+    assert "A2002" not in alumnos and alumnos["A1001"].email == "ana@mail.com"
+
+def testUnJsonlConLineasInvalidas(nuevoProceso):
+    escribirTexto("libros.jsonl", [
+        json.dumps({"id": "L2001", "título": "Ficciones", "autores": "Jorge Luis Borges", "género": "Cuentos", "editorial": "Sur", "costo": "2100"}),
+        "{no es json",
+        "[1, 2, 3]",
+        json.dumps({"id": "L2002", "título": "Rayuela", "autores": "Julio Cortázar", "género": "Novela", "editorial": "Sudamericana", "costo": "barato"}),
+    ])
+    assert E.importarRegistros("libros.jsonl", E.LIBROS_ARCHIVO, "libro", E.LIBRO_ESQUEMA, "rechazados.jsonl") == (1, 3)
+    errores = leerErrores("rechazados.jsonl")
+    assert [error["linea"] for error in errores] == [2, 3, 4]
+    assert errores[0]["motivo"] == "la línea no es un registro válido"
+
+    nuevoProceso()
+    libro = E.cargarArchivo(E.LIBROS_ARCHIVO)["L2001"]
+    assert (libro.titulo, libro.costoGarantia) == ("Ficciones", 2100)
+
+def testUnaImportacionQueFallaNoConfirmaElLoteDeAfuera(nuevoProceso, monkeypatch):
+    entrada = open("alumnos.csv", mode="w", encoding="utf-8")
+    entrada.write("id,nombre,apellido,dirección,email,celular,fijo\n")
+    entrada.write("A2001,Ana,Paz,Calle 123,ana@mail.com,1122334455,44556677\n")
+    entrada.close()
+
+    leerFilas = E.leerFilasImportacion
+    def leerYCortar(_ruta):
+        yield from leerFilas(_ruta)
+        raise OSError("lectura cortada")
+    monkeypatch.setattr(E, "leerFilasImportacion", leerYCortar)
+
+    E.iniciarLote([E.ALUMNOS_ARCHIVO])
+    with pytest.raises(OSError):
+        E.importarRegistros("alumnos.csv", E.ALUMNOS_ARCHIVO, "alumno", E.ALUMNO_ESQUEMA)
+    assert E.loteActual is not None
+    assert "A2001" not in E.cargarArchivo(E.ALUMNOS_ARCHIVO)
+    E.descartarLote()
+
+    nuevoProceso()
+    assert "A2001" not in E.cargarArchivo(E.ALUMNOS_ARCHIVO)
@@ -0,0 +1,59 @@
+"""
+Pruebas de los agregados mensuales por libro: los informes leídos de los agregados mantenidos con
+cada alta y finalización dan lo mismo que recorriendo los préstamos o rearmando los agregados.
+"""
+
+from datetime import datetime
+
+import pytest
+
+import Entrega2 as E
+
+@pytest.mark.parametrize("generar", [
+    E.generarResumenAnualPorLibroCantidad,
+    E.generarResumenAnualPorLibroPesos,
+    E.generarResumenAnualDevolucionesIncorrectas,
+])
+def testLosInformesCoincidenConYSinAgregados(nuevoProceso, generar):
+    anio = datetime.now().year
+    idPrestamo = E.registrarPrestamoConDatos("A1001", "L1001")
+    E.registrarPrestamoConDatos("A1003", "L1006") # Mismo título que L1001 más abajo
+    E.finalizarPrestamoConDatos(idPrestamo, False)
+
+    # El informe en pesos usa el costo actual del libro, también para los préstamos ya registrados
+    assert E.modificarRegistroConDatos(E.LIBROS_ARCHIVO, "libro", E.LIBRO_ESQUEMA, "L1001", {"costo": "9999"})
+    assert E.modificarRegistroConDatos(E.LIBROS_ARCHIVO, "libro", E.LIBRO_ESQUEMA, "L1006", {"título": "Cien años de soledad"})
+
+    for anioInforme in (2025, anio):
+        nuevoProceso()
+        conAgregados = generar(anioInforme)
+        recorriendo = generar(anioInforme, E.recorrerPrestamosDelPeriodo(anioInforme))
+        assert conAgregados == recorriendo
+
+        # Los agregados rearmados desde el historial dan el mismo informe
+        E.ejecutarEnLote(E.ARCHIVOS_DE_PRESTAMO, E.actualizarDerivados, True)
+        nuevoProceso()
+        assert generar(anioInforme) == conAgregados
+
+def testElInformeMensualCoincideConYSinAgregados(nuevoProceso):
+    E.registrarPrestamoConDatos("A1001", "L1001")
+    nuevoProceso()
+    assert E.generarResumenMensual(2025, 5) == E.generarResumenMensual(2025, 5, E.recorrerPrestamosDelPeriodo(2025, 5))
+
+def testLosAgregadosSeActualizanSinRearmarse(nuevoProceso, monkeypatch):
+    E.cargarAgregados() # El primer uso los arma desde el historial
+    rearmados = []
+    reconstruir = E.reconstruirAgregados
+    def contarYReconstruir():
+        rearmados.append(True)
+        return reconstruir()
+    monkeypatch.setattr(E, "reconstruirAgregados", contarYReconstruir)
+
+    clave = E.claveDePeriodo(datetime.now().year, datetime.now().month)
+    antes = E.cargarAgregados().get(clave, {}).get("L1001", [0, 0])
+    idPrestamo = E.registrarPrestamoConDatos("A1001", "L1001")
+    E.finalizarPrestamoConDatos(idPrestamo, False)
+
+    nuevoProceso()
+    assert E.cargarAgregados()[clave]["L1001"] == [antes[0] + 1, antes[1] + 1]
+    assert rearmados == []
@@ -0,0 +1,78 @@
+"""
+Pruebas de la lectura por partes de prestamos.json: el resultado no depende de dónde corta cada
+bloque (claves, textos y números partidos al medio) y los informes recorridos dan lo mismo que
+leyendo el historial completo.
+"""
+
+import json
+
+import pytest
+
+import Entrega2 as E
+
+CONTENIDO = {
+    "2025.05.01 09:15:32": {"idAlumno": "A1001", "cantidadDias": 12345, "fechaFinalizacion": ""},
+    "clave, con: separadores": {"texto": "comillas \" y \\ barras, llaves {} y corchetes []"},
+    "ñandú": {"unicode": "árbol — café", "escape": "ñ"},
+    "numeros": [0, -7, 3.25, -1.5e-3, 12e10, 98765432109876543210],
+    "literales": [True, False, None],
+    "vacios": [{}, [], ""],
+}
+
+def escribirJson(_ruta, _contenido, _indent):
+    archivo = open(_ruta, mode="w", encoding="utf-8")
+    json.dump(_contenido, archivo, ensure_ascii=False, indent=_indent)
+    archivo.close()
+
+@pytest.mark.parametrize("indent", [None, 4])
+def testLosParesNoDependenDelTamanioDelBloque(monkeypatch, indent):
+    escribirJson("datos.json", CONTENIDO, indent)
+    for tamanio in range(1, 41):
+        monkeypatch.setattr(E, "TAMANIO_BLOQUE_LECTURA", tamanio)
+        assert list(E.leerObjetoJsonPorPartes("datos.json")) == list(CONTENIDO.items()), tamanio
+
+def testUnObjetoVacio(monkeypatch):
+    monkeypatch.setattr(E, "TAMANIO_BLOQUE_LECTURA", 1)
+    archivo = open("vacio.json", mode="w", encoding="utf-8")
+    archivo.write("  {\n  }\n")
+    archivo.close()
+    assert list(E.leerObjetoJsonPorPartes("vacio.json")) == []
+
+@pytest.mark.parametrize("texto", ['[1, 2]', '{"a": 1', '{"a" 1}', '{"a": 1 "b": 2}', '{"a": tru}'])
+def testUnContenidoInvalidoSeRechaza(monkeypatch, texto):
+    monkeypatch.setattr(E, "TAMANIO_BLOQUE_LECTURA", 3)
+    archivo = open("invalido.json", mode="w", encoding="utf-8")
+    archivo.write(texto)
+    archivo.close()
+    with pytest.raises(ValueError):
+        list(E.leerObjetoJsonPorPartes("invalido.json"))
+
+def testElRecorridoIncluyeElDiario(nuevoProceso, monkeypatch):
+    # El primer préstamo queda en prestamos.json y su finalización en el diario, junto al segundo
+    monkeypatch.setattr(E, "MAX_ENTRADAS_DIARIO", 1)
+    idPrestamo = E.registrarPrestamoConDatos("A1001", "L1001")
+    monkeypatch.setattr(E, "MAX_ENTRADAS_DIARIO", 500)
+    archivo = open(E.PRESTAMOS_ARCHIVO, mode="r", encoding="utf-8")
+    assert idPrestamo in json.load(archivo)
+    archivo.close()
+    E.finalizarPrestamoConDatos(idPrestamo, True)
+    otro = E.registrarPrestamoConDatos("A1003", "L1002")
+
+    nuevoProceso()
+    monkeypatch.setattr(E, "TAMANIO_BLOQUE_LECTURA", 7)
+    recorridos = dict(E.recorrerPrestamos())
+    assert E.PRESTAMOS_ARCHIVO not in E.cacheArchivos
+    completos = E.cargarArchivo(E.PRESTAMOS_ARCHIVO)
+    assert list(recorridos) == list(completos)
+    assert recorridos[idPrestamo]["fechaFinalizacion"] != ""
+    assert recorridos[otro].aDiccionario() == completos[otro].aDiccionario()
+
+def testLosInformesRecorridosCoincidenConLosCompletos(nuevoProceso, monkeypatch):
+    monkeypatch.setattr(E, "TAMANIO_BLOQUE_LECTURA", 5)
+    recorrido = E.generarResumenMensual(2025, 5, E.recorrerPrestamos())
+    cantidades = E.generarResumenAnualPorLibroCantidad(2025, E.recorrerPrestamos())
+    assert E.PRESTAMOS_ARCHIVO not in E.cacheArchivos
+
+    nuevoProceso()
+    assert recorrido == E.generarResumenMensual(2025, 5)
+    assert cantidades == E.generarResumenAnualPorLibroCantidad(2025)
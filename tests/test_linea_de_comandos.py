@@ -0,0 +1,79 @@
+"""
+Pruebas de la línea de comandos: cada comando aplica todas sus entradas en un solo lote, informa
+con el código de salida si alguna falló y rechaza los argumentos mal formados.
+"""
+
+import json
+
+import pytest
+
+import Entrega2 as E
+
+@pytest.fixture
+def escrituras(monkeypatch):
+    """
+    Lista con un elemento por cada lote que se escribe a disco.
+    """
+    lista = []
+    escribir = E.escribirPendientes
+    def contarYEscribir(_lote):
+        lista.append(sorted(_lote["pendientes"]))
+        return escribir(_lote)
+    monkeypatch.setattr(E, "escribirPendientes", contarYEscribir)
+    return lista
+
+def testPrestarYDevolverEnUnSoloLote(nuevoProceso, escrituras):
+    assert E.ejecutarLineaDeComandos(["prestar", "A1001", "L1001", "A1003", "L1002"]) == 0
+    assert len(escrituras) == 1
+
+    nuevoProceso()
+    activos = E.cargarPrestamosActivos()
+    idPrestamo = activos["porAlumno"]["A1001"][0]
+    assert E.ejecutarLineaDeComandos(["devolver", idPrestamo, "--incorrecta"]) == 0
+
+    nuevoProceso()
+    assert E.cargarArchivo(E.PRESTAMOS_ARCHIVO)[idPrestamo]["estadoDevolucionCorrecto"] is False
+    assert E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"]["infracciones"] == 1
+    assert "A1001" not in E.cargarPrestamosActivos()["porAlumno"]
+
+def testUnaEntradaConErrorNoFrenaLasDemas(nuevoProceso, capsys):
+    assert E.ejecutarLineaDeComandos(["prestar", "A9999", "L1001", "A1003", "L1002"]) == 1
+    assert "Correctas: 1. Con error: 1." in capsys.readouterr().out
+
+    nuevoProceso()
+    activos = E.cargarPrestamosActivos()["porAlumno"]
+    assert "A9999" not in activos and len(activos["A1003"]) == 1
+
+def testIngresarYModificarDesdeArgumentosYArchivo(nuevoProceso):
+    archivo = open("nuevos.jsonl", mode="w", encoding="utf-8")
+    for numero, apellido in ((1, "Paz"), (2, "Ríos")):
+        archivo.write(json.dumps({
+            "id": f"A200{numero}",
+            "nombre": "Julia",
+            "apellido": apellido,
+            "dirección": "Calle 1",
+            "email": f"julia{numero}@mail.com",
+            "celular": "1122334455",
+            "fijo": "47891234",
+        }, ensure_ascii=False) + "\n")
+    archivo.close()
+    assert E.ejecutarLineaDeComandos(["ingresar", "alumno", "--archivo", "nuevos.jsonl"]) == 0
+    assert E.ejecutarLineaDeComandos(["modificar", "libro", "L1001", "costo=3500", "editorial=Planeta"]) == 0
+
+    nuevoProceso()
+    alumnos = E.cargarArchivo(E.ALUMNOS_ARCHIVO)
+    assert alumnos["A2002"].apellido == "Ríos" and alumnos["A2002"].activo
+    libro = E.cargarArchivo(E.LIBROS_ARCHIVO)["L1001"]
+    assert (libro.costoGarantia, libro.editorial) == (3500, "Planeta")
+
+@pytest.mark.parametrize("argumentos", [
+    ["prestar", "A1001"],                      # Pares incompletos
+    ["modificar", "libro", "L1001", "costo"],  # Campo sin valor
+    ["informe", "mensual", "2025"],            # Falta el mes
+    ["informe", "interanual", "2025"],         # Informe inexistente
+])
+def testLosArgumentosMalFormadosSeRechazan(argumentos):
+    with pytest.raises(SystemExit) as salida:
+        E.ejecutarLineaDeComandos(argumentos)
+    assert salida.value.code == 2
+    assert E.loteActual is None
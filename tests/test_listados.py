@@ -0,0 +1,62 @@
+"""
+Pruebas de los listados de alumnos y libros: filtros y orden por campo, y páginas que solo recorren
+los registros que se muestran y se cortan cuando el usuario lo pide.
+"""
+
+import json
+
+import pytest
+
+import Entrega2 as E
+
+def librosActivos():
+    archivo = open(E.LIBROS_ARCHIVO, mode="r", encoding="utf-8")
+    try:
+        return {id: libro for id, libro in json.load(archivo).items() if libro["activo"]}
+    finally:
+        archivo.close()
+
+def idsListados(_ruta, _filtros=None, _orden=None):
+    return [id for id, registro in E.recorrerRegistros(_ruta, E.LIBRO_ESQUEMA_LISTADO, _filtros, _orden)]
+
+def testElOrdenSigueCadaCampoEnSuSentido():
+    libros = librosActivos()
+    esperado = sorted(libros, key=lambda id: (-libros[id]["costoGarantia"], libros[id]["titulo"].casefold()))
+    assert idsListados(E.LIBROS_ARCHIVO, _orden=["-costo", "título"]) == esperado
+
+def testLosFiltrosBuscanTextoSinMayusculas():
+    libros = librosActivos()
+    esperado = [id for id, libro in libros.items() if "novela" in libro["genero"].casefold()]
+    assert idsListados(E.LIBROS_ARCHIVO, {"género": "NOVELA"}) == esperado
+    assert idsListados(E.LIBROS_ARCHIVO, {"género": "novela", "editorial": "sudamericana"}) == ["L1009"]
+    assert "L1010" not in idsListados(E.LIBROS_ARCHIVO) # Inactivo
+
+def testUnCampoInexistenteSeRechaza():
+    with pytest.raises(ValueError):
+        idsListados(E.LIBROS_ARCHIVO, _orden=["precio"])
+    with pytest.raises(ValueError):
+        idsListados(E.LIBROS_ARCHIVO, {"precio": "10"})
+
+def testLasPaginasSeCortanCuandoSePide(monkeypatch, capsys):
+    respuestas = iter(["", "0"])
+    preguntas = []
+    def responder(_texto):
+        preguntas.append(_texto)
+        return next(respuestas)
+    monkeypatch.setattr("builtins.input", responder)
+
+    E.listarRegistros(E.LIBROS_ARCHIVO, "libro", E.LIBRO_ESQUEMA_LISTADO, _tamanioPagina=3)
+    salida = capsys.readouterr().out
+    assert preguntas == [
+        "Registros 1 a 3. ENTER para ver más, [0] para terminar: ",
+        "Registros 1 a 6. ENTER para ver más, [0] para terminar: ",
+    ]
+    assert all(id in salida for id in ("L1001", "L1006")) and "L1007" not in salida
+
+def testDesdeYCantidadEligenUnTramo(capsys):
+    E.listarRegistros(E.LIBROS_ARCHIVO, "libro", E.LIBRO_ESQUEMA_LISTADO, _desde=2, _cantidad=4, _pausar=False, _tamanioPagina=3)
+    salida = capsys.readouterr().out
+    assert [id for id in librosActivos() if id in salida] == ["L1003", "L1004", "L1005", "L1006"]
+
+    E.listarRegistros(E.LIBROS_ARCHIVO, "libro", E.LIBRO_ESQUEMA_LISTADO, _desde=50, _pausar=False)
+    assert "No se encontraron libros activos." in capsys.readouterr().out
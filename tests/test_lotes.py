@@ -0,0 +1,82 @@
+"""
+Pruebas de los lotes: una operación que falla no deja cambios, una operación anidada que falla
+solo deshace lo suyo, si la escritura final falla no queda escrito ningún archivo y cada escritura
+usa su propio temporal.
+"""
+
+import os
+
+import pytest
+
+import Entrega2 as E
+
+def idsActivosDe(_idAlumno):
+    return E.cargarPrestamosActivos()["porAlumno"].get(_idAlumno, [])
+
+def testUnaOperacionQueFallaNoEscribeNada(nuevoProceso):
+    def operacion():
+        E.aplicarAltaPrestamo("A1001", "L1001")
+        raise RuntimeError("corte")
+
+    with pytest.raises(RuntimeError):
+        E.ejecutarEnLote(E.ARCHIVOS_DE_PRESTAMO, operacion)
+    assert E.loteActual is None
+
+    nuevoProceso()
+    assert len(E.cargarArchivo(E.PRESTAMOS_ARCHIVO)) == 10
+    assert idsActivosDe("A1001") == []
+
+def testUnaOperacionAnidadaQueFallaSoloDeshaceLoSuyo(nuevoProceso):
+    E.iniciarLote(E.ARCHIVOS_DE_PRESTAMO)
+    primero = E.registrarPrestamoConDatos("A1001", "L1001")
+
+    def fallida():
+        E.aplicarAltaPrestamo("A1003", "L1002")
+        raise RuntimeError("corte")
+
+    with pytest.raises(RuntimeError):
+        E.ejecutarEnLote(E.ARCHIVOS_DE_PRESTAMO, fallida)
+    assert E.loteActual is not None # El lote de afuera sigue abierto
+    assert idsActivosDe("A1003") == []
+    E.confirmarLote()
+
+    nuevoProceso()
+    prestamos = E.cargarArchivo(E.PRESTAMOS_ARCHIVO)
+    assert primero in prestamos
+    assert len(prestamos) == 11
+    assert idsActivosDe("A1001") == [primero]
+    assert idsActivosDe("A1003") == []
+
+def testSiFallaLaEscrituraDelLoteNoQuedaNadaEscrito(nuevoProceso, monkeypatch):
+    idPrestamo = E.registrarPrestamoConDatos("A1001", "L1001")
+    largoDiario = os.path.getsize(E.PRESTAMOS_DIARIO)
+
+    # La devolución incorrecta cambia el diario de préstamos y reescribe alumnos.json completo
+    reemplazar = E.reemplazarArchivos
+    def fallar(_temporales, _completos):
+        raise OSError("disco lleno")
+    monkeypatch.setattr(E, "reemplazarArchivos", fallar)
+    with pytest.raises(OSError):
+        E.finalizarPrestamoConDatos(idPrestamo, False)
+    assert E.loteActual is None
+    assert os.path.getsize(E.PRESTAMOS_DIARIO) == largoDiario
+    assert not [nombre for nombre in os.listdir(".") if nombre.endswith(".tmp")]
+
+    monkeypatch.setattr(E, "reemplazarArchivos", reemplazar)
+    nuevoProceso()
+    assert E.cargarArchivo(E.PRESTAMOS_ARCHIVO)[idPrestamo]["fechaFinalizacion"] == ""
+    assert E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"]["infracciones"] == 0
+    assert idsActivosDe("A1001") == [idPrestamo]
+
+def testCadaEscrituraUsaSuPropioTemporal():
+    primero = E.escribirTemporal(E.ALUMNOS_ARCHIVO, {"A1": {"nombre": "Ana"}})
+    segundo = E.escribirTemporal(E.ALUMNOS_ARCHIVO, {"A1": {"nombre": "Luisa"}})
+    assert primero != segundo
+    assert os.path.dirname(os.path.abspath(primero)) == os.path.dirname(os.path.abspath(E.ALUMNOS_ARCHIVO))
+
+    # Un temporal que no se pudo escribir se borra
+    with pytest.raises(TypeError):
+        E.escribirTemporal(E.ALUMNOS_ARCHIVO, {"A1": object()})
+    assert sorted(nombre for nombre in os.listdir(".") if nombre.endswith(".tmp")) == sorted(
+        os.path.basename(temporal) for temporal in (primero, segundo)
+    )
@@ -0,0 +1,37 @@
+"""
+Pruebas de las particiones por mes de los préstamos: se cierran al escribir y se leen sin escribir.
+"""
+
+import os
+from datetime import datetime
+
+import Entrega2 as E
+
+def testUnMesSeCierraAlFinalizarSuUltimoPrestamo(nuevoProceso, relojFijo):
+    relojFijo(datetime(2025, 3, 10, 9, 0, 0))
+    idPrestamo = E.registrarPrestamoConDatos("A1001", "L1001")
+
+    # Finalizado dentro del mismo mes: el mes todavía puede recibir préstamos
+    otro = E.registrarPrestamoConDatos("A1003", "L1002")
+    E.finalizarPrestamoConDatos(otro, True)
+    assert os.path.exists(E.rutaParticion(2025, 3))
+    assert not os.path.exists(E.rutaParticion(2025, 3, True))
+
+    # Al finalizar el último préstamo en un mes posterior, el mes se comprime en la misma escritura
+    relojFijo(datetime(2025, 4, 2, 9, 0, 0))
+    E.finalizarPrestamoConDatos(idPrestamo, True)
+    assert os.path.exists(E.rutaParticion(2025, 3, True))
+    assert not os.path.exists(E.rutaParticion(2025, 3))
+
+    nuevoProceso()
+    particion = E.cargarParticion(2025, 3)
+    assert set(particion) == {idPrestamo, otro}
+    assert particion[idPrestamo]["fechaFinalizacion"] == "2025-04-02"
+
+def testLeerUnMesNoEscribeNada(nuevoProceso, monkeypatch):
+    monkeypatch.setattr(E, "bloquearArchivos", None) # Cualquier bloqueo haría fallar la prueba
+    particion = E.cargarParticion(2025, 5)
+    assert len(particion) == 8 and all(prestamo["fechaInicio"].startswith("2025-05") for prestamo in particion.values())
+    assert E.cargarParticion(2025, 6) == {}
+    assert not os.path.exists(E.PARTICIONES_DIRECTORIO)
+    assert not os.path.exists(E.ORIGEN_DERIVADOS_ARCHIVO)
@@ -0,0 +1,38 @@
+"""
+Pruebas de alumnos y libros: control optimista de versiones entre terminales.
+"""
+
+import Entrega2 as E
+
+def modificarAlumno(_id, _valores):
+    return E.modificarRegistroConDatos(E.ALUMNOS_ARCHIVO, "alumno", E.ALUMNO_ESQUEMA, _id, _valores)
+
+def testCadaCambioAumentaLaVersion(nuevoProceso):
+    assert E.versionDeRegistro(E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"]) == 0
+    assert modificarAlumno("A1001", {"nombre": "Anabel"})
+    assert modificarAlumno("A1001", {"apellido": "Lopes"})
+
+    nuevoProceso()
+    alumno = E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"]
+    assert E.versionDeRegistro(alumno) == 2
+    assert (alumno.nombre, alumno.apellido) == ("Anabel", "Lopes")
+
+def testUnCambioConcurrenteEnOtroCampoSeConserva(capsys):
+    leido = E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"]
+    assert modificarAlumno("A1001", {"email": "ana.lopez@mail.com"}) # Otra terminal
+
+    assert E.actualizarRegistro(E.ALUMNOS_ARCHIVO, "alumno", "A1001", [("nombre", "Anabel")], leido)
+    alumno = E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"]
+    assert (alumno.nombre, alumno.email) == ("Anabel", "ana.lopez@mail.com")
+    assert E.versionDeRegistro(alumno) == 2
+    assert "en otros campos" in capsys.readouterr().out
+
+def testUnCambioConcurrenteEnElMismoCampoNoSePisa(capsys):
+    leido = E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"]
+    assert modificarAlumno("A1001", {"email": "ana.lopez@mail.com"}) # Otra terminal
+
+    assert not E.actualizarRegistro(E.ALUMNOS_ARCHIVO, "alumno", "A1001", [("email", "ana@correo.com")], leido)
+    alumno = E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"]
+    assert alumno.email == "ana.lopez@mail.com"
+    assert E.versionDeRegistro(alumno) == 1
+    assert "ana.lopez@mail.com" in capsys.readouterr().out
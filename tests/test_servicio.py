@@ -0,0 +1,91 @@
+"""
+Pruebas del servicio HTTP/JSON: los pedidos operan sobre los datos en memoria del lote abierto, que
+se escriben a disco al confirmarlo, y los pedidos mal formados se responden con su código de error.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import Entrega2 as E
+
+def pedir(_metodo, _destino, _cuerpo=None):
+    return E.atenderPedido(_metodo, _destino, json.dumps(_cuerpo).encode("utf-8") if _cuerpo is not None else b"")
+
+@pytest.fixture
+def servicio():
+    """
+    Lote abierto como el del servicio en marcha.
+    """
+    E.iniciarLote(E.ARCHIVOS_DEL_SERVICIO)
+
+def testLosCambiosSeEscribenAlConfirmarElLote(nuevoProceso, servicio):
+    estado, respuesta = pedir("POST", "/prestamos", {"idAlumno": "a1001", "idLibro": "l1001"})
+    assert estado == 201
+    idPrestamo = respuesta["resultado"]["idPrestamo"]
+
+    estado, respuesta = pedir("POST", f"/prestamos/{idPrestamo}/devolucion", {"correcta": "no"})
+    assert (estado, respuesta["resultado"]["infraccion"]) == (200, True)
+    estado, respuesta = pedir("GET", "/alumnos/a1001")
+    assert respuesta["resultado"]["infracciones"] == 1
+
+    # Hasta confirmar el lote, otra ejecución no ve los cambios
+    archivo = open(E.ALUMNOS_ARCHIVO, mode="r", encoding="utf-8")
+    assert json.load(archivo)["A1001"]["infracciones"] == 0
+    archivo.close()
+
+    E.confirmarLote()
+    nuevoProceso()
+    assert E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"]["infracciones"] == 1
+    assert E.cargarArchivo(E.PRESTAMOS_ARCHIVO)[idPrestamo]["fechaFinalizacion"] != ""
+
+def testAltaModificacionYConsultas(servicio):
+    alumno = {"id": "A2001", "nombre": "Julia", "apellido": "Paz", "dirección": "Calle 1",
+              "email": "julia@mail.com", "celular": "1122334455", "fijo": "47891234"}
+    assert pedir("POST", "/alumnos", alumno)[0] == 201
+    assert pedir("PATCH", "/alumnos/A2001", {"apellido": "Ríos"})[0] == 200
+    assert pedir("GET", "/alumnos/A2001")[1]["resultado"]["apellido"] == "Ríos"
+    assert "A2001" in pedir("GET", "/alumnos?buscar=rios")[1]["resultado"]["registros"]
+
+    assert pedir("DELETE", "/alumnos/A2001")[0] == 200
+    assert "A2001" not in pedir("GET", "/alumnos")[1]["resultado"]
+    assert pedir("GET", "/informes/mensual?anio=2025&mes=5")[1]["resultado"]["texto"].strip() != ""
+
+@pytest.mark.parametrize("metodo, destino, cuerpo, esperado", [
+    ("POST", "/prestamos", b"[1, 2]", 400),                               # El cuerpo no es un objeto
+    ("POST", "/prestamos", b"{no es json", 400),
+    ("POST", "/prestamos/2025.05.01 09:15:32/devolucion", b'{"correcta": "tal vez"}', 400),
+    ("GET", "/informes/mensual?anio=dos mil", b"", 400),
+    ("GET", "/alumnos/A9999", b"", 404),
+    ("GET", "/socios", b"", 404),
+])
+def testLosPedidosInvalidosSeRechazan(servicio, metodo, destino, cuerpo, esperado):
+    estado, respuesta = E.atenderPedido(metodo, destino, cuerpo)
+    assert (estado, respuesta["ok"]) == (esperado, False)
+
+def testLosErroresDeValidacionVuelvenEnLaRespuesta(servicio, capsys):
+    estado, respuesta = pedir("PATCH", "/alumnos/A1001", {"email": "no-es-un-email"})
+    assert estado == 400
+    assert any("no-es-un-email" in mensaje for mensaje in respuesta["mensajes"])
+    assert capsys.readouterr().out == ""
+
+def testUnPedidoPorLaConexion(servicio):
+    async def pedirPorSocket():
+        servidor = await asyncio.start_server(E.atenderConexion, "127.0.0.1", 0)
+        puerto = servidor.sockets[0].getsockname()[1]
+        async with servidor:
+            lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+            cuerpo = json.dumps({"idAlumno": "A1003", "idLibro": "L1002"}).encode("utf-8")
+            escritor.write(
+                f"POST /prestamos HTTP/1.1\r\nHost: prueba\r\nContent-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1") + cuerpo
+            )
+            await escritor.drain()
+            respuesta = await lector.read()
+            escritor.close()
+        return respuesta
+
+    respuesta = asyncio.run(pedirPorSocket())
+    encabezado, _, contenido = respuesta.partition(b"\r\n\r\n")
+    assert encabezado.startswith(b"HTTP/1.1 201 Created")
+    assert json.loads(contenido)["resultado"]["idPrestamo"] in E.cargarPrestamosActivos()["prestamos"]
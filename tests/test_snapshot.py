@@ -0,0 +1,84 @@
+"""
+Pruebas de la foto binaria de las colecciones: se escribe junto con el JSON completo y nunca al
+leer, las altas del diario no la invalidan y un JSON cambiado por otra terminal la deja de lado.
+"""
+
+import json
+import os
+
+import pytest
+
+import Entrega2 as E
+
+@pytest.fixture
+def fotosLeidas(monkeypatch):
+    """
+    Lista con (archivo, True si se cargó desde la foto) por cada intento de leer una foto.
+    """
+    lista = []
+    leer = E.leerSnapshot
+    def registrarYLeer(_direccion, _firma):
+        diccionario = leer(_direccion, _firma)
+        lista.append((_direccion, diccionario is not None))
+        return diccionario
+    monkeypatch.setattr(E, "leerSnapshot", registrarYLeer)
+    return lista
+
+def comoJson(_diccionario):
+    return {clave: registro.aDiccionario() for clave, registro in _diccionario.items()}
+
+def escribirFotos():
+    E.ejecutarEnLote(list(E.SNAPSHOT_COLUMNAS), E.escribirFotosColecciones)
+
+def testLeerNoEscribeLaFoto():
+    for direccion in E.SNAPSHOT_COLUMNAS:
+        E.cargarArchivo(direccion)
+        assert not os.path.exists(direccion + E.SNAPSHOT_EXTENSION)
+
+def testLaFotoSeEscribeConElJsonCompleto(nuevoProceso, fotosLeidas):
+    assert E.modificarRegistroConDatos(E.ALUMNOS_ARCHIVO, "alumno", E.ALUMNO_ESQUEMA, "A1001", {"nombre": "Anabel"})
+    assert os.path.exists(E.ALUMNOS_ARCHIVO + E.SNAPSHOT_EXTENSION)
+
+    nuevoProceso()
+    assert E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"].nombre == "Anabel"
+    assert fotosLeidas[-1] == (E.ALUMNOS_ARCHIVO, True)
+
+def testLaFotoCargaLoMismoQueElJson(nuevoProceso, fotosLeidas):
+    escribirFotos()
+    nuevoProceso()
+    fotosLeidas.clear()
+    desdeFotos = {direccion: comoJson(E.cargarArchivo(direccion)) for direccion in E.SNAPSHOT_COLUMNAS}
+    assert fotosLeidas == [(direccion, True) for direccion in E.SNAPSHOT_COLUMNAS]
+
+    for direccion in E.SNAPSHOT_COLUMNAS:
+        os.remove(direccion + E.SNAPSHOT_EXTENSION)
+    nuevoProceso()
+    assert desdeFotos == {direccion: comoJson(E.cargarArchivo(direccion)) for direccion in E.SNAPSHOT_COLUMNAS}
+
+def testLasAltasDelDiarioNoInvalidanLaFoto(nuevoProceso, fotosLeidas):
+    escribirFotos()
+    foto = E.PRESTAMOS_ARCHIVO + E.SNAPSHOT_EXTENSION
+    estadoFoto = os.stat(foto)
+    idPrestamo = E.registrarPrestamoConDatos("A1001", "L1001")
+    E.finalizarPrestamoConDatos("2025.05.01 09:15:32", True) # Cambio de un préstamo que está en la foto
+
+    nuevoProceso()
+    prestamos = E.cargarArchivo(E.PRESTAMOS_ARCHIVO)
+    assert fotosLeidas[-1] == (E.PRESTAMOS_ARCHIVO, True)
+    assert len(prestamos) == 11
+    assert prestamos[idPrestamo]["idAlumno"] == "A1001"
+    assert os.stat(foto).st_mtime_ns == estadoFoto.st_mtime_ns
+
+def testUnJsonCambiadoPorOtraTerminalDejaDeLadoLaFoto(nuevoProceso, fotosLeidas):
+    escribirFotos()
+    archivo = open(E.LIBROS_ARCHIVO, mode="r", encoding="utf-8")
+    libros = json.load(archivo)
+    archivo.close()
+    libros["L1001"]["titulo"] = "Crónica de una muerte anunciada"
+    archivo = open(E.LIBROS_ARCHIVO, mode="w", encoding="utf-8")
+    json.dump(libros, archivo, ensure_ascii=False, indent=4)
+    archivo.close()
+
+    nuevoProceso()
+    assert E.cargarArchivo(E.LIBROS_ARCHIVO)["L1001"].titulo == "Crónica de una muerte anunciada"
+    assert fotosLeidas[-1] == (E.LIBROS_ARCHIVO, False)
@@ -0,0 +1,72 @@
+"""
+Pruebas del motor sqlite: la migración desde los JSON se hace una sola vez, las operaciones no
+vuelven a leer las tablas completas y los cambios de otra conexión se ven en la próxima lectura.
+"""
+
+import json
+import re
+import sqlite3
+
+import pytest
+
+import Entrega2 as E
+
+LECTURA_COMPLETA = re.compile(r"SELECT id, datos FROM (alumnos|libros|prestamos)$")
+
+@pytest.fixture(autouse=True)
+def motorSqlite(monkeypatch):
+    monkeypatch.setattr(E, "MOTOR_ALMACENAMIENTO", "sqlite")
+
+def contarFilas(_tabla):
+    conexion = sqlite3.connect(E.BASE_DATOS_ARCHIVO)
+    try:
+        return conexion.execute(f"SELECT COUNT(*) FROM {_tabla}").fetchone()[0]
+    finally:
+        conexion.close()
+
+def testLaMigracionCopiaLosJsonUnaSolaVez(nuevoProceso):
+    E.conectarBaseDatos()
+    assert (contarFilas("alumnos"), contarFilas("libros"), contarFilas("prestamos")) == (10, 10, 10)
+
+    # Un alumno agregado al JSON después de migrar ya no se copia
+    archivo = open(E.ALUMNOS_ARCHIVO, mode="r", encoding="utf-8")
+    alumnos = json.load(archivo)
+    archivo.close()
+    alumnos["A2001"] = dict(alumnos["A1001"])
+    archivo = open(E.ALUMNOS_ARCHIVO, mode="w", encoding="utf-8")
+    json.dump(alumnos, archivo, ensure_ascii=False, indent=4)
+    archivo.close()
+
+    nuevoProceso()
+    assert "A2001" not in E.cargarArchivo(E.ALUMNOS_ARCHIVO)
+    assert contarFilas("alumnos") == 10
+
+def testLasOperacionesNoReleenLasTablasCompletas(nuevoProceso):
+    E.cargarArchivo(E.ALUMNOS_ARCHIVO)
+    E.cargarArchivo(E.LIBROS_ARCHIVO)
+    E.cargarPrestamosActivos() # El primer uso arma los derivados a partir de la tabla de préstamos
+    sentencias = []
+    E.conectarBaseDatos().set_trace_callback(sentencias.append)
+
+    idPrestamo = E.registrarPrestamoConDatos("A1001", "L1001")
+    E.finalizarPrestamoConDatos(idPrestamo, False)
+    assert E.modificarRegistroConDatos(E.ALUMNOS_ARCHIVO, "alumno", E.ALUMNO_ESQUEMA, "A1001", {"nombre": "Anabel"})
+    assert not [sentencia for sentencia in sentencias if LECTURA_COMPLETA.match(sentencia.strip())]
+
+    nuevoProceso()
+    alumno = E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"]
+    assert (alumno.nombre, alumno.infracciones) == ("Anabel", 1)
+    assert E.cargarArchivo(E.PRESTAMOS_ARCHIVO)[idPrestamo]["fechaFinalizacion"] != ""
+
+def testLosCambiosDeOtraConexionSeVen():
+    assert E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"].apellido == "López"
+
+    # Otra terminal cambia la fila mientras la tabla está en la caché
+    otra = sqlite3.connect(E.BASE_DATOS_ARCHIVO)
+    datos = json.loads(otra.execute("SELECT datos FROM alumnos WHERE id = 'A1001'").fetchone()[0])
+    datos["apellido"] = "Benítez"
+    with otra:
+        otra.execute("UPDATE alumnos SET datos = ? WHERE id = 'A1001'", (json.dumps(datos, ensure_ascii=False),))
+    otra.close()
+
+    assert E.cargarArchivo(E.ALUMNOS_ARCHIVO)["A1001"].apellido == "Benítez"